@@ -91,6 +91,12 @@ public class Common {
     public static final String ASSET_BOOTSTRAP_NATIVE = "bootstrap-native";
     public static final String ASSET_BUILD_JSON = "build.json";
     public static final String ASSET_CACERT = "cacert.pem";
+    public static final String ASSET_REFLECTION_INDEX = "reflection.bin";
+
+    // Header of the reflection index asset, which is written by the Gradle plugin and read by
+    // com.chaquo.python.ReflectionIndex.
+    public static final int REFLECTION_INDEX_MAGIC = 0x43515249;  // "CQRI"
+    public static final int REFLECTION_INDEX_VERSION = 1;
 
     public static String osName() {
         String property = System.getProperty("os.name");
@@ -81,6 +81,12 @@ abstract class PythonExtension @Inject constructor (
     val staticProxy = TreeSet<String>()
     fun staticProxy(vararg modules: String) { staticProxy += modules }
 
+    val reflectionIndex = TreeSet<String>()
+    fun reflectionIndex(vararg names: String) { reflectionIndex += names }
+
+    val preload = TreeSet<String>()
+    fun preload(vararg classes: String) { preload += classes }
+
     val pip = objects.newInstance<PipExtension>()
     fun pip(action: Action<PipExtension>) = action.execute(pip)
 
@@ -100,6 +106,8 @@ abstract class PythonExtension @Inject constructor (
         buildPython = overlay.buildPython ?: buildPython
         extractPackages += overlay.extractPackages
         staticProxy += overlay.staticProxy
+        reflectionIndex += overlay.reflectionIndex
+        preload += overlay.preload
         pip.mergeFrom(overlay.pip)
         pyc.mergeFrom(overlay.pyc)
     }
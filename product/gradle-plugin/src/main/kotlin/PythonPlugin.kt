@@ -5,9 +5,11 @@ import com.android.build.api.variant.*
 import com.chaquo.python.internal.*
 import org.gradle.api.*
 import org.gradle.api.artifacts.*
+import org.gradle.api.file.*
 import org.gradle.api.initialization.dsl.*
 import org.gradle.api.internal.GradleInternal
 import org.gradle.api.plugins.*
+import org.gradle.api.provider.*
 import org.gradle.kotlin.dsl.*
 import org.gradle.process.*
 import java.io.*
@@ -43,6 +45,8 @@ class PythonPlugin @Inject constructor(
     // additional type parameter.
     private lateinit var android: CommonExtension<*, *, *, *>
 
+    lateinit var bootClasspath: Provider<List<RegularFile>>
+
     override fun apply(project: Project) {
         this.project = project
         extension = project.extensions.create<ChaquopyExtension>("chaquopy")
@@ -78,6 +82,7 @@ class PythonPlugin @Inject constructor(
                 // the non-generic subclasses of AndroidComponentsExtension.
                 val components =
                     project.extensions.getByType(AndroidComponentsExtension::class)
+                bootClasspath = components.sdkComponents.bootClasspath
                 val selector = components.selector().all()
                 try {
                     (components as ApplicationAndroidComponentsExtension).onVariants(
@@ -254,6 +259,9 @@ class PythonPlugin @Inject constructor(
         TaskBuilder(this, variant, python, getAbis(variant, python)).build()
     }
 
+    // Returns null if compileSdk is a preview.
+    fun getCompileSdk(): Int? = android.compileSdk
+
     // variant.externalNativeBuild returns "null if no cmake external build is
     // configured for this variant", so we'll have to determine the abiFilters from
     // the DSL.
@@ -7,6 +7,7 @@ import com.chaquo.python.internal.Common.osName
 import org.apache.commons.compress.archivers.zip.*
 import org.gradle.api.*
 import org.gradle.api.artifacts.*
+import org.gradle.api.attributes.Attribute
 import org.gradle.api.file.*
 import org.gradle.api.provider.Provider
 import org.gradle.api.tasks.*
@@ -435,14 +436,61 @@ internal class TaskBuilder(
             }
         }
 
+        val reflectionAssetsTask = registerAssetTask("reflection") {
+            // Framework classes are read from android.jar, so they're only valid up to the
+            // compileSdk API level: see ReflectionIndex.load.
+            val apiLevel = plugin.getCompileSdk() ?: 0
+            val platformClasspath = project.files(plugin.bootClasspath)
+            val classpath = variant.compileClasspath
+            if (!python.reflectionIndex.isEmpty()) {
+                inputs.files(platformClasspath, classpath)
+            }
+            inputs.property("reflectionIndex", python.reflectionIndex)
+            inputs.property("apiLevel", apiLevel)
+
+            doLast {
+                if (!python.reflectionIndex.isEmpty()) {
+                    ReflectionIndexWriter(python.reflectionIndex).apply {
+                        addClasspath(platformClasspath, platform = true)
+                        addClasspath(classpath, platform = false)
+                        write(File(assetDir, Common.ASSET_REFLECTION_INDEX), apiLevel)
+                    }
+                }
+            }
+        }
+
         registerAssetTask("build") {
-            val tasks = arrayOf(srcAssetsTask, reqsAssetsTask, miscAssetsTask)
+            val tasks = arrayOf(
+                srcAssetsTask, reqsAssetsTask, miscAssetsTask, reflectionAssetsTask)
             inputs.files(*tasks)
+            inputs.property("preload", python.preload)
+
+            // Java packages for the import hook: see import.pxi. This uses the runtime class
+            // path, because the compile class path omits `runtimeOnly` dependencies.
+            val classpath = project.files(
+                plugin.bootClasspath,
+                variant.runtimeConfiguration.incoming.artifactView {
+                    attributes {
+                        attribute(Attribute.of("artifactType", String::class.java),
+                                  "android-classes-jar")
+                    }
+                }.files)
+            val sourceDirs = project.files(
+                listOfNotNull(variant.sources.java, variant.sources.kotlin).map { it.all })
+            inputs.files(classpath, sourceDirs)
+            inputs.property("namespace", variant.namespace)
+
             doLast {
                 val buildJson = JSONObject()
                 buildJson.put("python_version", python.version)
                 buildJson.put("assets", hashAssets(*tasks))
                 buildJson.put("extract_packages", JSONArray(python.extractPackages))
+                buildJson.put("preload", JSONArray(python.preload))
+                // This may contain thousands of names, so it's stored as a single string to
+                // save time when the app starts.
+                buildJson.put("java_packages",
+                    (findJavaPackages(classpath, sourceDirs) + variant.namespace.get())
+                        .joinToString("\n"))
                 File(assetDir, Common.ASSET_BUILD_JSON).writeText(buildJson.toString(4))
             }
         }
@@ -719,6 +767,47 @@ abstract class AssetDirTask : OutputDirTask() {
 }
 
 
+// Returns the names of all packages containing classes on the given class path, or source
+// files in the given directories.
+fun findJavaPackages(classpath: Iterable<File>, sourceDirs: Iterable<File>): Set<String> {
+    val packages = TreeSet<String>()
+    fun addPackage(path: String) {
+        val dir = path.substringBeforeLast("/", "")
+        if (dir.isNotEmpty() && !dir.startsWith("META-INF")) {
+            packages.add(dir.replace("/", "."))
+        }
+    }
+    fun addDir(root: File, extensions: List<String>) {
+        root.walk().filter { it.isFile && it.extension in extensions }.forEach {
+            addPackage(it.relativeTo(root).invariantSeparatorsPath)
+        }
+    }
+
+    for (file in classpath) {
+        if (file.isDirectory) {
+            addDir(file, listOf("class"))
+        } else if (file.name.endsWith(".jar")) {
+            java.util.zip.ZipFile(file).use { zip ->
+                for (entry in zip.entries()) {
+                    if (entry.name.endsWith(".class")) {
+                        addPackage(entry.name)
+                    }
+                }
+            }
+        }
+    }
+
+    // Kotlin files aren't required to be in a directory matching their package, but in
+    // practice they almost always are.
+    for (dir in sourceDirs) {
+        if (dir.isDirectory) {
+            addDir(dir, listOf("java", "kt"))
+        }
+    }
+    return packages
+}
+
+
 fun hashAssets(vararg tasks: Provider<AssetDirTask>): JSONObject {
     val json = JSONObject()
     for (task in tasks) {
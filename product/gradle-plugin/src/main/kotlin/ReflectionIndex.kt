@@ -0,0 +1,191 @@
+package com.chaquo.python
+
+import com.chaquo.python.internal.*
+import org.gradle.api.*
+import java.io.*
+import java.util.*
+import java.util.zip.*
+
+
+// Generates the reflection index asset, which is read at runtime by
+// com.chaquo.python.ReflectionIndex. The class files are parsed directly, because loading
+// them into the Gradle JVM would require all of their dependencies, and android.jar can't be
+// loaded at all.
+internal class ReflectionIndexWriter(val names: Collection<String>) {
+    val classes = TreeMap<String, IndexedClass>()
+
+    // A class is indexed if its name equals one of the given names, or if it's nested
+    // within one of them, or in a package within one of them.
+    fun isIndexed(className: String) = names.any {
+        className == it || className.startsWith("$it.") || className.startsWith("$it$")
+    }
+
+    // Where the same class appears more than once, the first one wins, as it would with a
+    // ClassLoader.
+    fun addClasspath(classpath: Iterable<File>, platform: Boolean) {
+        for (file in classpath) {
+            if (file.isDirectory) {
+                file.walk().filter { it.isFile }.forEach { f ->
+                    val path = f.relativeTo(file).invariantSeparatorsPath
+                    addClass(path, platform) { f.inputStream() }
+                }
+            } else if (file.name.endsWith(".jar")) {
+                ZipFile(file).use { zip ->
+                    for (entry in zip.entries()) {
+                        addClass(entry.name, platform) { zip.getInputStream(entry) }
+                    }
+                }
+            }
+        }
+    }
+
+    fun addClass(path: String, platform: Boolean, open: () -> InputStream) {
+        if (!path.endsWith(".class") || path.startsWith("META-INF/") ||
+            path.endsWith("module-info.class")) {
+            return
+        }
+        val className = path.removeSuffix(".class").replace("/", ".")
+        if (isIndexed(className) && className !in classes) {
+            val cls = open().use { readClass(DataInputStream(BufferedInputStream(it))) }
+            if (cls.name != className) {
+                throw GradleException("$path contains class ${cls.name}")
+            }
+            classes[className] = cls.copy(platform = platform)
+        }
+    }
+
+    fun write(outFile: File, apiLevel: Int) {
+        val strings = LinkedHashMap<String, Int>()
+        fun index(s: String) = strings.getOrPut(s) { strings.size }
+
+        val body = ByteArrayOutputStream()
+        DataOutputStream(body).apply {
+            writeInt(classes.size)
+            for (cls in classes.values) {
+                writeInt(index(cls.name))
+                writeBoolean(cls.platform)
+                writeInt(cls.members.size)
+                for (member in cls.members) {
+                    writeByte(member.kind.code)
+                    writeInt(index(member.name))
+                    writeInt(member.flags)
+                    writeInt(index(member.descriptor))
+                }
+            }
+        }
+
+        DataOutputStream(BufferedOutputStream(outFile.outputStream())).use { out ->
+            out.writeInt(Common.REFLECTION_INDEX_MAGIC)
+            out.writeInt(Common.REFLECTION_INDEX_VERSION)
+            out.writeInt(apiLevel)
+            out.writeInt(strings.size)
+            for (s in strings.keys) {
+                out.writeUTF(s)
+            }
+            body.writeTo(out)
+        }
+    }
+}
+
+
+internal data class IndexedClass(
+    val name: String, val members: List<IndexedMember>, val platform: Boolean = false)
+
+// `kind` and `descriptor` have the same meanings as in Reflector.getIndexedMember.
+internal data class IndexedMember(
+    val kind: Char, val name: String, val flags: Int, val descriptor: String)
+
+
+// See https://docs.oracle.com/javase/specs/jvms/se17/html/jvms-4.html.
+private const val ACC_PUBLIC = 0x0001
+private const val ACC_PROTECTED = 0x0004
+private const val ACC_SYNTHETIC = 0x1000
+
+internal fun readClass(input: DataInputStream): IndexedClass {
+    if (input.readInt() != 0xCAFEBABE.toInt()) {
+        throw GradleException("Invalid class file")
+    }
+    input.readUnsignedShort()  // minor_version
+    input.readUnsignedShort()  // major_version
+
+    // Only UTF-8 and Class entries are needed.
+    val poolCount = input.readUnsignedShort()
+    val utf8 = arrayOfNulls<String>(poolCount)
+    val classNames = IntArray(poolCount)
+    var i = 1
+    while (i < poolCount) {
+        when (val tag = input.readUnsignedByte()) {
+            1 -> utf8[i] = input.readUTF()
+            7 -> classNames[i] = input.readUnsignedShort()
+            8, 16, 19, 20 -> input.skipFully(2)
+            15 -> input.skipFully(3)
+            3, 4, 9, 10, 11, 12, 17, 18 -> input.skipFully(4)
+            5, 6 -> {
+                input.skipFully(8)
+                i++  // Takes two constant pool entries.
+            }
+            else -> throw GradleException("Unknown constant pool tag $tag")
+        }
+        i++
+    }
+    fun utf8(index: Int) = utf8[index]!!
+    fun className(index: Int) = utf8(classNames[index]).replace("/", ".")
+
+    input.readUnsignedShort()  // access_flags
+    val thisClass = className(input.readUnsignedShort())
+    input.readUnsignedShort()  // super_class
+    input.skipFully(2 * input.readUnsignedShort())  // interfaces
+
+    // Include the same members as Reflector.isAccessible.
+    val members = ArrayList<IndexedMember>()
+    for (kind in listOf('F', 'M')) {
+        repeat(input.readUnsignedShort()) {
+            val flags = input.readUnsignedShort()
+            val name = utf8(input.readUnsignedShort())
+            val descriptor = utf8(input.readUnsignedShort())
+            skipAttributes(input)
+            if (flags and (ACC_PUBLIC or ACC_PROTECTED) != 0 &&
+                flags and ACC_SYNTHETIC == 0 &&
+                name != "<clinit>"
+            ) {
+                members.add(IndexedMember(kind, name, flags, descriptor))
+            }
+        }
+    }
+
+    repeat(input.readUnsignedShort()) {
+        val attrName = utf8(input.readUnsignedShort())
+        val length = input.readInt()
+        if (attrName == "InnerClasses") {
+            repeat(input.readUnsignedShort()) {
+                val inner = input.readUnsignedShort()
+                val outer = input.readUnsignedShort()
+                val innerName = input.readUnsignedShort()
+                val flags = input.readUnsignedShort()
+
+                // Anonymous and local classes have no outer class or no name.
+                if (outer != 0 && innerName != 0 && className(outer) == thisClass &&
+                    flags and (ACC_PUBLIC or ACC_PROTECTED) != 0
+                ) {
+                    members.add(IndexedMember('C', utf8(innerName), flags, className(inner)))
+                }
+            }
+        } else {
+            input.skipFully(length)
+        }
+    }
+    return IndexedClass(thisClass, members)
+}
+
+private fun skipAttributes(input: DataInputStream) {
+    repeat(input.readUnsignedShort()) {
+        input.readUnsignedShort()  // attribute_name_index
+        input.skipFully(input.readInt())
+    }
+}
+
+private fun DataInputStream.skipFully(n: Int) {
+    if (skipBytes(n) != n) {
+        throw EOFException()
+    }
+}
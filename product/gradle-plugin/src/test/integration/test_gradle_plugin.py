@@ -12,6 +12,7 @@ from os.path import abspath, basename, dirname, exists, isdir, join, realpath, r
 from pathlib import Path
 import re
 import shutil
+import struct
 import subprocess
 from subprocess import run
 import sys
@@ -1552,6 +1553,21 @@ class PythonReqs(GradleTestCase):
                 )
 
 
+class Preload(GradleTestCase):
+    def test_change(self):
+        run = self.RunGradle("base", "Preload/change_1",
+                             preload=["android.widget.TextView", "java.util.ArrayList"])
+        run.rerun("Preload/change_2", preload=["java.util.ArrayList"])
+        run.rerun("base")
+
+
+class ReflectionIndex(GradleTestCase):
+    def test_basic(self):
+        self.RunGradle("base", "ReflectionIndex/basic",
+                       reflection_index=["android.view.ViewStub",
+                                         "android.view.ViewStub$OnInflateListener"])
+
+
 class StaticProxy(GradleTestCase):
     reqs = ["chaquopy_test/__init__.py", "chaquopy_test/a.py", "chaquopy_test/b.py"]
 
@@ -1804,11 +1820,17 @@ class RunGradle(object):
         python_version = kwargs["python_version"]
         abis = kwargs["abis"]
         abi_suffixes = ["common"] + abis
+        reflection_index = kwargs.get("reflection_index")
         self.test.assertCountEqual(
             ["app.imy", "bootstrap-native", "bootstrap.imy", "build.json", "cacert.pem"]
             + [f"{stem}-{suffix}.imy" for stem in ["requirements", "stdlib"]
-               for suffix in abi_suffixes],
+               for suffix in abi_suffixes]
+            + (["reflection.bin"] if reflection_index else []),
             os.listdir(asset_dir))
+        if reflection_index:
+            self.test.assertCountEqual(
+                reflection_index,
+                self.read_reflection_index(join(asset_dir, "reflection.bin")))
 
         # Python source
         pyc = kwargs.get("pyc", ["src", "pip", "stdlib"])
@@ -1944,10 +1966,15 @@ class RunGradle(object):
         # build.json
         with open(join(asset_dir, "build.json")) as build_json_file:
             build_json = json.load(build_json_file)
-        self.test.assertCountEqual(["python_version", "assets", "extract_packages"],
-                                   build_json)
+        self.test.assertCountEqual(
+            ["python_version", "assets", "extract_packages", "preload", "java_packages"],
+            build_json)
         self.test.assertEqual(python_version, build_json["python_version"])
         self.test.assertCountEqual(extract_packages, build_json["extract_packages"])
+        self.test.assertCountEqual(kwargs.get("preload", []), build_json["preload"])
+        java_packages = build_json["java_packages"].split("\n")
+        for package in ["android.app", "com.chaquo.python", "com.chaquo.python.test"]:
+            self.test.assertIn(package, java_packages)
         asset_list = []
         for dirpath, dirnames, filenames in os.walk(asset_dir):
             asset_list += [relpath(join(dirpath, f), asset_dir).replace("\\", "/")
@@ -1957,6 +1984,30 @@ class RunGradle(object):
              for filename in asset_list if filename != "build.json"},
             build_json["assets"])
 
+    # Returns a dict mapping each class name to its number of members. See
+    # ReflectionIndex.kt for the format.
+    def read_reflection_index(self, filename):
+        with open(filename, "rb") as f:
+            data = f.read()
+        magic, version, api_level, string_count = struct.unpack_from(">iiii", data)
+        self.test.assertEqual((0x43515249, 1), (magic, version))
+        offset = 16
+        strings = []
+        for _ in range(string_count):
+            length, = struct.unpack_from(">H", data, offset)
+            strings.append(data[offset + 2 : offset + 2 + length].decode("UTF-8"))
+            offset += 2 + length
+
+        result = {}
+        class_count, = struct.unpack_from(">i", data, offset)
+        offset += 4
+        for _ in range(class_count):
+            name, platform, member_count = struct.unpack_from(">i?i", data, offset)
+            result[strings[name]] = member_count
+            offset += 9 + (member_count * 13)
+        self.test.assertEqual(len(data), offset)
+        return result
+
     def check_pyc(self, zip_file, pyc_filename, kwargs):
         # See the CPython source code at Include/internal/pycore_magic_number.h or
         # Lib/importlib/_bootstrap_external.py.
@@ -0,0 +1,58 @@
+package com.chaquo.python;
+
+import java.lang.ref.*;
+import java.nio.*;
+import java.util.*;
+
+
+/** Keeps a Python object alive for as long as a direct ByteBuffer refers to its memory.
+ *
+ * @deprecated Internal use in buffer.pxi */
+public class DirectBufferOwner extends PhantomReference<ByteBuffer> {
+    private static final ReferenceQueue<ByteBuffer> queue = new ReferenceQueue<>();
+
+    // PhantomReferences must themselves be reachable in order to be enqueued.
+    private static final Set<DirectBufferOwner> owners = new HashSet<>();
+
+    // Closes each owner as soon as its buffer has been collected, even if register is never
+    // called again.
+    static {
+        Thread thread = new Thread("DirectBufferOwner") {
+            @Override public void run() {
+                while (true) {
+                    DirectBufferOwner ref;
+                    try {
+                        ref = (DirectBufferOwner) queue.remove();
+                    } catch (InterruptedException e) {
+                        continue;
+                    }
+                    synchronized (owners) {
+                        owners.remove(ref);
+                    }
+
+                    // Don't take the GIL within the lock (see PyObject.close).
+                    ref.owner.close();
+                    ref.owner = null;
+                }
+            }
+        };
+        thread.setDaemon(true);
+        thread.start();
+    }
+
+    private PyObject owner;
+
+    private DirectBufferOwner(ByteBuffer buffer, PyObject owner) {
+        super(buffer, queue);
+        this.owner = owner;
+    }
+
+    /** Returns the given buffer, after arranging for the owner to be closed once the buffer
+     * has been garbage-collected. */
+    public static ByteBuffer register(ByteBuffer buffer, PyObject owner) {
+        synchronized (owners) {
+            owners.add(new DirectBufferOwner(buffer, owner));
+        }
+        return buffer;
+    }
+}
@@ -0,0 +1,93 @@
+package com.chaquo.python;
+
+import com.chaquo.python.internal.*;
+import java.io.*;
+import java.util.*;
+
+
+/** Member names, JNI signatures and modifiers of the classes listed in the Gradle
+ * reflectionIndex setting. These are generated at build time, so Reflector can look them up
+ * without calling the reflection API.
+ *
+ * @deprecated Internal use in Reflector and AndroidPlatform. */
+public class ReflectionIndex {
+
+    // Maps each class name to a map of member names to member descriptions. See
+    // Reflector.getIndexedMember for the format.
+    private static Map<String, Map<String, String[]>> classes = Collections.emptyMap();
+
+    /** Replaces the current index with the one read from the given stream. Classes from the
+     * Android framework will only be used if apiLevel is no higher than the API level
+     * they were indexed from, because newer API levels may have added members. */
+    public static void load(InputStream stream, int apiLevel) throws IOException {
+        DataInputStream in = new DataInputStream(new BufferedInputStream(stream));
+        if (in.readInt() != Common.REFLECTION_INDEX_MAGIC) {
+            throw new IOException("Invalid reflection index");
+        }
+        int version = in.readInt();
+        if (version != Common.REFLECTION_INDEX_VERSION) {
+            throw new IOException("Unsupported reflection index version " + version);
+        }
+        int platformApiLevel = in.readInt();
+
+        String[] strings = new String[in.readInt()];
+        for (int i = 0; i < strings.length; i++) {
+            strings[i] = in.readUTF();
+        }
+
+        Map<String, Map<String, String[]>> newClasses = new HashMap<>();
+        int classCount = in.readInt();
+        for (int i = 0; i < classCount; i++) {
+            String className = strings[in.readInt()];
+            boolean platform = in.readBoolean();
+            Map<String, List<String>> methods = new HashMap<>();
+            Map<String, String> fields = new HashMap<>();
+            Map<String, String> nested = new HashMap<>();
+
+            int memberCount = in.readInt();
+            for (int j = 0; j < memberCount; j++) {
+                char kind = (char) in.readByte();
+                String name = strings[in.readInt()];
+                String member = kind + " " + in.readInt() + " " + strings[in.readInt()];
+                if (kind == 'M') {
+                    List<String> overloads = methods.get(name);
+                    if (overloads == null) {
+                        overloads = new ArrayList<>();
+                        methods.put(name, overloads);
+                    }
+                    overloads.add(member);
+                } else if (kind == 'F') {
+                    fields.put(name, member);
+                } else if (kind == 'C') {
+                    nested.put(name, member);
+                } else {
+                    throw new IOException("Invalid member kind '" + kind + "'");
+                }
+            }
+            if (platform && apiLevel > platformApiLevel) continue;
+
+            // Where a name is used by more than one kind of member, the precedence is the
+            // same as in class.pxi's find_member.
+            Map<String, String[]> members = new HashMap<>();
+            for (Map.Entry<String, String> entry : nested.entrySet()) {
+                members.put(entry.getKey(), new String[] { entry.getValue() });
+            }
+            for (Map.Entry<String, String> entry : fields.entrySet()) {
+                members.put(entry.getKey(), new String[] { entry.getValue() });
+            }
+            for (Map.Entry<String, List<String>> entry : methods.entrySet()) {
+                members.put(entry.getKey(), entry.getValue().toArray(new String[0]));
+            }
+            newClasses.put(className, members);
+        }
+
+        synchronized (ReflectionIndex.class) {
+            classes = newClasses;
+        }
+    }
+
+    /** Returns the members of the given class, or null if it isn't indexed. */
+    static synchronized Map<String, String[]> get(String className) {
+        return classes.get(className);
+    }
+}
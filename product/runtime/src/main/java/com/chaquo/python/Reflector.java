@@ -1,5 +1,6 @@
 package com.chaquo.python;
 
+import java.lang.ref.*;
 import java.lang.reflect.*;
 import java.util.*;
 
@@ -9,66 +10,158 @@ import java.util.*;
  * @deprecated internal use in class.pxi. */
 public class Reflector {
 
+    // Rough number of bytes retained by each loaded member, including its entry in Tables.
+    private static final int MEMBER_BYTES = 128;
+
+    // Reflectors are held weakly, so they can be collected along with their classes once
+    // Python no longer refers to them.
+    private static final Map<Class<?>, WeakReference<Reflector>> instances =
+        new WeakHashMap<>();
+
+    // Reflectors whose Tables are loaded, in order of least recent use. The number of entries
+    // is bounded by maxLoaded, and all of these fields are protected by the `loaded` lock.
+    private static final LinkedHashMap<Reflector, Boolean> loaded =
+        new LinkedHashMap<>(16, 0.75f, true);
+    private static int maxLoaded = 512;
+    private static long hits, misses, loadedBytes;
+
     private final Class<?> klass;
-    private Map<String,Member> methods;               // We target Java 7, so we can't use
-    private Map<String,List<Member>> multipleMethods; // java.lang.reflect.Executable.
-    private Map<String,Field> fields;
-    private Map<String,Class<?>> classes;
+    private Map<String,String[]> index;  // See ReflectionIndex.
 
-    private static Map<Class<?>, Reflector> instances = new HashMap<>();
+    // Evicting the tables only needs the `loaded` lock, not the Reflector's own lock, so any
+    // method which uses them must read this field only once.
+    private volatile Tables tables;
+    private long bytes;  // Protected by the `loaded` lock.
+
+    private static class Tables {
+        Map<String,Member> methods;               // We target Java 7, so we can't use
+        Map<String,List<Member>> multipleMethods; // java.lang.reflect.Executable.
+        Map<String,Field> fields;
+        Map<String,Class<?>> classes;
+    }
 
     public static Reflector getInstance(Class<?> klass) {
-        Reflector reflector = instances.get(klass);
-        if (reflector != null) {
+        synchronized (instances) {
+            WeakReference<Reflector> ref = instances.get(klass);
+            Reflector reflector = (ref != null) ? ref.get() : null;
+            if (reflector == null) {
+                reflector = new Reflector(klass);
+                instances.put(klass, new WeakReference<>(reflector));
+            }
             return reflector;
         }
-        reflector = new Reflector(klass);
-        instances.put(klass, reflector);
-        return reflector;
+    }
+
+    /** Sets the maximum number of classes whose members are kept loaded. */
+    public static void setCacheSize(int maxsize) {
+        if (maxsize < 0) {
+            throw new IllegalArgumentException("Invalid cache size: " + maxsize);
+        }
+        synchronized (loaded) {
+            maxLoaded = maxsize;
+            evict();
+        }
+    }
+
+    /** Returns the number of hits, misses, the maximum and current number of classes with
+     * loaded members, the total number of Reflectors, and the estimated number of bytes
+     * retained by the loaded members. */
+    public static long[] getCacheInfo() {
+        int classes = 0;
+        synchronized (instances) {
+            for (WeakReference<Reflector> ref : instances.values()) {
+                if (ref.get() != null) classes++;
+            }
+        }
+        synchronized (loaded) {
+            return new long[] {hits, misses, maxLoaded, loaded.size(), classes, loadedBytes};
+        }
     }
 
     private Reflector(Class<?> klass) {
         this.klass = klass;
+        this.index = ReflectionIndex.get(klass.getName());
+    }
+
+    public synchronized boolean isIndexed() {
+        return index != null;
+    }
+
+    /** Returns the descriptions of all members with the given name, or an empty array if
+     * there are none. Each description is a string containing the following fields,
+     * separated by spaces:
+     *
+     * <ul>
+     * <li>'M' for a method or constructor, 'F' for a field, or 'C' for a nested class.</li>
+     * <li>The access flags from the class file.</li>
+     * <li>The JNI signature, or for a nested class, its name as returned by
+     *     Class.getName.</li>
+     * </ul>
+     *
+     * Like with the other methods of this class, there will only be one kind of member in the
+     * result. Returns null if this class isn't indexed. */
+    public synchronized String[] getIndexedMember(String name) {
+        if (index == null) return null;
+        String[] result = index.get(name);
+        return (result != null) ? result : new String[0];
+    }
+
+    /** Called when the index doesn't match the class which was actually loaded. All further
+     * lookups will use reflection. */
+    public synchronized void rejectIndex() {
+        index = null;
     }
 
     public synchronized String[] dir() {
-        if (methods == null) loadMethods();
-        if (fields == null) loadFields();
-        if (classes == null) loadClasses();
+        if (index != null) {
+            return index.keySet().toArray(new String[0]);
+        }
         Set<String> names = new HashSet<>();
-        names.addAll(methods.keySet());
-        names.addAll(multipleMethods.keySet());
-        names.addAll(fields.keySet());
-        names.addAll(classes.keySet());
+        Tables t = loadMethods();
+        names.addAll(t.methods.keySet());
+        names.addAll(t.multipleMethods.keySet());
+        names.addAll(loadFields().fields.keySet());
+        names.addAll(loadClasses().classes.keySet());
         return names.toArray(new String[0]);
     }
 
     public synchronized Member[] getMethods(String name) {
-        if (methods == null) loadMethods();
-        List<Member> list = multipleMethods.get(name);
+        Tables t = loadMethods();
+        List<Member> list = t.multipleMethods.get(name);
         if (list != null) {
             return list.toArray(new Member[0]);
         }
-        Member method = methods.get(name);
+        Member method = t.methods.get(name);
         if (method != null) {
             return new Member[] { method };
         }
         return null;
     }
 
-    private void loadMethods() {
-        methods = new HashMap<>();
-        multipleMethods = new HashMap<>();
-        for (Constructor<?> c : klass.getDeclaredConstructors()) {
-            if (isAccessible(c)) {
-                loadMethod(c, "<init>");
+    private Tables loadMethods() {
+        Tables t = getTables();
+        boolean hit = (t.methods != null);
+        int count = 0;
+        if (!hit) {
+            Map<String,Member> methods = new HashMap<>();
+            Map<String,List<Member>> multipleMethods = new HashMap<>();
+            for (Constructor<?> c : klass.getDeclaredConstructors()) {
+                if (isAccessible(c)) {
+                    loadMethod(methods, multipleMethods, c, "<init>");
+                    count++;
+                }
             }
-        }
-        for (Method m : getDeclaredMethods()) {
-            if (isAccessible(m)) {
-                loadMethod(m, m.getName());
+            for (Method m : getDeclaredMethods()) {
+                if (isAccessible(m)) {
+                    loadMethod(methods, multipleMethods, m, m.getName());
+                    count++;
+                }
             }
+            t.methods = methods;
+            t.multipleMethods = multipleMethods;
         }
+        used(t, hit, count);
+        return t;
     }
 
     private Collection<Method> getDeclaredMethods() {
@@ -109,7 +202,8 @@ public class Reflector {
         return result;
     }
 
-    private void loadMethod(Member m, String name) {
+    private void loadMethod(Map<String,Member> methods,
+                            Map<String,List<Member>> multipleMethods, Member m, String name) {
         List<Member> list;
         Member mExisting = methods.remove(name);
         if (mExisting != null) {
@@ -125,17 +219,25 @@ public class Reflector {
     }
 
     public synchronized Field getField(String name) {
-        if (fields == null) loadFields();
-        return fields.get(name);
+        return loadFields().fields.get(name);
     }
 
-    private void loadFields() {
-        fields = new HashMap<>();
-        for (Field f : getDeclaredFields()) {
-            if (isAccessible(f)) {
-                fields.put(f.getName(), f);
+    private Tables loadFields() {
+        Tables t = getTables();
+        boolean hit = (t.fields != null);
+        int count = 0;
+        if (!hit) {
+            Map<String,Field> fields = new HashMap<>();
+            for (Field f : getDeclaredFields()) {
+                if (isAccessible(f)) {
+                    fields.put(f.getName(), f);
+                    count++;
+                }
             }
+            t.fields = fields;
         }
+        used(t, hit, count);
+        return t;
     }
 
     private Collection<Field> getDeclaredFields() {
@@ -163,18 +265,63 @@ public class Reflector {
     }
 
     public synchronized Class<?> getNestedClass(String name) {
-        if (classes == null) loadClasses();
-        return classes.get(name);
+        return loadClasses().classes.get(name);
+    }
+
+    private Tables loadClasses() {
+        Tables t = getTables();
+        boolean hit = (t.classes != null);
+        int count = 0;
+        if (!hit) {
+            Map<String,Class<?>> classes = new HashMap<>();
+            for (Class<?> k : klass.getDeclaredClasses()) {
+                if (isAccessible(k.getModifiers())) {
+                    String simpleName = k.getSimpleName();
+                    if (simpleName.isEmpty()) continue;   // Anonymous class
+                    classes.put(simpleName, k);
+                    count++;
+                }
+            }
+            t.classes = classes;
+        }
+        used(t, hit, count);
+        return t;
     }
 
-    private void loadClasses() {
-        classes = new HashMap<>();
-        for (Class<?> k : klass.getDeclaredClasses()) {
-            if (isAccessible(k.getModifiers())) {
-                String simpleName = k.getSimpleName();
-                if (simpleName.isEmpty()) continue;   // Anonymous class
-                classes.put(simpleName, k);
+    private Tables getTables() {
+        Tables t = tables;
+        if (t == null) {
+            t = tables = new Tables();
+        }
+        return t;
+    }
+
+    // Records a lookup in the given tables, where `count` is the number of members which were
+    // loaded to satisfy it.
+    private void used(Tables t, boolean hit, int count) {
+        synchronized (loaded) {
+            if (hit) {
+                hits++;
+            } else {
+                misses++;
             }
+            if (tables != t) return;  // Evicted by another thread in the meantime.
+            bytes += (long) count * MEMBER_BYTES;
+            loadedBytes += (long) count * MEMBER_BYTES;
+            loaded.put(this, Boolean.TRUE);
+            evict();
+        }
+    }
+
+    // Must be called with the `loaded` lock.
+    private static void evict() {
+        Iterator<Reflector> it = loaded.keySet().iterator();
+        while (loaded.size() > maxLoaded) {
+            Reflector eldest = it.next();
+            it.remove();
+            eldest.tables = null;
+            loadedBytes -= eldest.bytes;
+            eldest.bytes = 0;
         }
     }
 
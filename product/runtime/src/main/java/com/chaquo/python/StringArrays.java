@@ -0,0 +1,39 @@
+package com.chaquo.python;
+
+
+/** Converts between String arrays and a single String, so the elements can be transferred to
+ * and from Python without a separate JNI call for each one.
+ *
+ * Each element of `ends` is the offset in the joined String where the corresponding array
+ * element ends, or -1 if the element is null.
+ *
+ * @deprecated Internal use in array.pxi */
+public class StringArrays {
+
+    public static void split(String[] array, String joined, int[] ends) {
+        int start = 0;
+        for (int i = 0; i < ends.length; i++) {
+            int end = ends[i];
+            if (end < 0) {
+                array[i] = null;
+            } else {
+                array[i] = joined.substring(start, end);
+                start = end;
+            }
+        }
+    }
+
+    public static String join(String[] array, int start, int[] ends) {
+        StringBuilder sb = new StringBuilder();
+        for (int i = 0; i < ends.length; i++) {
+            String s = array[start + i];
+            if (s == null) {
+                ends[i] = -1;
+            } else {
+                sb.append(s);
+                ends[i] = sb.length();
+            }
+        }
+        return sb.toString();
+    }
+}
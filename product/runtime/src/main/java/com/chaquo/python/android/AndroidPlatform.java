@@ -68,6 +68,7 @@ public class AndroidPlatform extends Python.Platform {
             String buildJsonPath = Common.ASSET_DIR + "/" + Common.ASSET_BUILD_JSON;
             buildJson = new JSONObject(streamToString(am.open(buildJsonPath)));
             loadNativeLibs();
+            loadReflectionIndex();
         } catch (IOException | JSONException e) {
             throw new RuntimeException(e);
         }
@@ -276,4 +277,17 @@ public class AndroidPlatform extends Python.Platform {
         System.loadLibrary("chaquopy_java");
     }
 
+    private void loadReflectionIndex() throws IOException, JSONException {
+        // Only present if the reflectionIndex setting is used.
+        if (buildJson.getJSONObject("assets").has(Common.ASSET_REFLECTION_INDEX)) {
+            InputStream stream = am.open(Common.ASSET_DIR + "/" +
+                                         Common.ASSET_REFLECTION_INDEX);
+            try {
+                ReflectionIndex.load(stream, Build.VERSION.SDK_INT);
+            } finally {
+                stream.close();
+            }
+        }
+    }
+
 }
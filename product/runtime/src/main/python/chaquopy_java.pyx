@@ -506,10 +506,9 @@ cdef class SavedException(object):
 
 
 # This is broken out into a separate method to make sure all of its local `jclass` and `jarray`
-# proxy objects are destroyed before JNIEnv.Throw is called. This is necessary because removal
-# from instance_cache calls JNIRef.__hash__, which may call Object.identityHashCode, which
-# Android's CheckJNI will not allow with an exception pending. Caching the hash code should
-# reduce the risk of this, but I'm not totally confident that it covers all cases.
+# proxy objects are destroyed before JNIEnv.Throw is called. Removal from instance_cache now
+# only deletes a GlobalRef, which is allowed with an exception pending, but a destructor could
+# still call other JNI functions, which Android's CheckJNI will not allow.
 #
 # If java_cls_name is not None, this function returns a new Java exception of that class.
 # Otherwise, if exc_info refers to a Java exception, it will be returned with a modified stack
@@ -27,13 +27,22 @@ from pkgutil import extend_path
 __path__ = extend_path(__path__, __name__)
 
 from .chaquopy import (cast, chaquopy_init, detach, jarray, jclass, set_import_enabled,
-                       dynamic_proxy, static_proxy, constructor, method, Override)
+                       add_java_packages,
+                       set_gil_policy, set_release_gil,
+                       cache_string, set_string_cache_size, string_cache_info,
+                       set_reflection_cache_size, reflection_cache_info, preload, PreloadTask,
+                       dynamic_proxy, static_proxy, constructor, method, Override,
+                       direct_buffer)
 from .primitive import jvoid, jboolean, jbyte, jshort, jint, jlong, jfloat, jdouble, jchar
 
 # This is the public API.
 __all__ = [
-    "cast", "detach", "jarray", "jclass", "set_import_enabled",
+    "cast", "detach", "jarray", "jclass", "set_import_enabled", "add_java_packages",
+    "set_gil_policy", "set_release_gil",
+    "cache_string", "set_string_cache_size", "string_cache_info",
+    "set_reflection_cache_size", "reflection_cache_info", "preload", "PreloadTask",
     "dynamic_proxy", "static_proxy", "constructor", "method", "Override",
+    "direct_buffer",
     "jvoid", "jboolean", "jbyte", "jshort", "jint", "jlong", "jfloat", "jdouble", "jchar",
 ]
 
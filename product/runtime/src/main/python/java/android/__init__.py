@@ -5,13 +5,26 @@ import traceback
 from types import ModuleType
 import warnings
 from . import importer
+from java.chaquopy import add_java_packages, jclass
 
-from org.json import JSONArray, JSONObject
+# The import hook doesn't know about any Java packages until initialize is called.
+JSONArray = jclass("org.json.JSONArray")
+JSONObject = jclass("org.json.JSONObject")
+
+
+# The PreloadTask for the classes listed in the Gradle `preload` setting, or None if there
+# are none.
+preload_task = None
 
 
 def initialize(context_local, build_json_object, app_path):
-    global context
+    global context, preload_task
     context = context_local
+    build_json = convert_json_object(build_json_object)
+    add_java_packages(build_json["java_packages"].split("\n"))
+    if build_json["preload"]:
+        from java import preload
+        preload_task = preload(build_json["preload"])
 
     # Redirect stdout and stderr to logcat - this was upstreamed in Python 3.13.
     if sys.version_info < (3, 13):
@@ -22,7 +35,7 @@ def initialize(context_local, build_json_object, app_path):
         android_log_write.argtypes = (c_int, c_char_p, c_char_p)
         stream.init_streams(android_log_write, stdout_prio=4, stderr_prio=5)
 
-    importer.initialize(context, convert_json_object(build_json_object), app_path)
+    importer.initialize(context, build_json, app_path)
 
     # These are ordered roughly from low to high level.
     for name in [
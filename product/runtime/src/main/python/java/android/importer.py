@@ -29,8 +29,8 @@ sys.modules["pdb"] = types.ModuleType("pdb")
 from java._vendor.elftools.elf.elffile import ELFFile
 del sys.modules["pdb"]
 
-from com.chaquo.python.android import AndroidPlatform
-from com.chaquo.python.internal import Common
+AndroidPlatform = java.chaquopy.jclass("com.chaquo.python.android.AndroidPlatform")
+Common = java.chaquopy.jclass("com.chaquo.python.internal.Common")
 
 if sys.version_info < (3, 11):
     from importlib.abc import Traversable
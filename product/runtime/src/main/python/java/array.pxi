@@ -2,12 +2,16 @@ from collections.abc import Sequence
 import itertools
 
 from cpython cimport Py_buffer
-from cpython.buffer cimport (PyBUF_FORMAT, PyBUF_ANY_CONTIGUOUS, PyBUF_ND, PyBuffer_FillInfo,
-                             PyBuffer_Release, PyObject_CheckBuffer, PyObject_GetBuffer)
-from libc.string cimport memcpy, memset
+from cpython.buffer cimport (PyBUF_FORMAT, PyBUF_ANY_CONTIGUOUS, PyBUF_C_CONTIGUOUS,
+                             PyBUF_F_CONTIGUOUS, PyBUF_ND, PyBUF_STRIDES, PyBUF_WRITABLE,
+                             PyBuffer_FillInfo, PyBuffer_Release,
+                             PyObject_CheckBuffer, PyObject_GetBuffer)
+from libc.limits cimport INT_MAX
+from libc.string cimport memcmp, memcpy, memset
 
 global_class("java.lang.System")
 global_class("java.util.Arrays")
+global_class("com.chaquo.python.StringArrays")
 
 
 # Map each Java array type to a list of buffer format codes it accepts, and an itemsize. The
@@ -38,6 +42,19 @@ BUFFER_FORMATS = {
     # break the principle of "same result as assigning one element at a time".
 }
 
+# Unlike BUFFER_FORMATS, this includes char.
+cdef dict PRIMITIVE_ITEMSIZES = {"Z": 1, "B": 1, "S": 2, "I": 4, "J": 8, "F": 4, "D": 8, "C": 2}
+
+# Iteration reads primitive arrays this many elements at a time with Get...ArrayRegion, rather
+# than making a separate JNI call for every element.
+DEF ARRAY_CHUNK_SIZE = 1024
+DEF STRIDED_REGION_MAX_STEP = 64  # See array_get_strided.
+
+# String arrays of at least this many elements are converted using StringArrays, which
+# transfers all the characters in a single String. For smaller arrays, the overhead of the
+# method call would outweigh the savings.
+DEF STRING_ARRAY_BATCH_MIN = 16
+
 
 cpdef jarray(element_type):
     """Returns a Python class for a Java array type. The element type may be specified as any of:
@@ -49,14 +66,21 @@ cpdef jarray(element_type):
     """
     element_sig = jni_sig(element_type)
     name = "[" + element_sig
-    with class_lock:
-        cls = jclass_cache.get(name)
-        if not cls:
-            base_cls = JavaBufferArray if element_sig in BUFFER_FORMATS else JavaArray
-            cls = ArrayClass(None, (base_cls, Cloneable, Serializable, JavaObject),
-                             {"_chaquopy_name": name})
-            cls._element_sig = element_sig
-        return cls
+    cls = jclass_cache.get(name)  # See comment in jclass.
+    if cls is None:
+        with class_lock:
+            cls = jclass_cache.get(name)
+            if cls is None:
+                if element_sig in BUFFER_FORMATS:
+                    base_cls = JavaBufferArray
+                elif element_sig.startswith("[") and element_sig.lstrip("[") in BUFFER_FORMATS:
+                    base_cls = JavaNestedBufferArray
+                else:
+                    base_cls = JavaArray
+                # _element_sig must be set before the class is added to the cache.
+                cls = ArrayClass(None, (base_cls, Cloneable, Serializable, JavaObject),
+                                 {"_chaquopy_name": name, "_element_sig": element_sig})
+    return cls
 
 
 class ArrayClass(JavaClass):
@@ -78,35 +102,26 @@ cdef class JavaArray:
             self.length, value = len(length_or_value), length_or_value
 
         env = CQPEnv()
-        r = self._element_sig[0]
-        if r == "Z":
-            this = env.NewBooleanArray(self.length)
-        elif r == "B":
-            this = env.NewByteArray(self.length)
-        elif r == "S":
-            this = env.NewShortArray(self.length)
-        elif r == "I":
-            this = env.NewIntArray(self.length)
-        elif r == "J":
-            this = env.NewLongArray(self.length)
-        elif r == "F":
-            this = env.NewFloatArray(self.length)
-        elif r == "D":
-            this = env.NewDoubleArray(self.length)
-        elif r == "C":
-            this = env.NewCharArray(self.length)
-        elif r in "L[":
-            this = env.NewObjectArray(self.length, env.FindClass(self._element_sig))
-        else:
-            raise ValueError(f"Invalid signature '{self._element_sig}'")
-        set_this(self, this.global_ref())
+        set_this(self, array_new(env, self._element_sig, self.length).global_ref())
 
         if value is not None:
             self._init_value(env, value)
 
     def _init_value(self, CQPEnv env, value):
-        for i, v in enumerate(value):
-            array_set(self, i, v)
+        # We just created the array, so unlike array_set, we don't need to check its actual
+        # type.
+        element_sig = self._element_sig
+        this = self._chaquopy_this
+        if element_sig[0] in "L[":
+            if element_sig == "Ljava/lang/String;" and self.length >= STRING_ARRAY_BATCH_MIN:
+                if not isinstance(value, (list, tuple)):
+                    value = list(value)
+                if array_set_strings(self, value):
+                    return
+            array_set_objects(self, env, value)
+        else:
+            for i, v in enumerate(value):
+                array_set_value(env, this, element_sig, i, v)
 
     def __repr__(self):
         return f"{type(self).__name__}({format_array(self)})"
@@ -125,7 +140,7 @@ cdef class JavaArray:
             if r.step == 1:
                 return Arrays.copyOfRange(self, r.start, max(r.start, r.stop))
             else:
-                return type(self)([array_get(self, i) for i in r])
+                return array_get_strided(self, r)
         else:
             return array_get(self, self._int_key(key))
 
@@ -197,10 +212,19 @@ cdef class JavaArray:
     # https://github.com/pandas-dev/pandas/blob/v1.3.2/pandas/_libs/lib.pyx#L1108
     def __contains__(self, value):
         return Sequence.__contains__(self, value)
+    #
+    # The iterators create a new CQPEnv for each chunk, because they may be resumed on a
+    # different thread.
     def __iter__(self):
-        return Sequence.__iter__(self)
+        cdef jsize start
+        for start in range(0, self.length, ARRAY_CHUNK_SIZE):
+            yield from array_get_region(self, CQPEnv(), start,
+                                        min(ARRAY_CHUNK_SIZE, self.length - start))
     def __reversed__(self):
-        return Sequence.__reversed__(self)
+        cdef jsize start, stop
+        for stop in range(self.length, 0, -ARRAY_CHUNK_SIZE):
+            start = max(0, stop - ARRAY_CHUNK_SIZE)
+            yield from reversed(array_get_region(self, CQPEnv(), start, stop - start))
     def index(self, *args, **kwargs):
         return Sequence.index(self, *args, **kwargs)
     def count(self, value):
@@ -272,7 +296,10 @@ cdef class JavaBufferArray(JavaArray):
         elems = array_get_elements(self, env)
         try:
             formats, itemsize = BUFFER_FORMATS[self._element_sig]
-            PyBuffer_FillInfo(buffer, self, elems, self.length * itemsize, 0, flags)
+            # A read-only export can be released without copying anything back, so only
+            # make it writable if the consumer asks for that.
+            PyBuffer_FillInfo(buffer, self, elems, self.length * itemsize,
+                              not (flags & PyBUF_WRITABLE), flags)
             buffer.itemsize = itemsize
             if flags & PyBUF_FORMAT:
                 buffer.format = formats[0]
@@ -283,7 +310,189 @@ cdef class JavaBufferArray(JavaArray):
             raise
 
     def __releasebuffer__(self, Py_buffer *buffer):
-        array_release_elements(self, CQPEnv(), buffer.buf)
+        array_release_elements(self, CQPEnv(), buffer.buf,
+                               JNI_ABORT if buffer.readonly else 0)
+
+    def pinned(self, *, readonly=False):
+        """Returns a context manager which gives direct access to the array's elements as a
+        :any:`memoryview`, for example::
+
+            with a.pinned(readonly=True) as m:
+                total = numpy.asarray(m).sum()
+
+        Unlike `memoryview(a)`, which may copy the elements both when it's created and when
+        it's released, this copies them at most once, or not at all if `readonly` is true.
+        Writing to a read-only view is an error, and in any case changes will not be written
+        back to the array.
+
+        The elements are released when the `with` block exits. If anything is still using the
+        memoryview at that point, e.g. a NumPy array created from it, the elements will not be
+        released until it's finished with them, and a `BufferError` may be raised.
+        """
+        return PinnedArray(self, readonly)
+
+    def __eq__(self, other):
+        if PyObject_CheckBuffer(other):
+            result = array_buffer_eq(self, other)
+            if result is not None:
+                return result
+        return JavaArray.__eq__(self, other)
+
+    __hash__ = None
+
+
+# Multi-dimensional arrays whose innermost element type supports the buffer protocol, such as
+# double[][]. These are converted to and from C-contiguous buffers with one region copy for
+# each innermost row, rather than one Python object for each row or element.
+cdef class JavaNestedBufferArray(JavaArray):
+    def _init_value(self, CQPEnv env, value):
+        cdef Py_buffer buffer
+        memset(&buffer, 0, sizeof(buffer))
+        try:
+            if not PyObject_CheckBuffer(value):
+                raise BufferError("object does not support the buffer protocol")
+            try:
+                PyObject_GetBuffer(value, &buffer, PyBUF_FORMAT|PyBUF_C_CONTIGUOUS)
+            except ValueError as e:  # See comment in JavaBufferArray._init_value.
+                raise BufferError(str(e))
+
+            sig = "[" + self._element_sig
+            leaf_sig = sig.lstrip("[")
+            ndim = len(sig) - len(leaf_sig)
+            formats, itemsize = BUFFER_FORMATS[leaf_sig]
+            if not (buffer.format in formats and buffer.itemsize == itemsize):
+                raise BufferError(f"Java array type {leaf_sig} does not accept "
+                                  f"format={buffer.format}, itemsize={buffer.itemsize}")
+            if buffer.ndim != ndim:
+                raise BufferError(f"object has {buffer.ndim} dimensions, expected {ndim}")
+            if buffer.shape[0] != self.length:
+                raise BufferError(f"got {buffer.shape[0]} elements, expected {self.length}")
+            array_nested_set(env, self._chaquopy_this, sig, &buffer, 0, 0)
+        except BufferError:
+            # As in JavaBufferArray, fall back on assigning one element at a time. Each
+            # element is a row, which may still be converted from a buffer.
+            super()._init_value(env, value)
+        finally:
+            if <PyObject*>buffer.obj != NULL:
+                PyBuffer_Release(&buffer)
+
+    # Unlike JavaBufferArray, this exports a read-only copy of the elements, because they're
+    # spread across many Java objects. The array must be rectangular and contain no nulls.
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        env = CQPEnv()
+        sig = "[" + self._element_sig
+        leaf_sig = sig.lstrip("[")
+        cdef int ndim = len(sig) - len(leaf_sig)
+        formats, itemsize = BUFFER_FORMATS[leaf_sig]
+        if ndim > 1 and (flags & PyBUF_F_CONTIGUOUS == PyBUF_F_CONTIGUOUS):
+            raise BufferError("multi-dimensional Java array can only be exported in C order")
+
+        # The shape and strides are stored together in `internal`.
+        cdef Py_ssize_t *shape = <Py_ssize_t*>PyMem_Malloc(2 * ndim * sizeof(Py_ssize_t))
+        if shape == NULL:
+            raise MemoryError()
+        cdef Py_ssize_t *strides = shape + ndim
+        cdef char *data = NULL
+        cdef int i
+        try:
+            shape[0] = self.length
+            row = self._chaquopy_this
+            for i in range(1, ndim):
+                if shape[i - 1] == 0:
+                    shape[i] = 0
+                else:
+                    row = env.GetObjectArrayElement(row, 0)
+                    if not row:
+                        raise BufferError("array contains null")
+                    shape[i] = env.GetArrayLength(row)
+            strides[ndim - 1] = itemsize
+            for i in range(ndim - 1, 0, -1):
+                strides[i - 1] = strides[i] * shape[i]
+
+            data = <char*>PyMem_Malloc(strides[0] * shape[0])
+            if data == NULL:
+                raise MemoryError()
+            array_nested_get(env, self._chaquopy_this, sig, ndim, shape, data, 0, 0)
+            PyBuffer_FillInfo(buffer, self, data, strides[0] * shape[0], 1, flags)
+        except:
+            PyMem_Free(data)
+            PyMem_Free(shape)
+            raise
+        buffer.itemsize = itemsize
+        buffer.internal = shape
+        if flags & PyBUF_FORMAT:
+            buffer.format = formats[0]
+        if flags & PyBUF_ND:
+            buffer.ndim = ndim
+            buffer.shape = shape
+        if flags & PyBUF_STRIDES == PyBUF_STRIDES:
+            buffer.strides = strides
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        PyMem_Free(buffer.buf)
+        PyMem_Free(buffer.internal)
+
+
+# no_gc_clear ensures `array` is still available in __dealloc__.
+@cython.final
+@cython.no_gc_clear
+cdef class PinnedArray(object):
+    cdef JavaBufferArray array
+    cdef bint readonly
+    cdef void *elems
+    cdef int exports
+    cdef bint entered
+    cdef bint exited
+    cdef object view
+
+    def __init__(self, JavaBufferArray array, readonly):
+        self.array = array
+        self.readonly = readonly
+
+    def __enter__(self):
+        if self.entered:
+            raise ValueError("a pinned array can only be used once")
+        self.entered = True
+        self.elems = array_get_elements(self.array, CQPEnv())
+        self.view = memoryview(self)
+        return self.view
+
+    def __exit__(self, *exc_info):
+        self.exited = True
+        view, self.view = self.view, None
+        try:
+            view.release()  # Calls __releasebuffer__, unless there are derived views.
+        except BufferError:
+            raise BufferError("pinned array was still in use at the end of the with block")
+
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        if self.elems == NULL:
+            raise BufferError("pinned array is not in use")
+        formats, itemsize = BUFFER_FORMATS[self.array._element_sig]
+        PyBuffer_FillInfo(buffer, self, self.elems, self.array.length * itemsize,
+                          self.readonly, flags)
+        buffer.itemsize = itemsize
+        if flags & PyBUF_FORMAT:
+            buffer.format = formats[0]
+        if flags & PyBUF_ND:
+            buffer.shape = &self.array.length
+        self.exports += 1
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        self.exports -= 1
+        if self.exited and self.exports == 0:
+            self.release(CQPEnv())
+
+    def __dealloc__(self):
+        if self.elems != NULL:
+            self.release(CQPEnv())
+
+    cdef release(self, CQPEnv env):
+        if self.elems == NULL:
+            return
+        array_release_elements(self.array, env, self.elems,
+                               JNI_ABORT if self.readonly else 0)
+        self.elems = NULL
 
 
 cdef array_get(self, jint index):
@@ -311,12 +520,224 @@ cdef array_get(self, jint index):
     else:
         raise ValueError(f"Invalid signature '{self._element_sig}'")
 
-cdef array_set(self, jint index, value):
+# Returns a list of the elements in the given range, which must be no longer than
+# ARRAY_CHUNK_SIZE.
+cdef list array_get_region(self, CQPEnv env, jsize start, jsize length):
+    cdef JNIRef this = self._chaquopy_this
+    cdef jlong buf[ARRAY_CHUNK_SIZE]  # Large and aligned enough for any primitive type.
+    cdef jsize i
+    r = self._element_sig[0]
+    if r == "Z":
+        env.GetBooleanArrayRegion(this, start, length, <jboolean*>buf)
+        return [(<jboolean*>buf)[i] != 0 for i in range(length)]
+    elif r == "B":
+        env.GetByteArrayRegion(this, start, length, <jbyte*>buf)
+        return [(<jbyte*>buf)[i] for i in range(length)]
+    elif r == "S":
+        env.GetShortArrayRegion(this, start, length, <jshort*>buf)
+        return [(<jshort*>buf)[i] for i in range(length)]
+    elif r == "I":
+        env.GetIntArrayRegion(this, start, length, <jint*>buf)
+        return [(<jint*>buf)[i] for i in range(length)]
+    elif r == "J":
+        env.GetLongArrayRegion(this, start, length, buf)
+        return [buf[i] for i in range(length)]
+    elif r == "F":
+        env.GetFloatArrayRegion(this, start, length, <jfloat*>buf)
+        return [(<jfloat*>buf)[i] for i in range(length)]
+    elif r == "D":
+        env.GetDoubleArrayRegion(this, start, length, <jdouble*>buf)
+        return [(<jdouble*>buf)[i] for i in range(length)]
+    elif r == "C":
+        env.GetCharArrayRegion(this, start, length, <jchar*>buf)
+        return [chr((<jchar*>buf)[i]) for i in range(length)]
+    elif r in "L[":
+        if self._element_sig == "Ljava/lang/String;" and length >= STRING_ARRAY_BATCH_MIN:
+            result = array_get_strings(self, start, length)
+            if result is not None:
+                return result
+        return [j2p(env.j_env, env.GetObjectArrayElement(this, start + i))
+                for i in range(length)]
+    else:
+        raise ValueError(f"Invalid signature '{self._element_sig}'")
+
+# Returns a list of the elements in the given range of a String array, or None if they can't
+# be converted in a single String because of surrogate pairs, whose length is different in
+# Java and Python.
+cdef array_get_strings(self, jsize start, jsize length):
+    global StringArrays
+    j_ends = jarray("I")(length)
+    joined = StringArrays.join(self, start, j_ends)
+    cdef list result = []
+    cdef jsize prev_end = 0
+    for end in j_ends:
+        if end < 0:
+            result.append(None)
+        else:
+            result.append(joined[prev_end:end])
+            prev_end = end
+    return result if prev_end == len(joined) else None
+
+# Returns a new array of the same type containing the elements in the given range, which must
+# have a step other than 1. Elements are copied directly, without converting them to Python
+# objects and back again.
+cdef array_get_strided(self, r):
     env = CQPEnv()
     cdef JNIRef this = self._chaquopy_this
+    cdef jsize length = len(r)
+    cdef jsize start = r.start
+    cdef jsize step = r.step
+    cdef jsize i
+    result = type(self)(length)
+    cdef JNIRef result_this = result._chaquopy_this
+    if length == 0:
+        return result
+
+    element_r = self._element_sig[0]
+    if element_r in "L[":
+        for i in range(length):
+            env.SetObjectArrayElement(result_this, i,
+                                      env.GetObjectArrayElement(this, start + i * step))
+        return result
+
+    # Read the source in regions of at most ARRAY_CHUNK_SIZE, each of which begins and ends
+    # with a selected element, so the elements outside the slice are never copied. With a
+    # large step, it's faster to read each element separately than to copy all the elements
+    # in between.
+    cdef int itemsize = PRIMITIVE_ITEMSIZES[element_r]
+    cdef jlong chunk[ARRAY_CHUNK_SIZE]  # Large and aligned enough for any primitive type.
+    cdef jsize abs_step = abs(step)
+    cdef jsize per_chunk = (1 if abs_step > STRIDED_REGION_MAX_STEP
+                            else (ARRAY_CHUNK_SIZE - 1) // abs_step + 1)
+    cdef jsize n, j, chunk_start
+    cdef char *buf = <char*>PyMem_Malloc(length * itemsize)
+    if buf == NULL:
+        raise MemoryError()
+    try:
+        i = 0
+        while i < length:
+            n = min(per_chunk, length - i)
+            chunk_start = start + i * step
+            if step < 0:
+                chunk_start -= (n - 1) * abs_step
+            array_copy_to_buffer(env, self._element_sig, this, (n - 1) * abs_step + 1, chunk,
+                                 chunk_start)
+            for j in range(n):
+                memcpy(buf + (i + j) * itemsize,
+                       <char*>chunk + (start + (i + j) * step - chunk_start) * itemsize,
+                       itemsize)
+            i += n
+        array_set_elements(result, env, buf)
+    finally:
+        PyMem_Free(buf)
+    return result
+
+# Returns whether the array has the same values as the given buffer, or None if the buffer
+# can't be compared directly. As in element assignment, a Java byte[] isn't considered equal
+# to an unsigned buffer.
+cdef array_buffer_eq(JavaBufferArray self, other):
+    cdef Py_buffer buffer
+    cdef Py_ssize_t i
+    cdef void *elems
+    cdef bint result
+    memset(&buffer, 0, sizeof(buffer))
+    try:
+        PyObject_GetBuffer(other, &buffer, PyBUF_FORMAT|PyBUF_ANY_CONTIGUOUS)
+    except (BufferError, ValueError):  # See comment in JavaBufferArray._init_value.
+        return None
+    try:
+        formats, itemsize = BUFFER_FORMATS[self._element_sig]
+        if not (buffer.format in formats and buffer.format != b"B" and
+                buffer.itemsize == itemsize and buffer.ndim == 1):
+            return None
+        if buffer.shape[0] != self.length:
+            return False
+
+        env = CQPEnv()
+        elems = array_get_elements(self, env)
+        r = self._element_sig[0]
+        if r == "F":
+            # Use floating-point comparison, so that 0.0 == -0.0 and NaN != NaN, as in Python.
+            result = True
+            for i in range(self.length):
+                if (<jfloat*>elems)[i] != (<jfloat*>buffer.buf)[i]:
+                    result = False
+                    break
+        elif r == "D":
+            result = True
+            for i in range(self.length):
+                if (<jdouble*>elems)[i] != (<jdouble*>buffer.buf)[i]:
+                    result = False
+                    break
+        else:
+            result = memcmp(elems, buffer.buf, self.length * itemsize) == 0
+        array_release_elements(self, env, elems, JNI_ABORT)
+        return result
+    finally:
+        PyBuffer_Release(&buffer)
+
+# Sets the elements of a new String array, whose length must be at least
+# STRING_ARRAY_BATCH_MIN. Returns False if the values can't be converted in a single String,
+# in which case no elements are set.
+cdef bint array_set_strings(JavaArray self, value) except -1:
+    global StringArrays
+    cdef JavaArray j_ends = None
+    cdef Py_ssize_t end = 0
+    cdef jint *ends = <jint*>PyMem_Malloc(self.length * sizeof(jint))
+    if ends == NULL:
+        raise MemoryError()
+    try:
+        for i, v in enumerate(value):
+            if v is None:
+                ends[i] = -1
+                continue
+            # Strings containing surrogates are excluded for the same reason as in
+            # array_get_strings, and also because new_string replaces lone surrogates.
+            if not isinstance(v, unicode):
+                return False
+            kind = PyUnicode_KIND(v)
+            if not (kind == PyUnicode_1BYTE_KIND or
+                    (kind == PyUnicode_2BYTE_KIND and
+                     not chaquopy_ucs2_has_surrogates(PyUnicode_2BYTE_DATA(v), len(v)))):
+                return False
+            end += len(v)
+            if end > INT_MAX:  # jint is always 32 bits.
+                return False
+            ends[i] = end
+        j_ends = jarray("I")(self.length)
+        array_set_elements(j_ends, CQPEnv(), ends)
+    finally:
+        PyMem_Free(ends)
+    StringArrays.split(self, "".join([v for v in value if v is not None]), j_ends)
+    return True
+
+# Sets the elements of a new object array, which are converted by p2j with its declared
+# element type.
+cdef array_set_objects(JavaArray self, CQPEnv env, value):
+    cdef JNIRef this = self._chaquopy_this
+    element_sig = self._element_sig
+
+    # Java classes whose instances have already been found to be assignable to the element
+    # type, so they don't need to go through p2j again.
+    cdef set assignable = set()
+    for i, v in enumerate(value):
+        cls = type(v)
+        if cls in assignable:
+            value_p2j = v._chaquopy_this
+        else:
+            value_p2j = p2j(env.j_env, element_sig, v)
+            if isinstance(v, JavaObject) and value_p2j is v._chaquopy_this:
+                assignable.add(cls)
+        env.SetObjectArrayElement(this, i, value_p2j)
+
+cdef array_set(self, jint index, value):
+    env = CQPEnv()
     # Android's JVM doesn't type-check SetObjectArrayElement calls before API level 16,
     # so we need to check against the actual array type.
-    element_sig = object_sig(env, this)[1:]
+    array_set_value(env, self._chaquopy_this, object_sig(env, self._chaquopy_this)[1:], index,
+                    value)
+
+cdef array_set_value(CQPEnv env, JNIRef this, element_sig, jint index, value):
     value_p2j = p2j(env.j_env, element_sig, value)
     r = element_sig[0]
     if r == "Z":
@@ -363,48 +784,141 @@ cdef void *array_get_elements(self, CQPEnv env) except NULL:
         raise ValueError(f"Invalid signature '{self._element_sig}'")
 
 
-cdef array_release_elements(self, CQPEnv env, void *elems):
+cdef array_release_elements(self, CQPEnv env, void *elems, jint mode=0):
     r = self._element_sig[0]
     if r == "Z":
-        env.ReleaseBooleanArrayElements(self._chaquopy_this, <jboolean*>elems, 0)
+        env.ReleaseBooleanArrayElements(self._chaquopy_this, <jboolean*>elems, mode)
     elif r == "B":
-        env.ReleaseByteArrayElements(self._chaquopy_this, <jbyte*>elems, 0)
+        env.ReleaseByteArrayElements(self._chaquopy_this, <jbyte*>elems, mode)
     elif r == "S":
-        env.ReleaseShortArrayElements(self._chaquopy_this, <jshort*>elems, 0)
+        env.ReleaseShortArrayElements(self._chaquopy_this, <jshort*>elems, mode)
     elif r == "I":
-        env.ReleaseIntArrayElements(self._chaquopy_this, <jint*>elems, 0)
+        env.ReleaseIntArrayElements(self._chaquopy_this, <jint*>elems, mode)
     elif r == "J":
-        env.ReleaseLongArrayElements(self._chaquopy_this, <jlong*>elems, 0)
+        env.ReleaseLongArrayElements(self._chaquopy_this, <jlong*>elems, mode)
     elif r == "F":
-        env.ReleaseFloatArrayElements(self._chaquopy_this, <jfloat*>elems, 0)
+        env.ReleaseFloatArrayElements(self._chaquopy_this, <jfloat*>elems, mode)
     elif r == "D":
-        env.ReleaseDoubleArrayElements(self._chaquopy_this, <jdouble*>elems, 0)
+        env.ReleaseDoubleArrayElements(self._chaquopy_this, <jdouble*>elems, mode)
     elif r == "C":
-        env.ReleaseCharArrayElements(self._chaquopy_this, <jchar*>elems, 0)
+        env.ReleaseCharArrayElements(self._chaquopy_this, <jchar*>elems, mode)
     else:
         raise ValueError(f"Invalid signature '{self._element_sig}'")
 
 
-cdef array_set_elements(JavaBufferArray self, CQPEnv env, void *elems):
-    r = self._element_sig[0]
+cdef array_set_elements(JavaArray self, CQPEnv env, void *elems):
+    array_copy_from_buffer(env, self._element_sig, self._chaquopy_this, self.length, elems)
+
+
+# Creates a new array with the given element type.
+cdef LocalRef array_new(CQPEnv env, element_sig, length):
+    r = element_sig[0]
+    if r == "Z":
+        return env.NewBooleanArray(length)
+    elif r == "B":
+        return env.NewByteArray(length)
+    elif r == "S":
+        return env.NewShortArray(length)
+    elif r == "I":
+        return env.NewIntArray(length)
+    elif r == "J":
+        return env.NewLongArray(length)
+    elif r == "F":
+        return env.NewFloatArray(length)
+    elif r == "D":
+        return env.NewDoubleArray(length)
+    elif r == "C":
+        return env.NewCharArray(length)
+    elif r in "L[":
+        return env.NewObjectArray(length, env.FindClass(element_sig))
+    else:
+        raise ValueError(f"Invalid signature '{element_sig}'")
+
+
+# Copies `length` elements of a primitive array to or from a buffer. When copying to a buffer,
+# the elements may start at any index of the array.
+cdef array_copy_to_buffer(CQPEnv env, element_sig, JNIRef array, jsize length, void *buf,
+                          jsize start=0):
+    r = element_sig[0]
     if r == "Z":
-        env.SetBooleanArrayRegion(self._chaquopy_this, 0, self.length, <jboolean*>elems)
+        env.GetBooleanArrayRegion(array, start, length, <jboolean*>buf)
     elif r == "B":
-        env.SetByteArrayRegion(self._chaquopy_this, 0, self.length, <jbyte*>elems)
+        env.GetByteArrayRegion(array, start, length, <jbyte*>buf)
     elif r == "S":
-        env.SetShortArrayRegion(self._chaquopy_this, 0, self.length, <jshort*>elems)
+        env.GetShortArrayRegion(array, start, length, <jshort*>buf)
     elif r == "I":
-        env.SetIntArrayRegion(self._chaquopy_this, 0, self.length, <jint*>elems)
+        env.GetIntArrayRegion(array, start, length, <jint*>buf)
     elif r == "J":
-        env.SetLongArrayRegion(self._chaquopy_this, 0, self.length, <jlong*>elems)
+        env.GetLongArrayRegion(array, start, length, <jlong*>buf)
     elif r == "F":
-        env.SetFloatArrayRegion(self._chaquopy_this, 0, self.length, <jfloat*>elems)
+        env.GetFloatArrayRegion(array, start, length, <jfloat*>buf)
     elif r == "D":
-        env.SetDoubleArrayRegion(self._chaquopy_this, 0, self.length, <jdouble*>elems)
+        env.GetDoubleArrayRegion(array, start, length, <jdouble*>buf)
     elif r == "C":
-        env.SetCharArrayRegion(self._chaquopy_this, 0, self.length, <jchar*>elems)
+        env.GetCharArrayRegion(array, start, length, <jchar*>buf)
     else:
-        raise ValueError(f"Invalid signature '{self._element_sig}'")
+        raise ValueError(f"Invalid signature '{element_sig}'")
+
+cdef array_copy_from_buffer(CQPEnv env, element_sig, JNIRef array, jsize length,
+                            const void *buf):
+    r = element_sig[0]
+    if r == "Z":
+        env.SetBooleanArrayRegion(array, 0, length, <const jboolean*>buf)
+    elif r == "B":
+        env.SetByteArrayRegion(array, 0, length, <const jbyte*>buf)
+    elif r == "S":
+        env.SetShortArrayRegion(array, 0, length, <const jshort*>buf)
+    elif r == "I":
+        env.SetIntArrayRegion(array, 0, length, <const jint*>buf)
+    elif r == "J":
+        env.SetLongArrayRegion(array, 0, length, <const jlong*>buf)
+    elif r == "F":
+        env.SetFloatArrayRegion(array, 0, length, <const jfloat*>buf)
+    elif r == "D":
+        env.SetDoubleArrayRegion(array, 0, length, <const jdouble*>buf)
+    elif r == "C":
+        env.SetCharArrayRegion(array, 0, length, <const jchar*>buf)
+    else:
+        raise ValueError(f"Invalid signature '{element_sig}'")
+
+
+# Fills `array`, whose type signature is `sig`, from dimension `depth` of a C-contiguous
+# buffer, starting at byte `offset`. Returns the offset following the data consumed.
+cdef Py_ssize_t array_nested_set(CQPEnv env, JNIRef array, sig, Py_buffer *buffer, int depth,
+                                 Py_ssize_t offset) except -1:
+    element_sig = sig[1:]
+    cdef Py_ssize_t length = buffer.shape[depth]
+    if depth == buffer.ndim - 1:
+        array_copy_from_buffer(env, element_sig, array, length, <char*>buffer.buf + offset)
+        return offset + length * buffer.itemsize
+
+    cdef Py_ssize_t row_length = buffer.shape[depth + 1]
+    cdef Py_ssize_t i
+    for i in range(length):
+        row = array_new(env, element_sig[1:], row_length)
+        offset = array_nested_set(env, row, element_sig, buffer, depth + 1, offset)
+        env.SetObjectArrayElement(array, i, row)
+    return offset
+
+# The reverse of array_nested_set, except that the shape has already been determined, and
+# every row is checked against it.
+cdef Py_ssize_t array_nested_get(CQPEnv env, JNIRef array, sig, int ndim, Py_ssize_t *shape,
+                                 char *data, int depth, Py_ssize_t offset) except -1:
+    element_sig = sig[1:]
+    cdef jsize length = shape[depth]
+    if depth == ndim - 1:
+        array_copy_to_buffer(env, element_sig, array, length, data + offset)
+        return offset + length * PRIMITIVE_ITEMSIZES[element_sig]
+
+    cdef jsize i
+    for i in range(length):
+        row = env.GetObjectArrayElement(array, i)
+        if not row:
+            raise BufferError("array contains null")
+        if env.GetArrayLength(row) != shape[depth + 1]:
+            raise BufferError("array is not rectangular")
+        offset = array_nested_get(env, row, element_sig, ndim, shape, data, depth + 1, offset)
+    return offset
 
 
 # Formats a possibly-multidimensional array using nested "[]" syntax.
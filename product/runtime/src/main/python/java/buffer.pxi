@@ -0,0 +1,123 @@
+from cpython.buffer cimport PyBUF_WRITABLE
+
+global_class("com.chaquo.python.DirectBufferOwner")
+global_class("java.nio.ByteOrder")
+
+
+# Buffer format codes and itemsizes for each java.nio buffer type, using the same formats as
+# BUFFER_FORMATS. CharBuffer isn't supported, for the same reason as char[].
+NIO_BUFFER_FORMATS = [
+    ("java.nio.ByteBuffer", "b", 1),
+    ("java.nio.ShortBuffer", "h", 2),
+    ("java.nio.IntBuffer", "i", 4),
+    ("java.nio.LongBuffer", "q", 8),
+    ("java.nio.FloatBuffer", "f", 4),
+    ("java.nio.DoubleBuffer", "d", 8),
+]
+
+# Maps each Python class to its (format, itemsize), or None if it doesn't support the buffer
+# protocol.
+cdef dict nio_format_cache = {}
+
+# Maps (format, big_endian) to a format string with an explicit byte order. These strings must
+# stay alive as long as any buffer which uses them.
+cdef dict nio_swapped_formats = {}
+
+
+# Makes direct java.nio buffers support the Python buffer protocol, without copying. The buffer
+# covers the Java buffer's entire capacity, regardless of its position and limit.
+#
+# Like JavaObjectBase, this class is fieldless, so it can be combined with the other bases of
+# a Java class.
+@cython.auto_pickle(False)
+cdef class JavaNioBuffer(object):
+    def __getbuffer__(self, Py_buffer *buffer, int flags):
+        global ByteOrder
+        env = CQPEnv()
+        this = self._chaquopy_this
+        cdef jlong capacity = env.GetDirectBufferCapacity(this)
+        if capacity < 0:
+            raise BufferError(f"{type(self).__name__} is not a direct buffer")
+
+        format_info = nio_buffer_format(type(self))
+        if format_info is None:
+            raise BufferError(f"{type(self).__name__} does not support the buffer protocol")
+        format, itemsize = format_info
+        order = self.order() if itemsize > 1 else None
+        if order is not None and order != ByteOrder.nativeOrder():
+            big_endian = (order == ByteOrder.BIG_ENDIAN)
+            format = nio_swapped_formats.setdefault(
+                (format, big_endian), (b">" if big_endian else b"<") + format)
+
+        cdef Py_ssize_t *shape = <Py_ssize_t*>PyMem_Malloc(sizeof(Py_ssize_t))
+        if shape == NULL:
+            raise MemoryError()
+        shape[0] = capacity
+        try:
+            PyBuffer_FillInfo(buffer, self, env.GetDirectBufferAddress(this),
+                              capacity * itemsize, self.isReadOnly(), flags)
+        except:
+            PyMem_Free(shape)
+            raise
+        buffer.itemsize = itemsize
+        buffer.internal = shape
+        if flags & PyBUF_FORMAT:
+            buffer.format = format
+        if flags & PyBUF_ND:
+            buffer.shape = shape
+
+    def __releasebuffer__(self, Py_buffer *buffer):
+        PyMem_Free(buffer.internal)
+
+global_class("java.nio.Buffer", cls_dict={"_chaquopy_post_bases": (JavaNioBuffer,)})
+
+
+cdef nio_buffer_format(cls):
+    try:
+        return nio_format_cache[cls]
+    except KeyError:
+        pass
+    result = None
+    for name, format, itemsize in NIO_BUFFER_FORMATS:
+        if issubclass(cls, jclass(name)):
+            result = (format.encode("ASCII"), itemsize)
+            break
+    nio_format_cache[cls] = result
+    return result
+
+
+# Keeps a Python buffer alive on behalf of a DirectBufferOwner.
+@cython.final
+cdef class BufferOwner(object):
+    cdef Py_buffer buffer
+
+    def __dealloc__(self):
+        if <PyObject*>self.buffer.obj != NULL:
+            PyBuffer_Release(&self.buffer)
+
+
+def direct_buffer(obj):
+    """Returns a direct `java.nio.ByteBuffer
+    <https://docs.oracle.com/javase/8/docs/api/java/nio/ByteBuffer.html>`_ which shares memory
+    with the given Python object. The object must support the buffer protocol and be
+    contiguous, e.g. a :any:`bytearray` or a NumPy array.
+
+    The Python object will be kept alive as long as the ByteBuffer is reachable. Buffers
+    derived from it using methods such as `slice` or `asIntBuffer` may not keep it alive, so
+    keep a reference to the ByteBuffer for as long as you're using them. If the Python object
+    is read-only, the ByteBuffer will be read-only as well.
+    """
+    global DirectBufferOwner
+    owner = BufferOwner()
+    readonly = False
+    try:
+        PyObject_GetBuffer(obj, &owner.buffer, PyBUF_WRITABLE | PyBUF_ANY_CONTIGUOUS)
+    except (BufferError, ValueError):  # See comment in JavaBufferArray._init_value.
+        PyObject_GetBuffer(obj, &owner.buffer, PyBUF_ANY_CONTIGUOUS)
+        readonly = True
+
+    env = CQPEnv()
+    buffer = j2p(env.j_env, env.NewDirectByteBuffer(owner.buffer.buf, owner.buffer.len))
+    if readonly:
+        buffer = buffer.asReadOnlyBuffer()
+    return DirectBufferOwner.register(buffer, owner)
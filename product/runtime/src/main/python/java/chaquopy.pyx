@@ -41,10 +41,12 @@ __all__ = [
     "chaquopy_init",
     "detach",                                                              # jvm.pxi
     "cast",                                                                # utils.pxi
-    "jclass",                                                              # class.pxi
+    "cache_string", "set_string_cache_size", "string_cache_info",          # conversion.pxi
+    "jclass", "set_gil_policy", "set_release_gil",                         # class.pxi
     "dynamic_proxy", "static_proxy", "constructor", "method", "Override",  # proxy.pxi
     "jarray",                                                              # array.pxi
-    "set_import_enabled",                                                  # import.pxi
+    "direct_buffer",                                                       # buffer.pxi
+    "set_import_enabled", "add_java_packages",                             # import.pxi
 ]
 
 
@@ -74,6 +76,7 @@ include "class.pxi"
 include "overload.pxi"
 include "proxy.pxi"
 include "array.pxi"
+include "buffer.pxi"
 include "import.pxi"
 include "android.pxi"
 
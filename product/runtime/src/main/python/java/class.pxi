@@ -1,15 +1,24 @@
+from cpython.mem cimport PyMem_Free, PyMem_Malloc
+from cpython.object cimport (PyObject, PyObject_GenericGetAttr, PyObject_GenericSetAttr,
+                             PyTypeObject)
+from cpython.ref cimport Py_DECREF, Py_INCREF
+from cpython.tuple cimport PyTuple_New, PyTuple_SET_ITEM
+from libc.string cimport memset
+from collections import namedtuple
 import keyword
-from threading import RLock
-from weakref import WeakValueDictionary
+from threading import Event, RLock
+from time import perf_counter
+from weakref import KeyedRef
 
 global_class("java.lang.ClassNotFoundException")
+global_class("java.lang.LinkageError")
 global_class("java.lang.NoClassDefFoundError")
 global_class("java.lang.reflect.InvocationTargetException")
 
 
 cdef class_lock = RLock()
 cdef dict jclass_cache = {}
-cdef instance_cache = WeakValueDictionary()
+cdef InstanceCache instance_cache = InstanceCache()
 # class_lock also protects none_casts in utils.pxi.
 
 # Attributes which will never be looked up as Java members. This prevents infinite recursion, and is
@@ -17,6 +26,7 @@ cdef instance_cache = WeakValueDictionary()
 cdef set special_attrs = set(dir(type) +                        # Special Python attributes
                              ["_chaquopy_j_klass",              # Chaquopy class attributes
                               "_chaquopy_reflector",            #
+                              "_chaquopy_indexed",              #
                               "_chaquopy_sam_name",             #
                               "_chaquopy_this",                 # Chaquopy instance attributes
                               "_chaquopy_real_obj"])            #
@@ -50,14 +60,18 @@ cpdef jclass(clsname, cls_dict=None):
     if not isinstance(clsname, str):
         clsname = str(clsname)
 
-    with class_lock:
-        cls = jclass_cache.get(clsname)
-        if cls:
-            # Can't alter class dict after class has been reflected.
-            assert (cls_dict is None) or (list(cls_dict) == ["_chaquopy_j_klass"]), clsname
-        else:
-            cls = new_class(clsname, None, cls_dict)
-        return cls
+    # The lock is only needed to create a class, not to look one up, because a class is only
+    # added to the cache once it has been fully created.
+    cls = jclass_cache.get(clsname)
+    if cls is None:
+        with class_lock:
+            cls = jclass_cache.get(clsname)
+            if cls is None:
+                return new_class(clsname, None, cls_dict)
+
+    # Can't alter class dict after class has been reflected.
+    assert (cls_dict is None) or (list(cls_dict) == ["_chaquopy_j_klass"]), clsname
+    return cls
 
 
 cdef new_class(cls_name, bases, cls_dict=None):
@@ -67,9 +81,65 @@ cdef new_class(cls_name, bases, cls_dict=None):
     return JavaClass(None, bases, cls_dict)
 
 
-# This isn't a cdef class because that would make it more difficult to use as a metaclass.
-# TODO: see if this is still true on the current version of Python.
-class JavaClass(type):
+# Attribute access is the most frequent operation on Java classes and objects, so it's
+# implemented in these native base classes rather than in Python. Python subclasses inherit the
+# native tp_getattro and tp_setattro slots directly, because they don't override them.
+#
+# These classes have no fields, so they don't prevent multiple inheritance from other native
+# classes (see setup_object_class).
+@cython.auto_pickle(False)
+cdef class JavaClassBase(type):
+    def __getattribute__(cls, str name):
+        if not (name in type_dict(cls) or name in special_attrs):
+            reflect_member(cls, name)
+        return type_getattr(cls, name)
+
+    # Override to allow static field set (type.__setattr__ would simply overwrite the class dict)
+    def __setattr__(cls, str name, value):
+        if not (name in type_dict(cls) or name in special_attrs):
+            reflect_member(cls, name)
+        member = type_lookup(cls, name)
+        if isinstance(member, JavaMember):
+            member.__set__(None, value)
+        else:
+            type_setattr(cls, name, value)
+
+
+@cython.auto_pickle(False)
+cdef class JavaObjectBase:
+    def __getattribute__(self, str name):
+        cls = type(self)
+        if not (name in type_dict(cls) or name in special_attrs):
+            reflect_member(cls, name)
+        try:
+            return PyObject_GenericGetAttr(self, name)
+        except AttributeError:
+            if name.startswith("_chaquopy"):
+                raise AttributeError(f"'{cls.__name__}' object's superclass __init__ must "
+                                     "be called before using it as a Java object")
+            else:
+                raise
+
+    def __setattr__(self, str name, value):
+        cls = type(self)
+        if not (name in type_dict(cls) or name in special_attrs):
+            reflect_member(cls, name)
+
+        # We can't use __slots__ to prevent adding attributes, because Throwable inherits
+        # from the (Python) Exception class, which causes two problems:
+        #   * Exception is a native class, so multiple inheritance with anything which has
+        #     __slots__ is impossible ("multiple bases have instance lay-out conflict").
+        #   * Exception has a __dict__, which would cause all Java Throwables to have one too.
+        #
+        # So instead, we only allow the store if it would go to a data descriptor such as a
+        # JavaField, rather than to the __dict__.
+        if not (has_data_descriptor(cls, name) or name.startswith("_chaquopy") or
+                isinstance(cls, ProxyClass)):
+            raise AttributeError(f"'{cls.__name__}' object has no attribute '{name}'")
+        PyObject_GenericSetAttr(self, name, value)
+
+
+class JavaClass(JavaClassBase):
     def __new__(metacls, cls_name, bases, cls_dict):
         java_name = cls_dict.pop("_chaquopy_name", None)
         if not java_name:
@@ -85,6 +155,7 @@ class JavaClass(type):
                 module, cls_name = "java", f"jarray('{java_name[1:]}')"
             elif "." in java_name:
                 module, _, cls_name = java_name.rpartition(".")
+                add_java_package(module)  # See import.pxi.
             else:
                 module, cls_name = "", java_name
             cls_dict["__module__"] = module
@@ -98,6 +169,8 @@ class JavaClass(type):
 
         cls = type.__new__(metacls, cls_name, bases, cls_dict)
         cls.__qualname__ = cls.__name__  # Otherwise repr(Object) would contain "JavaObject".
+        if java_name in jclass_cache:
+            j2p_class_cache.clear()
         jclass_cache[java_name] = cls
         return cls
 
@@ -108,49 +181,41 @@ class JavaClass(type):
         self = None
         if instance:
             assert not (args or kwargs)
-            with class_lock:
-                self = instance_cache.get((cls, instance))  # Include cls in key because of cast()
-                if self is None:
-                    env = CQPEnv()
-                    if not env.IsInstanceOf(instance, cls._chaquopy_j_klass):
-                        expected = sig_to_java(klass_sig(env, cls._chaquopy_j_klass))
-                        actual = sig_to_java(object_sig(env, instance))
-                        raise TypeError(f"cannot create {expected} proxy from {actual} instance")
-                    self = cls.__new__(cls, *args, **kwargs)
-
-                    actual_j_klass = env.GetObjectClass(instance)
-                    if actual_j_klass == cls._chaquopy_j_klass:
-                        real_obj = None  # Setting to `self` would cause a reference cycle with self.__dict__.
-                    else:
-                        real_sig = klass_sig(env, actual_j_klass)
-                        real_cls = jclass(real_sig)
-                        assert actual_j_klass == real_cls._chaquopy_j_klass, (
-                            # https://github.com/Electron-Cash/Electron-Cash/issues/1692
-                            f"when instantiating {cls}, signature '{real_sig}' returned "
-                            f"{real_cls} with j_klass {real_cls._chaquopy_j_klass}, which differs "
-                            f"from instance j_klass {actual_j_klass}")
-                        real_obj = real_cls(instance=instance)
-                    set_this(self, instance.global_ref(), real_obj)
+            # As in jclass, the lock is only needed to add an object to the cache. The JNI
+            # calls, and the creation of the real_obj wrapper, are done outside of it so they
+            # don't block other threads.
+            self = instance_cache.get(cls, instance)
+            if self is None:
+                env = CQPEnv()
+                if not env.IsInstanceOf(instance, cls._chaquopy_j_klass):
+                    expected = sig_to_java(klass_sig(env, cls._chaquopy_j_klass))
+                    actual = sig_to_java(object_sig(env, instance))
+                    raise TypeError(f"cannot create {expected} proxy from {actual} instance")
+
+                actual_j_klass = env.GetObjectClass(instance)
+                if actual_j_klass == cls._chaquopy_j_klass:
+                    real_obj = None  # Setting to `self` would cause a reference cycle with self.__dict__.
+                else:
+                    real_sig = klass_sig(env, actual_j_klass)
+                    real_cls = jclass(real_sig)
+                    assert actual_j_klass == real_cls._chaquopy_j_klass, (
+                        # https://github.com/Electron-Cash/Electron-Cash/issues/1692
+                        f"when instantiating {cls}, signature '{real_sig}' returned "
+                        f"{real_cls} with j_klass {real_cls._chaquopy_j_klass}, which differs "
+                        f"from instance j_klass {actual_j_klass}")
+                    real_obj = real_cls(instance=instance)
+
+                with class_lock:
+                    # Another thread may have created the same object in the meantime.
+                    self = instance_cache.get(cls, instance)
+                    if self is None:
+                        self = cls.__new__(cls, *args, **kwargs)
+                        set_this(self, instance.global_ref(), real_obj)
         else:
             self = type.__call__(cls, *args, **kwargs)  # May block
 
         return self
 
-    def __getattribute__(cls, str name):
-        if not (name in special_attrs or name in type_dict(cls)):
-            reflect_member(cls, name)
-        return type.__getattribute__(cls, name)
-
-    # Override to allow static field set (type.__setattr__ would simply overwrite the class dict)
-    def __setattr__(cls, str name, value):
-        if not (name in special_attrs or name in type_dict(cls)):
-            reflect_member(cls, name)
-        member = type_lookup(cls, name)
-        if isinstance(member, JavaMember):
-            member.__set__(None, value)
-        else:
-            type.__setattr__(cls, name, value)
-
     def __dir__(cls):
         result = set(super().__dir__())
         for c in cls.__mro__:
@@ -193,7 +258,7 @@ cdef setup_object_class():
     # both JavaObject and (Python) Exception, which is *also* a native class. Multiple inheritance
     # from two native classes would give a "multiple bases have instance lay-out conflict" error.
     global JavaObject
-    class JavaObject(metaclass=JavaClass):
+    class JavaObject(JavaObjectBase, metaclass=JavaClass):
         _chaquopy_name = "java.lang.Object"
 
         def __init__(self, *args):
@@ -208,35 +273,6 @@ cdef setup_object_class():
                 raise TypeError(f"{cls_fullname(type(self))} has no accessible constructors")
             set_this(self, constructor.__get__(self, type(self))(*args))
 
-        def __getattribute__(self, str name):
-            cls = type(self)
-            if not (name in special_attrs or name in type_dict(cls)):
-                reflect_member(cls, name)
-            try:
-                return object.__getattribute__(self, name)
-            except AttributeError:
-                if name.startswith("_chaquopy"):
-                    raise AttributeError(f"'{type(self).__name__}' object's superclass __init__ must "
-                                         "be called before using it as a Java object")
-                else:
-                    raise
-
-        def __setattr__(self, str name, value):
-            cls = type(self)
-            if not (name in special_attrs or name in type_dict(cls)):
-                reflect_member(cls, name)
-
-            # We can't use __slots__ to prevent adding attributes, because Throwable inherits
-            # from the (Python) Exception class, which causes two problems:
-            #   * Exception is a native class, so multiple inheritance with anything which has
-            #     __slots__ is impossible ("multiple bases have instance lay-out conflict").
-            #   * Exception has a __dict__, which would cause all Java Throwables to have one too.
-            object.__setattr__(self, name, value)
-            if (name in self.__dict__) and not name.startswith("_chaquopy") and \
-               not isinstance(type(self), ProxyClass):
-                del self.__dict__[name]
-                raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
-
         def __dir__(self):
             result = set(dir(type(self)))
             result.update(self.__dict__)
@@ -335,7 +371,7 @@ cdef set_this(self, GlobalRef this, real_obj=None):
         is_proxy = isinstance(type(self), ProxyClass)
         self._chaquopy_this = this.weak_ref() if is_proxy else this
         self._chaquopy_real_obj = real_obj
-        instance_cache[(type(self), this)] = self
+        instance_cache.put(type(self), this, self)
 
         if is_proxy:
             java_dict = self._chaquopyGetDict()
@@ -345,6 +381,130 @@ cdef set_this(self, GlobalRef this, real_obj=None):
                 self.__dict__ = java_dict
 
 
+cdef enum InstanceSlotState:
+    SLOT_EMPTY = 0, SLOT_LIVE, SLOT_DELETED
+
+cdef struct InstanceSlot:
+    InstanceSlotState state
+    size_t hash
+    PyObject *cls           # Strong references, valid only if state is SLOT_LIVE.
+    PyObject *this          #
+    PyObject *ref           #
+
+DEF INSTANCE_CACHE_MIN_SIZE = 64
+
+# Maps each (Python class, Java object) pair to its Python object, if one exists. The class is
+# part of the key because cast() can give the same Java object multiple Python objects.
+#
+# This was previously a WeakValueDictionary, but hashing and comparing a tuple key on every
+# lookup went through several levels of Python code. Instead, this is an open-addressing table
+# keyed on the Java identity hash code, which JNIRef caches, so a lookup usually costs a single
+# IsSameObject call. Values are held by weak reference: when a Python object dies, its callback
+# removes the slot and releases the GlobalRef, without calling any other JNI functions.
+#
+# All methods run with the GIL held and without calling back into Python while the table is
+# being modified, so readers don't need class_lock.
+@cython.final
+cdef class InstanceCache(object):
+    cdef InstanceSlot *slots
+    cdef size_t mask        # Number of slots minus 1; the number of slots is a power of 2.
+    cdef size_t n_live
+    cdef size_t n_used      # Live and deleted slots.
+    cdef object callback
+
+    def __cinit__(self):
+        self.callback = self.remove
+        self.resize(INSTANCE_CACHE_MIN_SIZE)
+
+    def __dealloc__(self):
+        PyMem_Free(self.slots)
+
+    cdef size_t slot_hash(self, cls, JNIRef this) except? 0:
+        # Multiplying by an odd constant mixes the hash code's low bits, which are the ones
+        # used as the initial index.
+        return (<size_t><jint>hash(this) * <size_t>0x9E3779B1u) ^ (<size_t><PyObject*>cls >> 4)
+
+    cdef get(self, cls, JNIRef this):
+        cdef size_t h = self.slot_hash(cls, this)
+        cdef size_t i = h & self.mask
+        cdef InstanceSlot *slot
+        cdef JNIEnv *j_env = get_jnienv()
+        while True:
+            slot = &self.slots[i]
+            if slot.state == SLOT_EMPTY:
+                return None
+            if (slot.state == SLOT_LIVE and slot.hash == h and slot.cls == <PyObject*>cls and
+                j_env[0].IsSameObject(j_env, (<JNIRef>slot.this).obj, this.obj)):
+                # The object may already be dead but not yet removed, in which case this
+                # returns None.
+                return (<object>slot.ref)()
+            i = (i + 1) & self.mask
+
+    # `this` must be a GlobalRef, which will be kept alive until the Python object dies. For
+    # proxy objects, this prevents the Java object from dying while it's still accessible
+    # from Python (see set_this).
+    cdef put(self, cls, GlobalRef this, obj):
+        cdef size_t h = self.slot_hash(cls, this)
+        ref = KeyedRef(obj, self.callback, h)
+        if (self.n_used + 1) * 3 > (self.mask + 1) * 2:
+            self.resize(max(INSTANCE_CACHE_MIN_SIZE, self.n_live * 4))
+
+        cdef size_t i = h & self.mask
+        while self.slots[i].state != SLOT_EMPTY:
+            i = (i + 1) & self.mask
+        cdef InstanceSlot *slot = &self.slots[i]
+        Py_INCREF(cls)
+        Py_INCREF(this)
+        Py_INCREF(ref)
+        slot.cls, slot.this, slot.ref = <PyObject*>cls, <PyObject*>this, <PyObject*>ref
+        slot.hash = h
+        slot.state = SLOT_LIVE
+        self.n_live += 1
+        self.n_used += 1
+
+    # Deleted slots are left in place so they don't break the probe sequence of other slots,
+    # until the table is next resized.
+    def remove(self, ref):
+        cdef size_t i = <size_t>ref.key & self.mask
+        cdef InstanceSlot *slot
+        while self.slots[i].state != SLOT_EMPTY:
+            slot = &self.slots[i]
+            if slot.state == SLOT_LIVE and slot.ref == <PyObject*>ref:
+                slot.state = SLOT_DELETED
+                self.n_live -= 1
+                # Update the slot before releasing its references, because releasing them
+                # could cause a reentrant call.
+                cls, this = <object>slot.cls, <object>slot.this
+                Py_DECREF(cls)
+                Py_DECREF(this)
+                Py_DECREF(ref)
+                return
+            i = (i + 1) & self.mask
+
+    cdef resize(self, size_t min_size):
+        cdef size_t size = INSTANCE_CACHE_MIN_SIZE
+        while size < min_size:
+            size *= 2
+        cdef InstanceSlot *new_slots = <InstanceSlot*>PyMem_Malloc(size * sizeof(InstanceSlot))
+        if not new_slots:
+            raise MemoryError()
+        memset(new_slots, 0, size * sizeof(InstanceSlot))
+
+        cdef size_t new_mask = size - 1
+        cdef size_t i, j
+        if self.slots:
+            for i in range(self.mask + 1):
+                if self.slots[i].state == SLOT_LIVE:
+                    j = self.slots[i].hash & new_mask
+                    while new_slots[j].state != SLOT_EMPTY:
+                        j = (j + 1) & new_mask
+                    new_slots[j] = self.slots[i]
+            PyMem_Free(self.slots)
+        self.slots = new_slots
+        self.mask = new_mask
+        self.n_used = self.n_live
+
+
 # This isn't done during module initialization because we don't have a JVM yet, and we don't
 # want to automatically start one because we might already be in a Java process.
 cdef setup_bootstrap_classes():
@@ -362,6 +522,10 @@ cdef setup_bootstrap_classes():
                      "(Ljava/lang/String;)[Ljava/lang/reflect/Member;")
     bootstrap_method(Reflector, "getField", "(Ljava/lang/String;)Ljava/lang/reflect/Field;")
     bootstrap_method(Reflector, "getNestedClass", "(Ljava/lang/String;)Ljava/lang/Class;")
+    bootstrap_method(Reflector, "isIndexed", "()Z")
+    bootstrap_method(Reflector, "getIndexedMember",
+                     "(Ljava/lang/String;)[Ljava/lang/String;")
+    bootstrap_method(Reflector, "rejectIndex", "()V")
 
     AnnotatedElement = new_class("java.lang.reflect.AnnotatedElement", (JavaObject,))
     AccessibleObject = new_class("java.lang.reflect.AccessibleObject",
@@ -377,6 +541,7 @@ cdef setup_bootstrap_classes():
     bootstrap_method(Modifier, "isAbstract", '(I)Z', static=True)
     bootstrap_method(Modifier, "isFinal", '(I)Z', static=True)
     bootstrap_method(Modifier, "isStatic", '(I)Z', static=True)
+    bootstrap_method(Modifier, "isSynchronized", '(I)Z', static=True)
 
     Method = new_class("java.lang.reflect.Method",
                        (AccessibleObject, GenericDeclaration, Member))
@@ -408,7 +573,7 @@ cdef setup_bootstrap_classes():
 
 cdef bootstrap_method(cls, name, signature, static=False):
     member = JavaMethod(cls, name, signature, static=static)
-    type.__setattr__(cls, name, member)  # Direct modification of cls.__dict__ is blocked.
+    type_setattr(cls, name, member)  # Direct modification of cls.__dict__ is blocked.
 
 
 # If the class has a declared or inherited Java member of the given name, this function ensures it's
@@ -437,7 +602,7 @@ cdef reflect_member(cls, str name, bint inherit=True):
     if member:
         # Direct modification of cls.__dict__ is blocked, and we can't set via type_dict either: see
         # comment there.
-        type.__setattr__(cls, name, member)
+        type_setattr(cls, name, member)
         return member
 
     # As recommended by PEP 8, members whose names are reserved words are available through dot
@@ -445,12 +610,32 @@ cdef reflect_member(cls, str name, bint inherit=True):
     if name.endswith("_") and is_reserved_word(name[:-1]):
         member = reflect_member(cls, name[:-1], inherit=inherit)
         if member:
-            type.__setattr__(cls, name, member)
+            type_setattr(cls, name, member)
             return member
 
 
 cdef find_member(cls, name, inherited=None):
+    global LinkageError
     reflector = get_reflector(cls)
+    if is_indexed(cls):
+        try:
+            member = find_indexed_member(cls, reflector, name, inherited)
+            if member is None and (reflector.getMethods(name) or reflector.getField(name) or
+                                   reflector.getNestedClass(name)):
+                # The index is missing a member, e.g. a hidden member which is omitted
+                # from the Android SDK's stub classes.
+                member = INDEX_MISMATCH
+            if member is not INDEX_MISMATCH:
+                return member
+        except LinkageError:
+            pass  # A member in the index doesn't exist in the loaded class.
+
+        # The index was generated from a different version of the class, so fall back on
+        # reflection for this class from now on. Members which have already been created
+        # from the index have passed the same checks, so they remain valid.
+        reflector.rejectIndex()
+        type_setattr(cls, "_chaquopy_indexed", False)
+
     jms = [JavaMethod(cls, name, m) for m in (reflector.getMethods(name) or [])]
     if isinstance(inherited, JavaMethod):
         jms.append(inherited)
@@ -471,16 +656,211 @@ cdef find_member(cls, name, inherited=None):
     return inherited
 
 
+# Access flags from the class file format, as used in the reflection index.
+DEF ACC_STATIC = 0x0008
+DEF ACC_FINAL = 0x0010
+DEF ACC_SYNCHRONIZED = 0x0020
+DEF ACC_VARARGS = 0x0080
+DEF ACC_ABSTRACT = 0x0400
+
+cdef object INDEX_MISMATCH = object()
+
+# Like find_member, but uses the reflection index generated by the Gradle plugin. The index
+# can't be completely trusted, because the class loaded at runtime may differ from the one it
+# was generated from, e.g. in a different API level of the Android framework. So this
+# function returns INDEX_MISMATCH or raises LinkageError if it detects a difference.
+cdef find_indexed_member(cls, reflector, name, inherited):
+    cdef CQPEnv env
+    cdef JNIRef j_klass
+    cdef jmethodID j_method
+    cdef JavaMethod jm
+
+    members = reflector.getIndexedMember(name)
+    if members is None:  # Another thread rejected the index.
+        return INDEX_MISMATCH
+    members = [member.split(" ", 2) for member in members]
+    jms = []
+    for kind, flags, definition in members:
+        if kind == "M":
+            flags = int(flags)
+            jms.append(JavaMethod(cls, name, definition,
+                                  static=bool(flags & ACC_STATIC),
+                                  final=bool(flags & ACC_FINAL),
+                                  abstract=bool(flags & ACC_ABSTRACT),
+                                  varargs=bool(flags & ACC_VARARGS),
+                                  synchronized=bool(flags & ACC_SYNCHRONIZED)))
+
+    if isinstance(inherited, JavaMethod):
+        inherited_jms = [inherited]
+    elif isinstance(inherited, JavaMultipleMethod):
+        inherited_jms = (<JavaMultipleMethod?>inherited).methods
+    else:
+        inherited_jms = []
+
+    # An index generated from the Android SDK's stub classes may omit overrides which exist
+    # at runtime. An inherited method would then be called non-virtually, skipping the
+    # override, so check that each inherited method resolves to the same method ID in this
+    # class.
+    if inherited_jms:
+        env = CQPEnv()
+        j_klass = cls._chaquopy_j_klass
+        sigs = set([jm.args_sig for jm in jms])
+        for jm in inherited_jms:
+            if jm.is_constructor or jm.args_sig in sigs:
+                continue
+            definition = f"({''.join(jm.args_sig)}){jm.return_sig}"
+            if jm.is_static:
+                j_method = env.GetStaticMethodID(j_klass, name, definition)
+            else:
+                j_method = env.GetMethodID(j_klass, name, definition)
+            if j_method != jm.j_method:
+                return INDEX_MISMATCH
+
+    jms += inherited_jms
+    if jms:
+        jms = apply_overrides(jms)
+        return jms[0] if (len(jms) == 1) else JavaMultipleMethod(cls, name, jms)
+
+    for kind, flags, definition in members:
+        if kind == "F":
+            flags = int(flags)
+            return JavaField(cls, name, definition, static=bool(flags & ACC_STATIC),
+                             final=bool(flags & ACC_FINAL))
+        elif kind == "C":
+            return jclass(definition)
+
+    return inherited
+
+
+cdef bint is_indexed(cls) except -1:
+    indexed = cls.__dict__.get("_chaquopy_indexed")
+    if indexed is None:
+        indexed = get_reflector(cls).isIndexed()
+        type_setattr(cls, "_chaquopy_indexed", indexed)
+    return indexed
+
+
 cdef get_reflector(cls):
     reflector = cls.__dict__.get("_chaquopy_reflector")
     if not reflector:
         # Can't call constructor directly, because JavaObject.__init__ calls some inherited
         # methods which would themselves require a Reflector to resolve.
         reflector = Reflector.getInstance(Class(instance=cls.__dict__["_chaquopy_j_klass"]))
-        type.__setattr__(cls, "_chaquopy_reflector", reflector)
+        type_setattr(cls, "_chaquopy_reflector", reflector)
     return reflector
 
 
+ReflectionCacheInfo = namedtuple("ReflectionCacheInfo", ["hits", "misses", "maxsize",
+                                                         "currsize", "classes",
+                                                         "retained_bytes"])
+
+
+def set_reflection_cache_size(maxsize):
+    """Sets the maximum number of classes whose reflected members are kept in memory. The
+    default is 512. Once the cache is full, the members of the least recently used class are
+    released.
+
+    This doesn't affect members which have already been accessed from Python, since they're
+    stored in the Python class.
+    """
+    if not (isinstance(maxsize, int) and maxsize >= 0):
+        raise ValueError(f"Invalid reflection cache size: {maxsize!r}")
+    Reflector.setCacheSize(min(maxsize, INT_MAX))
+
+
+def reflection_cache_info():
+    """Returns a named tuple showing the reflection cache's `hits`, `misses`, `maxsize` and
+    `currsize`, in the same format as :any:`functools.lru_cache`. It also contains the
+    following fields:
+
+    * `classes`: the number of classes which have been reflected, including those whose
+      members are no longer in the cache. Classes are removed from this count once they've
+      been garbage collected.
+    * `retained_bytes`: an estimate of the memory used by the cache.
+    """
+    return ReflectionCacheInfo(*Reflector.getCacheInfo())
+
+
+class PreloadTask(object):
+    """Returned by :any:`preload` to report the progress of a background preload. It has the
+    following attributes, which are updated as the preload progresses:
+
+    * `names`: the list of class names.
+    * `completed`: the number of classes which have been processed so far.
+    * `times`: a dict mapping each processed class name to the number of seconds it took.
+    * `errors`: a dict mapping each class name which failed to the exception it raised.
+    * `elapsed`: the total number of seconds taken, or `None` if the preload hasn't finished.
+    """
+    def __init__(self, names):
+        self.names = names
+        self.completed = 0
+        self.times = {}
+        self.errors = {}
+        self.elapsed = None
+        self._event = Event()
+
+    def __repr__(self):
+        return (f"<PreloadTask {self.completed}/{len(self.names)} classes" +
+                ("" if self.elapsed is None else f" in {self.elapsed:.3f} s") + ">")
+
+    def done(self):
+        """Returns whether the preload has finished."""
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Waits for the preload to finish, for at most `timeout` seconds if it's given.
+        Returns whether the preload has finished."""
+        return self._event.wait(timeout)
+
+    def _run(self, members, callback):
+        start = perf_counter()
+        try:
+            for name in self.names:
+                class_start = perf_counter()
+                error = None
+                try:
+                    cls = jclass(name)
+                    if members:
+                        preload_members(cls)
+                except Exception as e:
+                    error = self.errors[name] = e
+                seconds = self.times[name] = perf_counter() - class_start
+                self.completed += 1
+                if callback is not None:
+                    callback(name, seconds, error)
+        finally:
+            self.elapsed = perf_counter() - start
+            self._event.set()
+
+
+def preload(names, members=True, callback=None):
+    """Loads the given Java classes on a background thread, so that using them later will be
+    faster. `names` is a list of class names, in the same format as :any:`jclass`.
+
+    If `members` is true, all the members of each class will also be reflected. Otherwise,
+    this will happen when each member is first used.
+
+    If `callback` is given, it will be called on the background thread after each class is
+    processed, with the arguments `(name, seconds, error)`. `error` is the exception raised
+    while loading the class, or `None` if it succeeded.
+
+    Returns a :any:`PreloadTask`.
+    """
+    task = PreloadTask(list(names))
+    Thread(target=task._run, args=(members, callback), name="chaquopy-preload",
+           daemon=True).start()
+    return task
+
+
+cdef preload_members(cls):
+    names = set()
+    for c in cls.__mro__:
+        if isinstance(c, JavaClass) and not isinstance(c, ProxyClass):
+            names.update([str(s) for s in get_reflector(c).dir()])
+    for name in names:
+        reflect_member(cls, name)
+
+
 # Methods earlier in the list will override later ones with the same argument signature.
 cdef apply_overrides(jms_in):
     jms_out = []
@@ -510,6 +890,65 @@ cdef type_lookup(cls, name):
     return None
 
 
+# In adaptive mode, a method will stop releasing the GIL after this many consecutive calls
+# which each took less than this amount of time. Synchronized methods are excluded, because
+# however fast they usually are, they may block waiting for a monitor which is held by a
+# thread which is itself waiting for the GIL.
+DEF ADAPTIVE_GIL_CALLS = 16
+DEF ADAPTIVE_GIL_THRESHOLD_NS = 1000
+
+cdef str gil_policy = "release"
+cdef int gil_settings_version = 1
+
+# Methods which are known to be trivial, so releasing the GIL would cost far more than the
+# call itself. These must not be able to block or call back into Python.
+cdef dict release_gil_overrides = dict.fromkeys(
+    [f"{sig_to_java(sig)}.{name}" for sig, name in UNBOX_METHODS.items()] +
+    ["java.lang.String.length", "java.lang.String.charAt", "java.lang.String.isEmpty"],
+    False)
+
+
+def set_gil_policy(policy):
+    """Sets whether the GIL is released when Python code calls a Java method or constructor.
+    `policy` may be one of the following strings:
+
+    * `"release"` (the default): the GIL is always released, allowing Python code to run on
+      other threads while the Java code executes.
+    * `"adaptive"`: the duration of each method's calls is measured, and the GIL will be kept
+      for methods which are consistently so fast that releasing it would cost more than the
+      call itself. As soon as a slow call is seen, the method goes back to releasing the GIL.
+      `synchronized` methods always release the GIL.
+
+    This can be overridden for individual methods using :any:`set_release_gil`.
+    """
+    global gil_policy, gil_settings_version
+    if policy not in ["release", "adaptive"]:
+        raise ValueError(f"Invalid GIL policy: {policy!r}")
+    with class_lock:
+        gil_policy = policy
+        gil_settings_version += 1
+
+
+def set_release_gil(name, release):
+    """Sets whether the GIL is released when calling the given Java method, overriding the
+    policy set by :any:`set_gil_policy`. `name` must be fully-qualified, e.g.
+    `"java.lang.String.length"`, and applies to all overloads of that name declared by that
+    class. `release` may be `True`, `False`, or `None` to follow the policy.
+
+    Keeping the GIL while calling a method which blocks, or which waits for another thread which
+    uses Python, will cause other Python threads to stall, or even deadlock.
+    """
+    global gil_settings_version
+    if release not in [True, False, None]:
+        raise TypeError(f"release must be True, False or None, not {release!r}")
+    with class_lock:
+        if release is None:
+            release_gil_overrides.pop(name, None)
+        else:
+            release_gil_overrides[name] = release
+        gil_settings_version += 1
+
+
 cdef class JavaMember(object):
     cdef cls
     cdef basestring name
@@ -543,6 +982,12 @@ cdef class JavaField(JavaSimpleMember):
     cdef basestring definition
     cdef jfieldID j_field
 
+    # The values of static final primitive and String fields can't change once their class
+    # has been initialized, so they're only read once.
+    cdef bint is_constant
+    cdef bint has_value
+    cdef value
+
     def __repr__(self):
         return (f"<JavaField {self.format_modifiers()}"
                 f"{sig_to_java(self.definition)} {self.fqn()}>")
@@ -564,10 +1009,19 @@ cdef class JavaField(JavaSimpleMember):
             self.j_field = env.GetStaticFieldID(j_klass, self.name, self.definition)
         else:
             self.j_field = env.GetFieldID(j_klass, self.name, self.definition)
+        self.is_constant = (self.is_static and self.is_final and
+                            (self.definition in PRIMITIVE_TYPES or
+                             self.definition == "Ljava/lang/String;"))
 
     def __get__(self, obj, objtype):
+        if self.has_value:
+            return self.value
         if self.is_static:
-            return self.read_static_field()
+            value = self.read_static_field()
+            if self.is_constant:
+                self.value = value
+                self.has_value = True
+            return value
         else:
             if obj is None:
                 raise AttributeError(f'Cannot access {self.fqn()} in static context')
@@ -709,9 +1163,19 @@ cdef class JavaMethod(JavaSimpleMember):
     cdef jmethodID j_method
     cdef basestring return_sig
     cdef tuple args_sig  # Can't be a list: it's used as a set key in apply_overrides.
+    cdef SigKind return_kind
+    cdef SigKind *arg_kinds
+    cdef tuple output_sigs  # See convert_args.
+    cdef Py_ssize_t n_args
     cdef bint is_constructor
     cdef bint is_abstract
     cdef bint is_varargs
+    cdef bint is_synchronized
+
+    # See set_gil_policy.
+    cdef int gil_version        # Value of gil_settings_version when release_gil was set.
+    cdef object release_gil     # True, False, or None to follow the policy.
+    cdef int fast_calls         # Number of consecutive fast calls in adaptive mode.
 
     def __repr__(self):
         return f"<JavaMethod {self.format_declaration()}>"
@@ -722,7 +1186,7 @@ cdef class JavaMethod(JavaSimpleMember):
                 f"{args_sig_to_java(self.args_sig, self.is_varargs)}")
 
     def __init__(self, cls, name, definition_or_reflected, *, static=False, final=False,
-                 abstract=False, varargs=False):
+                 abstract=False, varargs=False, synchronized=False):
         self.is_constructor = (name == "<init>")
         if isinstance(definition_or_reflected, str):
             definition = definition_or_reflected
@@ -738,10 +1202,23 @@ cdef class JavaMethod(JavaSimpleMember):
             final = Modifier.isFinal(modifiers)
             abstract = Modifier.isAbstract(modifiers)
             varargs = self.reflected.isVarArgs()
+            synchronized = Modifier.isSynchronized(modifiers)
 
         super().__init__(cls, name, static, final)
         self.is_abstract = abstract
         self.is_varargs = varargs
+        self.is_synchronized = synchronized
+
+        # Compile the signature into a form which can be used without any string processing
+        # on every call.
+        self.return_kind = sig_kind(self.return_sig)
+        self.n_args = len(self.args_sig)
+        self.arg_kinds = <SigKind*>PyMem_Malloc(sizeof(SigKind) * self.n_args)
+        if self.arg_kinds == NULL:
+            raise MemoryError()
+        for i, arg_sig in enumerate(self.args_sig):
+            self.arg_kinds[i] = sig_kind(arg_sig)
+        self.output_sigs = tuple([output_sig(arg_sig) for arg_sig in self.args_sig])
 
         env = CQPEnv()
         cdef JNIRef j_klass = self.cls._chaquopy_j_klass
@@ -750,6 +1227,9 @@ cdef class JavaMethod(JavaSimpleMember):
         else:
             self.j_method = env.GetMethodID(j_klass, self.name, definition)
 
+    def __dealloc__(self):
+        PyMem_Free(self.arg_kinds)
+
     # To be consistent with Python syntax, we want instance methods to be called non-virtually
     # in the following cases:
     #   * When the method is got from a class rather than an instance. This is easy to detect:
@@ -772,32 +1252,61 @@ cdef class JavaMethod(JavaSimpleMember):
         elif obj is None or self.is_static or self.is_constructor:
             return self
         else:
-            return lambda *args: self(obj, *args, virtual=(obj._chaquopy_real_obj is not None))
+            return JavaBoundMethod.create(self, obj, objtype)
 
     def __call__(self, *args, virtual=False):
-        # Check this up front, because the "unbound method" error that check_args would give
+        # Check this up front, because the "unbound method" error that check_this would give
         # would be misleading for an abstract method.
+        self.check_abstract(virtual)
+        obj, args = self.check_this(args)
+        return self.call(obj, None if obj is None else obj._chaquopy_this, args, virtual)
+
+    cdef check_abstract(self, bint virtual):
         if self.is_abstract and not virtual:
             raise NotImplementedError(f"{self.fqn()} is abstract and cannot be called")
 
+    # `obj` and `this` are ignored for static methods and constructors.
+    cdef call(self, obj, JNIRef this, tuple args, bint virtual):
         env = CQPEnv()
-        obj, args = self.check_args(env, args)
-        p2j_args = [p2j(env.j_env, argtype, arg)
-                    for argtype, arg in zip(self.args_sig, args)]
+        args = self.check_args(env, args)
+        cdef jvalue *j_args = <jvalue*>alloca(sizeof(jvalue) * self.n_args)
+        cdef list output_args = []
+        p2j_args = convert_args(self, env.j_env, args, j_args, output_args)
+        self.set_gil_mode(env)
 
         if self.is_constructor:
-            result = self.call_constructor(env, p2j_args)
+            result = self.call_constructor(env, j_args)
         elif self.is_static:
-            result = self.call_static_method(env, p2j_args)
+            result = self.call_static_method(env, j_args)
         elif virtual:
-            result = self.call_virtual_method(env, obj, p2j_args)
+            result = self.call_virtual_method(env, obj, this, p2j_args, j_args)
         else:
-            result = self.call_nonvirtual_method(env, obj, p2j_args)
-
-        copy_output_args(env, args, p2j_args)
+            result = self.call_nonvirtual_method(env, obj, this, p2j_args, j_args)
+
+        if env.time_calls:
+            # Keep the GIL once the method has been consistently fast, but go back to
+            # releasing it as soon as a slow call is seen.
+            if env.call_ns > ADAPTIVE_GIL_THRESHOLD_NS:
+                self.fast_calls = 0
+            elif self.fast_calls < ADAPTIVE_GIL_CALLS:
+                self.fast_calls += 1
+        if output_args:
+            copy_output_args(output_args)
         return result
 
-    cdef check_args(self, CQPEnv env, args):
+    cdef set_gil_mode(self, CQPEnv env):
+        if self.gil_version != gil_settings_version:
+            self.release_gil = release_gil_overrides.get(self.fqn())
+            self.fast_calls = 0
+            self.gil_version = gil_settings_version
+
+        if self.release_gil is not None:
+            env.keep_gil = not self.release_gil
+        elif gil_policy == "adaptive" and not self.is_synchronized:
+            env.keep_gil = (self.fast_calls >= ADAPTIVE_GIL_CALLS)
+            env.time_calls = True
+
+    cdef check_this(self, tuple args):
         obj = None
         if not (self.is_static or self.is_constructor):
             if not args:
@@ -813,7 +1322,9 @@ cdef class JavaMethod(JavaSimpleMember):
                 raise TypeError(f"Unbound method {self.fqn()} must be called with "
                                 f"{cls_fullname(self.cls)} instance as first argument "
                                 f"(got {got_wrong} instead)")
+        return obj, args
 
+    cdef tuple check_args(self, CQPEnv env, tuple args):
         if self.is_varargs:
             if len(args) < len(self.args_sig) - 1:
                 raise TypeError(f'{self.fqn()} takes at least '
@@ -829,76 +1340,66 @@ cdef class JavaMethod(JavaSimpleMember):
         if len(args) != len(self.args_sig):
             raise TypeError(f'{self.fqn()} takes {plural(len(self.args_sig), "argument")} '
                             f'({len(args)} given)')
-        return obj, args
+        return args
 
-    cdef GlobalRef call_constructor(self, CQPEnv env, p2j_args):
-        cdef jvalue *j_args = <jvalue*>alloca(sizeof(jvalue) * len(p2j_args))
-        populate_args(self, p2j_args, j_args)
+    cdef GlobalRef call_constructor(self, CQPEnv env, jvalue *j_args):
         return env.NewObjectA(self.cls._chaquopy_j_klass, self.j_method, j_args).global_ref()
 
-    cdef call_virtual_method(self, CQPEnv env, obj, p2j_args):
+    cdef call_virtual_method(self, CQPEnv env, obj, JNIRef this, p2j_args, jvalue *j_args):
         global Proxy
         if (Proxy is not None) and isinstance(obj._chaquopy_real_obj or obj, Proxy) and \
            not (self.cls is JavaObject and self.is_final):  # See comment at call_proxy_method
             return self.call_proxy_method(env, obj, p2j_args)
 
-        cdef JNIRef this = obj._chaquopy_this
-        cdef jvalue *j_args = <jvalue*>alloca(sizeof(jvalue) * len(p2j_args))
-        populate_args(self, p2j_args, j_args)
-
-        r = self.return_sig[0]
-        if r == 'V':
+        cdef SigKind r = self.return_kind
+        if r == KIND_VOID:
             env.CallVoidMethodA(this, self.j_method, j_args)
-        elif r == 'Z':
+        elif r == KIND_BOOLEAN:
             return env.CallBooleanMethodA(this, self.j_method, j_args)
-        elif r == 'B':
+        elif r == KIND_BYTE:
             return env.CallByteMethodA(this, self.j_method, j_args)
-        elif r == 'C':
+        elif r == KIND_CHAR:
             return env.CallCharMethodA(this, self.j_method, j_args)
-        elif r == 'S':
+        elif r == KIND_SHORT:
             return env.CallShortMethodA(this, self.j_method, j_args)
-        elif r == 'I':
+        elif r == KIND_INT:
             return env.CallIntMethodA(this, self.j_method, j_args)
-        elif r == 'J':
+        elif r == KIND_LONG:
             return env.CallLongMethodA(this, self.j_method, j_args)
-        elif r == 'F':
+        elif r == KIND_FLOAT:
             return env.CallFloatMethodA(this, self.j_method, j_args)
-        elif r == 'D':
+        elif r == KIND_DOUBLE:
             return env.CallDoubleMethodA(this, self.j_method, j_args)
-        elif r in 'L[':
+        elif r == KIND_OBJECT:
             return j2p(env.j_env, env.CallObjectMethodA(this, self.j_method, j_args))
         else:
             raise Exception(f"Invalid definition for {self.fqn()}: '{self.return_sig}'")
 
-    cdef call_nonvirtual_method(self, CQPEnv env, obj, p2j_args):
+    cdef call_nonvirtual_method(self, CQPEnv env, obj, JNIRef this, p2j_args, jvalue *j_args):
         if (Proxy is not None) and issubclass(self.cls, Proxy):
             return self.call_proxy_method(env, obj, p2j_args)
 
-        cdef JNIRef this = obj._chaquopy_this
         cdef JNIRef j_klass = self.cls._chaquopy_j_klass
-        cdef jvalue *j_args = <jvalue*>alloca(sizeof(jvalue) * len(p2j_args))
-        populate_args(self, p2j_args, j_args)
-
-        r = self.return_sig[0]
-        if r == 'V':
+        cdef SigKind r = self.return_kind
+        if r == KIND_VOID:
             env.CallNonvirtualVoidMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'Z':
+        elif r == KIND_BOOLEAN:
             return env.CallNonvirtualBooleanMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'B':
+        elif r == KIND_BYTE:
             return env.CallNonvirtualByteMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'C':
+        elif r == KIND_CHAR:
             return env.CallNonvirtualCharMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'S':
+        elif r == KIND_SHORT:
             return env.CallNonvirtualShortMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'I':
+        elif r == KIND_INT:
             return env.CallNonvirtualIntMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'J':
+        elif r == KIND_LONG:
             return env.CallNonvirtualLongMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'F':
+        elif r == KIND_FLOAT:
             return env.CallNonvirtualFloatMethodA(this, j_klass, self.j_method, j_args)
-        elif r == 'D':
+        elif r == KIND_DOUBLE:
             return env.CallNonvirtualDoubleMethodA(this, j_klass, self.j_method, j_args)
-        elif r in 'L[':
+        elif r == KIND_OBJECT:
             return j2p(env.j_env, env.CallNonvirtualObjectMethodA(this, j_klass, self.j_method,
                                                                   j_args))
         else:
@@ -914,11 +1415,16 @@ cdef class JavaMethod(JavaSimpleMember):
     #     one of the proxy class's interfaces as opposed to the class itself).
     #   * So instead, we make the call through Method.invoke.
     cdef call_proxy_method(self, CQPEnv env, obj, p2j_args):
+        p2j_args = list(p2j_args)
         for i, (arg_sig, p2j_arg) in enumerate(zip(self.args_sig, p2j_args)):
             box_cls_name = PRIMITIVE_TYPES.get(arg_sig)
             if box_cls_name:
                 p2j_args[i] = jclass(f"java.lang.{box_cls_name}")(p2j_arg)._chaquopy_this
 
+        if self.reflected is None:  # Created from a signature, e.g. by find_indexed_member.
+            self.reflected = j2p(env.j_env, env.ToReflectedMethod(
+                self.cls._chaquopy_j_klass, self.j_method, self.is_static))
+
         global InvocationTargetException
         try:
             return self.reflected.invoke(obj, [JavaObject(instance=r) for r in p2j_args])
@@ -927,39 +1433,51 @@ cdef class JavaMethod(JavaSimpleMember):
             # adding no useful information.
             raise e.getCause() from None
 
-    cdef call_static_method(self, CQPEnv env, p2j_args):
+    cdef call_static_method(self, CQPEnv env, jvalue *j_args):
         cdef JNIRef j_klass = self.cls._chaquopy_j_klass
-        cdef jvalue *j_args = <jvalue*>alloca(sizeof(jvalue) * len(p2j_args))
-        populate_args(self, p2j_args, j_args)
-
-        r = self.return_sig[0]
-        if r == 'V':
+        cdef SigKind r = self.return_kind
+        if r == KIND_VOID:
             env.CallStaticVoidMethodA(j_klass, self.j_method, j_args)
-        elif r == 'Z':
+        elif r == KIND_BOOLEAN:
             return env.CallStaticBooleanMethodA(j_klass, self.j_method, j_args)
-        elif r == 'B':
+        elif r == KIND_BYTE:
             return env.CallStaticByteMethodA(j_klass, self.j_method, j_args)
-        elif r == 'C':
+        elif r == KIND_CHAR:
             return env.CallStaticCharMethodA(j_klass, self.j_method, j_args)
-        elif r == 'S':
+        elif r == KIND_SHORT:
             return env.CallStaticShortMethodA(j_klass, self.j_method, j_args)
-        elif r == 'I':
+        elif r == KIND_INT:
             return env.CallStaticIntMethodA(j_klass, self.j_method, j_args)
-        elif r == 'J':
+        elif r == KIND_LONG:
             return env.CallStaticLongMethodA(j_klass, self.j_method, j_args)
-        elif r == 'F':
+        elif r == KIND_FLOAT:
             return env.CallStaticFloatMethodA(j_klass, self.j_method, j_args)
-        elif r == 'D':
+        elif r == KIND_DOUBLE:
             return env.CallStaticDoubleMethodA(j_klass, self.j_method, j_args)
-        elif r in 'L[':
+        elif r == KIND_OBJECT:
             return j2p(env.j_env, env.CallStaticObjectMethodA(j_klass, self.j_method, j_args))
         else:
             raise Exception(f"Invalid definition for {self.fqn()}: '{self.return_sig}'")
 
 
+# Maximum number of argument type combinations remembered by each JavaMultipleMethod.
+DEF OVERLOAD_CACHE_SIZE = 64
+
+OverloadCacheInfo = namedtuple("OverloadCacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
 cdef class JavaMultipleMethod(JavaMember):
     cdef list methods
     cdef dict overload_cache
+    cdef long cache_hits
+    cdef long cache_misses
+
+    # Candidate overloads for each number of arguments, in the same order as `methods`.
+    # `unbound_table` is for unbound calls, which pass the instance as the first argument. Any
+    # arity beyond the end of a table can only be matched by the varargs overloads.
+    cdef list bound_table
+    cdef list unbound_table
+    cdef list varargs_methods
 
     def __repr__(self):
         return f"<JavaMultipleMethod {self.methods}>"
@@ -969,51 +1487,110 @@ cdef class JavaMultipleMethod(JavaMember):
         self.methods = methods
         self.overload_cache = {}
 
+        cdef JavaMethod jm
+        self.varargs_methods = [jm for jm in methods if jm.is_varargs]
+        max_arity = max([jm.n_args for jm in methods]) + 1  # + 1 for unbound `this`.
+        self.bound_table = [[jm for jm in methods if arity_matches(jm, n_args, False)]
+                            for n_args in range(max_arity + 1)]
+        self.unbound_table = [[jm for jm in methods if arity_matches(jm, n_args, True)]
+                              for n_args in range(max_arity + 1)]
+
     def __get__(self, obj, objtype):
-        return lambda *args: self(obj, objtype, *args)
+        return JavaBoundMethod.create(self, obj, objtype)
 
     def __call__(self, obj, objtype, *args):
+        return self.call(obj, objtype, None if obj is None else obj._chaquopy_this, args)
+
+    def cache_info(self):
+        """Returns statistics about the overload resolution cache, in the same format as
+        `functools.lru_cache`."""
+        return OverloadCacheInfo(self.cache_hits, self.cache_misses, OVERLOAD_CACHE_SIZE,
+                                 len(self.overload_cache))
+
+    cdef call(self, obj, objtype, JNIRef this, tuple args):
         args_types = tuple(map(type, args))
         obj_args_types = (type(obj), args_types)
         best_overload = self.overload_cache.get(obj_args_types)
-        if not best_overload:
-            env = CQPEnv()
-
-            # JLS 15.12.2.2. "Identify Matching Arity Methods Applicable by Subtyping"
-            varargs = False
-            applicable = self.find_applicable(env, obj, args, autobox=False, varargs=False)
-
-            # JLS 15.12.2.3. "Identify Matching Arity Methods Applicable by Method Invocation
-            # Conversion"
-            if not applicable:
-                applicable = self.find_applicable(env, obj, args, autobox=True, varargs=False)
-
-            # JLS 15.12.2.4. "Identify Applicable Variable Arity Methods"
-            if not applicable:
-                varargs = True
-                applicable = self.find_applicable(env, obj, args, autobox=True, varargs=True)
-
-            if not applicable:
-                raise TypeError(self.overload_err(f"cannot be applied to", args, self.methods))
-
-            # JLS 15.12.2.5. "Choosing the Most Specific Method"
-            maximal = []
-            for jm1 in applicable:
-                if not any([better_overload(env, jm2, jm1, args_types, varargs=varargs)
-                            for jm2 in applicable if jm2 is not jm1]):
-                    maximal.append(jm1)
-            if len(maximal) != 1:
-                raise TypeError(self.overload_err(f"is ambiguous for arguments", args,
-                                                  maximal if maximal else applicable))
-            best_overload = maximal[0]
+        if best_overload is None:
+            self.cache_misses += 1
+            best_overload = self.resolve(obj, args, args_types)
+            if len(self.overload_cache) >= OVERLOAD_CACHE_SIZE:
+                # Evict the oldest entry. Another thread may have got there first.
+                self.overload_cache.pop(next(iter(self.overload_cache), None), None)
             self.overload_cache[obj_args_types] = best_overload
+        else:
+            self.cache_hits += 1
 
-        return best_overload.__get__(obj, objtype)(*args)
-
-    cdef find_applicable(self, CQPEnv env, obj, args, autobox, varargs):
+        cdef JavaMethod jm = best_overload
+        try:
+            if obj is None or jm.is_static or jm.is_constructor:
+                return jm.__get__(obj, objtype)(*args)
+            else:
+                virtual = (obj._chaquopy_real_obj is not None)
+                jm.check_abstract(virtual)
+                return jm.call(obj, this, args, virtual)
+        except TypeError:
+            # resolve doesn't check the arguments when there's only one candidate, so if they
+            # weren't applicable, give the same error as it would have.
+            if not self.is_applicable(CQPEnv(), obj, args, [jm]):
+                raise TypeError(self.overload_err(f"cannot be applied to", args,
+                                                  self.methods)) from None
+            raise
+
+    cdef JavaMethod resolve(self, obj, args, args_types):
+        cdef list table = self.unbound_table if obj is None else self.bound_table
+        cdef list candidates = (table[len(args)] if len(args) < len(table)
+                                else self.varargs_methods)
+        if not candidates:
+            raise TypeError(self.overload_err(f"cannot be applied to", args, self.methods))
+
+        if len(candidates) == 1:
+            # There's nothing to choose between, and converting the arguments speculatively
+            # would only duplicate the work of the call itself (see `call`).
+            return candidates[0]
+
+        # JLS 15.12.2.2. "Identify Matching Arity Methods Applicable by Subtyping"
+        env = CQPEnv()
+        varargs = False
+        applicable = self.find_applicable(env, obj, args, candidates, autobox=False,
+                                          varargs=False)
+
+        # JLS 15.12.2.3. "Identify Matching Arity Methods Applicable by Method Invocation
+        # Conversion"
+        if not applicable:
+            applicable = self.find_applicable(env, obj, args, candidates, autobox=True,
+                                              varargs=False)
+
+        # JLS 15.12.2.4. "Identify Applicable Variable Arity Methods"
+        if not applicable:
+            varargs = True
+            applicable = self.find_applicable(env, obj, args, candidates, autobox=True,
+                                              varargs=True)
+
+        if not applicable:
+            raise TypeError(self.overload_err(f"cannot be applied to", args, self.methods))
+
+        # JLS 15.12.2.5. "Choosing the Most Specific Method"
+        maximal = []
+        for jm1 in applicable:
+            if not any([better_overload(env, jm2, jm1, args_types, varargs=varargs)
+                        for jm2 in applicable if jm2 is not jm1]):
+                maximal.append(jm1)
+        if len(maximal) != 1:
+            raise TypeError(self.overload_err(f"is ambiguous for arguments", args,
+                                              maximal if maximal else applicable))
+        return maximal[0]
+
+    cdef bint is_applicable(self, CQPEnv env, obj, args, list candidates) except -1:
+        return bool(self.find_applicable(env, obj, args, candidates, autobox=True,
+                                         varargs=False) or
+                    self.find_applicable(env, obj, args, candidates, autobox=True,
+                                         varargs=True))
+
+    cdef find_applicable(self, CQPEnv env, obj, args, list candidates, autobox, varargs):
         result = []
         cdef JavaMethod jm
-        for jm in self.methods:
+        for jm in candidates:
             if obj is None and not (jm.is_static or jm.is_constructor):  # Unbound method
                 # TODO #1208 ambiguity still possible if isinstance() returns True but
                 # args[0] was intended as the first parameter of a static overload.
@@ -1032,3 +1609,99 @@ cdef class JavaMultipleMethod(JavaMember):
         args_type_names = "({})".format(", ".join([type(a).__name__ for a in args]))
         return (f"{self.fqn()} {msg} {args_type_names}: options are " +
                 ", ".join([jm.format_declaration() for jm in methods]))
+
+
+# Returns whether `jm` could possibly accept the given number of arguments.
+cdef bint arity_matches(JavaMethod jm, Py_ssize_t n_args, bint unbound):
+    if unbound and not (jm.is_static or jm.is_constructor):
+        n_args -= 1  # The first argument is `this`.
+        if n_args < 0:
+            return False
+    return (n_args == jm.n_args) or (jm.is_varargs and n_args >= jm.n_args - 1)
+
+
+cdef extern from *:
+    """
+    typedef PyObject *(*chaquopy_vectorcallfunc)(PyObject *, PyObject *const *, size_t,
+                                                 PyObject *);
+
+    static void chaquopy_enable_vectorcall(PyTypeObject *type, Py_ssize_t offset) {
+        type->tp_vectorcall_offset = offset;
+        type->tp_flags |= Py_TPFLAGS_HAVE_VECTORCALL;
+    }
+    """
+    ctypedef object (*chaquopy_vectorcallfunc)(object, PyObject **, size_t, PyObject *)
+    void chaquopy_enable_vectorcall(PyTypeObject *type, Py_ssize_t offset)
+    size_t PyVectorcall_NARGS(size_t nargsf)
+
+
+# A Java method bound to an instance, or a JavaMultipleMethod bound to a class. Because these
+# are created on every attribute access, they're designed to make the call as cheap as
+# possible: the receiver is unpacked in advance, and the arguments are received using the
+# vectorcall protocol (PEP 590).
+@cython.final
+cdef class JavaBoundMethod(object):
+    cdef chaquopy_vectorcallfunc vectorcall
+    cdef JavaMember member  # JavaMethod or JavaMultipleMethod
+    cdef obj
+    cdef objtype
+    cdef JNIRef this
+    cdef bint virtual
+
+    @staticmethod
+    cdef JavaBoundMethod create(JavaMember member, obj, objtype):
+        cdef JavaBoundMethod bm = JavaBoundMethod.__new__(JavaBoundMethod)
+        bm.vectorcall = <chaquopy_vectorcallfunc>JavaBoundMethod_vectorcall
+        bm.member = member
+        bm.obj = obj
+        bm.objtype = objtype
+
+        # A constructor is bound to the object it's initializing, which doesn't have a `this`
+        # yet. Constructors don't use `this` or `virtual` anyway.
+        if obj is not None and member.name != "<init>":
+            bm.this = obj._chaquopy_this
+            bm.virtual = (obj._chaquopy_real_obj is not None)
+        return bm
+
+    def __repr__(self):
+        return f"<bound method {self.member.fqn()} of {self.obj!r}>"
+
+    def __call__(self, *args):
+        return self.call(args)
+
+    cdef call(self, tuple args):
+        cdef JavaMethod jm
+        if type(self.member) is JavaMethod:
+            jm = self.member
+            jm.check_abstract(self.virtual)
+            return jm.call(self.obj, self.this, args, self.virtual)
+        else:
+            return (<JavaMultipleMethod?>self.member).call(self.obj, self.objtype, self.this,
+                                                           args)
+
+
+cdef object JavaBoundMethod_vectorcall(object self, PyObject **args, size_t nargsf,
+                                       PyObject *kwnames):
+    cdef JavaBoundMethod bm = self
+    if kwnames != NULL and len(<object>kwnames) > 0:
+        raise TypeError(f"{bm.member.fqn()} does not accept keyword arguments")
+
+    cdef Py_ssize_t nargs = PyVectorcall_NARGS(nargsf)
+    if nargs == 0:
+        return bm.call(())
+    args_tuple = PyTuple_New(nargs)
+    cdef Py_ssize_t i
+    for i in range(nargs):
+        arg = <object>args[i]
+        Py_INCREF(arg)  # PyTuple_SET_ITEM steals a reference.
+        PyTuple_SET_ITEM(args_tuple, i, arg)
+    return bm.call(args_tuple)
+
+
+cdef setup_bound_method_class():
+    # Cython has no syntax for the vectorcall protocol, so we enable it manually.
+    cdef JavaBoundMethod bm = JavaBoundMethod.__new__(JavaBoundMethod)
+    chaquopy_enable_vectorcall(<PyTypeObject*>JavaBoundMethod,
+                               <char*>&bm.vectorcall - <char*><PyObject*>bm)
+
+setup_bound_method_class()
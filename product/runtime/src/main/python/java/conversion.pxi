@@ -1,11 +1,16 @@
 from cpython.version cimport PY_MAJOR_VERSION
 
+from collections import OrderedDict, namedtuple
 from itertools import chain
 import re
 
 from cpython.object cimport PyObject
 from cpython.ref cimport Py_INCREF
+from cpython.mem cimport PyMem_Free, PyMem_Malloc
+from cpython.unicode cimport (Py_UCS1, Py_UCS2, PyUnicode_1BYTE_DATA, PyUnicode_1BYTE_KIND,
+                              PyUnicode_2BYTE_DATA, PyUnicode_2BYTE_KIND, PyUnicode_KIND)
 from libc.float cimport FLT_MAX
+from libc.string cimport strlen
 
 numpy = None  # Initialized by importer.py.
 
@@ -27,6 +32,60 @@ ARRAY_CONVERSIONS = ["Ljava/lang/Object;", "Ljava/lang/Cloneable;", "Ljava/io/Se
 # detect if that ever changes.
 DEF JCHAR_ENCODING = "UTF-16-LE"
 
+# Strings up to this length are read with GetStringCritical, which avoids a copy on JVMs which
+# store strings as UTF-16, and written from a stack buffer rather than a heap one.
+DEF STRING_CRITICAL_MAX = 1024
+
+# Python's compact string kinds let most strings be copied directly to and from jchar buffers,
+# without going through the UTF-16 codec and an intermediate bytes object. The UTF-16 codec is
+# still needed for surrogates, which Python and Java represent differently.
+cdef extern from *:
+    """
+    // Returns the bitwise OR of all the characters, which is enough to select the Python
+    // string kind, or 0x10000 if there are any surrogates.
+    static Py_UCS4 chaquopy_jchars_max(const jchar *chars, jsize length) {
+        jchar all = 0, surrogates = 0;
+        for (jsize i = 0; i < length; i++) {
+            all |= chars[i];
+            surrogates |= ((jchar)(chars[i] - 0xD800) < 0x800);
+        }
+        return surrogates ? 0x10000 : all;
+    }
+
+    // maxchar must be less than 0x10000. This doesn't call any JNI functions or run any Python
+    // code, so it's safe between GetStringCritical and ReleaseStringCritical.
+    static PyObject *chaquopy_jchars_to_unicode(const jchar *chars, jsize length,
+                                                Py_UCS4 maxchar) {
+        PyObject *s = PyUnicode_New(length, maxchar);
+        if (s == NULL) {
+            return NULL;
+        }
+        if (PyUnicode_KIND(s) == PyUnicode_1BYTE_KIND) {
+            Py_UCS1 *data = PyUnicode_1BYTE_DATA(s);
+            for (jsize i = 0; i < length; i++) {
+                data[i] = (Py_UCS1)chars[i];
+            }
+        } else {
+            memcpy(PyUnicode_2BYTE_DATA(s), chars, length * sizeof(jchar));
+        }
+        return s;
+    }
+
+    // Returns whether a 2-byte Python string contains any surrogates.
+    static int chaquopy_ucs2_has_surrogates(const Py_UCS2 *data, Py_ssize_t length) {
+        Py_UCS2 surrogates = 0;
+        for (Py_ssize_t i = 0; i < length; i++) {
+            surrogates |= ((Py_UCS2)(data[i] - 0xD800) < 0x800);
+        }
+        return surrogates;
+    }
+    """
+    Py_UCS4 chaquopy_jchars_max(const jchar *chars, jsize length) nogil
+    object chaquopy_jchars_to_unicode(const jchar *chars, jsize length, Py_UCS4 maxchar)
+    bint chaquopy_ucs2_has_surrogates(const Py_UCS2 *data, Py_ssize_t length) nogil
+    bint PyUnicode_IS_ASCII(object o)
+    bint PyUnicode_CHECK_INTERNED(object o)
+
 
 # Useful if d is an OrderedDict.
 cdef dict_index(d, key):
@@ -36,62 +95,141 @@ cdef dict_index(d, key):
     raise KeyError(key)
 
 
+# If a parameter of the given type could receive a Python sequence converted to a new array,
+# returns the element type of that array, otherwise returns None.
+cdef output_sig(arg_sig):
+    if arg_sig[0] == "[":
+        return arg_sig[1:]
+    elif arg_sig in ARRAY_CONVERSIONS:
+        return "Ljava/lang/Object;"  # See p2j.
+    else:
+        return None
+
+
 # Copy back any modifications the Java method may have made to mutable parameters.
-cdef copy_output_args(CQPEnv env, args, p2j_args):
-    for arg, p2j_arg in zip(args, p2j_args):
-        if isinstance(p2j_arg, JNIRef) and p2j_arg:
-            argtype = object_sig(env, p2j_arg)
-            if argtype[0] == "[" and not isinstance(arg, JavaArray):
-                ret = jarray(argtype[1:])(instance=p2j_arg)
-                try:
-                    arg[:] = ret
-                except TypeError:
-                    pass    # The arg was a tuple or other read-only sequence.
+cdef copy_output_args(list output_args):
+    for arg, element_sig, p2j_arg in output_args:
+        ret = jarray(element_sig)(instance=p2j_arg)
+        try:
+            arg[:] = ret
+        except TypeError:
+            pass    # The arg has a __setitem__ method, but doesn't support slices.
 
 
-# Cython auto-generates range checking code for the integral types.
-cdef populate_args(JavaMethod jm, p2j_args, jvalue *j_args):
-    for index, argtype in enumerate(jm.args_sig):
-        py_arg = p2j_args[index]
-        if argtype == 'Z':
-            j_args[index].z = py_arg
-        elif argtype == 'B':
-            j_args[index].b = py_arg
-        elif argtype == 'C':
-            check_range_char(py_arg)
-            j_args[index].c = ord(py_arg)
-        elif argtype == 'S':
-            j_args[index].s = py_arg
-        elif argtype == 'I':
-            j_args[index].i = py_arg
-        elif argtype == 'J':
-            j_args[index].j = py_arg
-        elif argtype == 'F':
-            check_range_float32(py_arg)
-            j_args[index].f = py_arg
-        elif argtype == 'D':
-            j_args[index].d = py_arg
-        elif argtype[0] in 'L[':
+# Converts the arguments of a call to `jm`, and stores them in `j_args`. Returns the p2j
+# results, which must be kept alive until the call is complete.
+#
+# Any arguments which were converted from mutable Python sequences to new arrays are added
+# to `output_args`, in the form expected by copy_output_args. Passing a tuple or other
+# read-only sequence therefore avoids the cost of copying back.
+cdef convert_args(JavaMethod jm, JNIEnv *j_env, args, jvalue *j_args, list output_args):
+    if jm.n_args == 0:
+        return ()
+
+    p2j_args = []
+    cdef Py_ssize_t index
+    cdef SigKind kind
+    for index in range(jm.n_args):
+        arg = args[index]
+        kind = jm.arg_kinds[index]
+        if kind == KIND_OBJECT:
+            py_arg = LocalRef() if arg is None else p2j(j_env, jm.args_sig[index], arg)
             j_args[index].l = (<JNIRef?>py_arg).obj
+            element_sig = jm.output_sigs[index]
+            if (element_sig is not None and py_arg and
+                not isinstance(arg, JavaObject) and hasattr(type(arg), "__setitem__")):
+                output_args.append((arg, element_sig, py_arg))
+        else:
+            # The plain Python types are by far the most common, and they don't need any of
+            # the checks in p2j.
+            py_arg = arg if is_exact_primitive(kind, arg) else p2j(j_env, jm.args_sig[index], arg)
+            set_jvalue(kind, &j_args[index], py_arg)
+        p2j_args.append(py_arg)
+    return p2j_args
+
+
+cdef bint is_exact_primitive(SigKind kind, arg):
+    t = type(arg)
+    if kind == KIND_BOOLEAN:
+        return t is bool
+    elif kind == KIND_CHAR:
+        return t is unicode
+    elif kind == KIND_FLOAT or kind == KIND_DOUBLE:
+        return t is float or t is int
+    else:
+        return t is int
+
+
+# `value` must be a primitive value returned by p2j.
+#
+# Cython auto-generates range checking code for the integral types.
+cdef set_jvalue(SigKind kind, jvalue *j_value, value):
+    if kind == KIND_BOOLEAN:
+        j_value.z = value
+    elif kind == KIND_BYTE:
+        j_value.b = value
+    elif kind == KIND_CHAR:
+        check_range_char(value)
+        j_value.c = ord(value)
+    elif kind == KIND_SHORT:
+        j_value.s = value
+    elif kind == KIND_INT:
+        j_value.i = value
+    elif kind == KIND_LONG:
+        j_value.j = value
+    elif kind == KIND_FLOAT:
+        check_range_float32(value)
+        j_value.f = value
+    elif kind == KIND_DOUBLE:
+        j_value.d = value
+    else:
+        raise ValueError(f"Invalid kind {kind}")
 
 
+cdef enum J2PKind:
+    J2P_OBJECT, J2P_BOXED, J2P_STRING, J2P_PYOBJECT
+
+# Maps Java Class objects to a tuple of (J2PKind, data), where data is the Python class for
+# J2P_OBJECT, or the BoxType for J2P_BOXED. Keys are compared using IsSameObject, so a class
+# will never be confused with another class of the same name from a different ClassLoader.
+# This cache is cleared whenever the Python class for a given name is replaced (see
+# JavaClass.__new__).
+cdef dict j2p_class_cache = {}
+
 cdef j2p(JNIEnv *j_env, JNIRef j_object):
     if not j_object:
         return None
     env = CQPEnv.wrap(j_env)
     j_klass = env.GetObjectClass(j_object)
 
-    sig = klass_sig(env, j_klass)
-    if sig == 'Ljava/lang/String;':
+    # Looking up the Class object by identity is much faster than calling Class.getName and
+    # then looking up the Python class by name.
+    entry = j2p_class_cache.get(j_klass)
+    if entry is None:
+        entry = j2p_class_entry(env, j_klass)
+    kind, data = <tuple>entry
+
+    if kind == J2P_OBJECT:
+        return data(instance=j_object)
+    if kind == J2P_BOXED:
+        return (<BoxType>data).unbox(env, j_object)
+    if kind == J2P_STRING:
         return j2p_string(j_env, j_object)
-    if sig == 'Lcom/chaquo/python/PyObject;':
-        return j2p_pyobject(j_env, j_object.obj)
+    return j2p_pyobject(j_env, j_object.obj)
 
-    unbox_method = UNBOX_METHODS.get(sig)
-    if unbox_method:
-        return getattr(jclass(sig)(instance=j_object), unbox_method)()
 
-    return jclass_from_j_klass(sig, j_klass)(instance=j_object)
+cdef tuple j2p_class_entry(CQPEnv env, JNIRef j_klass):
+    sig = klass_sig(env, j_klass)
+    if sig == 'Ljava/lang/String;':
+        entry = (J2P_STRING, None)
+    elif sig == 'Lcom/chaquo/python/PyObject;':
+        entry = (J2P_PYOBJECT, None)
+    elif sig in UNBOX_METHODS:
+        entry = (J2P_BOXED, get_box_type(env, sig[len("Ljava/lang/"):-1]))
+    else:
+        entry = (J2P_OBJECT, jclass_from_j_klass(sig, j_klass))
+    j2p_class_cache[j_klass.global_ref()] = entry
+    return entry
 
 
 # j_string MUST be a (possibly-null) String, or there may be a native crash.
@@ -99,13 +237,36 @@ cdef unicode j2p_string(JNIEnv *j_env, JNIRef j_string):
     if not j_string:
         raise ValueError("String cannot be null")
 
-    cdef const jchar *jchar_str = j_env[0].GetStringChars(j_env, j_string.obj, NULL)
+    cdef jsize str_len = j_env[0].GetStringLength(j_env, j_string.obj)
+    if str_len == 0:
+        return u""
+
+    cdef const jchar *jchar_str
+    cdef Py_UCS4 maxchar
+    if str_len <= STRING_CRITICAL_MAX:
+        jchar_str = j_env[0].GetStringCritical(j_env, j_string.obj, NULL)
+        if jchar_str == NULL:
+            raise Exception("GetStringCritical failed")
+        maxchar = chaquopy_jchars_max(jchar_str, str_len)
+        if maxchar < 0x10000:
+            try:
+                return chaquopy_jchars_to_unicode(jchar_str, str_len, maxchar)
+            finally:
+                j_env[0].ReleaseStringCritical(j_env, j_string.obj, jchar_str)
+        j_env[0].ReleaseStringCritical(j_env, j_string.obj, jchar_str)
+
+    # Decoding may raise an exception, which isn't safe within a critical section.
+    jchar_str = j_env[0].GetStringChars(j_env, j_string.obj, NULL)
     if jchar_str == NULL:
         raise Exception("GetStringChars failed")
-    cdef int str_len = j_env[0].GetStringLength(j_env, j_string.obj)
-    s = (<char*>jchar_str)[:str_len * 2].decode(JCHAR_ENCODING)  # 2 bytes/char for UTF-16.
-    j_env[0].ReleaseStringChars(j_env, j_string.obj, jchar_str)
-    return s
+    try:
+        maxchar = chaquopy_jchars_max(jchar_str, str_len)
+        if maxchar < 0x10000:
+            return chaquopy_jchars_to_unicode(jchar_str, str_len, maxchar)
+        else:
+            return (<char*>jchar_str)[:str_len * 2].decode(JCHAR_ENCODING)  # 2 bytes/char for UTF-16.
+    finally:
+        j_env[0].ReleaseStringChars(j_env, j_string.obj, jchar_str)
 
 
 # jpyobject MUST be a (possibly-null) PyObject, or there may be a native crash.
@@ -302,14 +463,111 @@ cpdef check_range_char(value):
         raise TypeError("Cannot convert non-BMP character to char")
 
 
+StringCacheInfo = namedtuple("StringCacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Maps interned Python strings to GlobalRefs of their Java equivalents, in order of least
+# recent use. Java strings are immutable, so they can safely be shared between calls.
+cdef object string_cache = OrderedDict()
+cdef Py_ssize_t string_cache_maxsize = 0
+cdef long string_cache_hits = 0
+cdef long string_cache_misses = 0
+
+
+def set_string_cache_size(maxsize):
+    """Sets the maximum number of entries in the string cache. This is 0 by default, which
+    disables the cache.
+
+    When the cache is enabled, each interned Python string converted to Java reuses the same
+    Java `String` object, rather than creating a new one every time. Python automatically
+    interns string literals which look like identifiers, and others can be interned with
+    :any:`sys.intern` or :any:`cache_string`. Once the cache is full, the least recently used
+    entry is removed.
+    """
+    global string_cache_maxsize
+    if not (isinstance(maxsize, int) and maxsize >= 0):
+        raise ValueError(f"Invalid string cache size: {maxsize!r}")
+    string_cache_maxsize = maxsize
+    while len(string_cache) > maxsize:
+        string_cache.popitem(last=False)
+
+
+def string_cache_info():
+    """Returns a named tuple showing the string cache's `hits`, `misses`, `maxsize` and
+    `currsize`, in the same format as :any:`functools.lru_cache`.
+    """
+    return StringCacheInfo(string_cache_hits, string_cache_misses, string_cache_maxsize,
+                           len(string_cache))
+
+
+def cache_string(s):
+    """Interns the given string and adds it to the string cache, if the cache is enabled.
+    Returns the interned string, which should be used in place of the original.
+    """
+    s = sys.intern(s)
+    if string_cache_maxsize:
+        string_cache_lookup(get_jnienv(), s)
+    return s
+
+
+cdef JNIRef string_cache_lookup(JNIEnv *j_env, unicode s):
+    global string_cache_hits, string_cache_misses
+    j_s = string_cache.get(s)
+    if j_s is not None:
+        string_cache_hits += 1
+        string_cache.move_to_end(s)
+        return j_s
+
+    string_cache_misses += 1
+    j_s = new_string(j_env, s).global_ref()
+    string_cache[s] = j_s
+    if len(string_cache) > string_cache_maxsize:
+        string_cache.popitem(last=False)
+    return j_s
+
+
 cdef JNIRef p2j_string(JNIEnv *j_env, unicode s):
+    if string_cache_maxsize and PyUnicode_CHECK_INTERNED(s):
+        return string_cache_lookup(j_env, s)
+    return new_string(j_env, s)
+
+
+cdef JNIRef new_string(JNIEnv *j_env, unicode s):
     # Python strings can contain invalid surrogates, but Java strings cannot.
     # "backslashreplace" would retain some information about the invalid character, but
     # we don't know what context this string will be used in, so changing its length
     # could cause much worse confusion.
-    utf16 = s.encode(JCHAR_ENCODING, errors="replace")
-    return LocalRef.adopt(j_env, j_env[0].NewString(
-        j_env, <jchar*><char*>utf16, len(utf16)//2))  # 2 bytes/char for UTF-16.
+    cdef Py_ssize_t length = len(s)
+    cdef int kind = PyUnicode_KIND(s)
+    cdef jchar stack_buf[STRING_CRITICAL_MAX]
+    cdef jchar *buf
+    cdef Py_UCS1 *data
+    cdef Py_ssize_t i
+    cdef jstring result
+    if kind == PyUnicode_1BYTE_KIND:
+        data = PyUnicode_1BYTE_DATA(s)
+        if PyUnicode_IS_ASCII(s) and <Py_ssize_t>strlen(<char*>data) == length:
+            # ASCII is valid modified UTF-8 as long as it has no null characters.
+            result = j_env[0].NewStringUTF(j_env, <char*>data)
+        else:
+            if length <= STRING_CRITICAL_MAX:
+                buf = &stack_buf[0]
+            else:
+                buf = <jchar*>PyMem_Malloc(length * sizeof(jchar))
+                if buf == NULL:
+                    raise MemoryError()
+            for i in range(length):
+                buf[i] = data[i]
+            result = j_env[0].NewString(j_env, buf, length)
+            if buf != &stack_buf[0]:
+                PyMem_Free(buf)
+    elif (kind == PyUnicode_2BYTE_KIND and
+          not chaquopy_ucs2_has_surrogates(PyUnicode_2BYTE_DATA(s), length)):
+        result = j_env[0].NewString(j_env, <jchar*>PyUnicode_2BYTE_DATA(s), length)
+    else:
+        utf16 = s.encode(JCHAR_ENCODING, errors="replace")
+        result = j_env[0].NewString(
+            j_env, <jchar*><char*>utf16, len(utf16)//2)  # 2 bytes/char for UTF-16.
+    return LocalRef.adopt(j_env, result)
 
 
 cdef box_sig(JNIEnv *j_env, JNIRef j_klass):
@@ -319,22 +577,110 @@ cdef box_sig(JNIEnv *j_env, JNIRef j_klass):
 
 
 cdef JNIRef p2j_box(CQPEnv env, JNIRef j_klass, str box_cls_name, value):
-    full_box_cls_name = "java.lang." + box_cls_name
-    j_box_klass = env.FindClass(full_box_cls_name)
-    if not env.IsAssignableFrom(j_box_klass, j_klass):
+    box = get_box_type(env, box_cls_name)
+    if not env.IsAssignableFrom(box.j_klass, j_klass):
         return None
 
     if isinstance(value, Primitive):
         value = value.value
-
-    # Uniquely among the boxed types, the Float class has two primitive-typed constructors, one
-    # of which takes a double, which our overload resolution will prefer.
-    if box_cls_name == "Float":
-        check_range_float32(value)
-
-    # This will result in a recursive call to p2j, this time requesting the primitive type of
-    # the constructor parameter. Range checks will be performed by populate_args.
-    return jclass(full_box_cls_name)(value)._chaquopy_this
+    return box.box(env, value)
+
+
+# Gives direct JNI access to the primitive wrapper classes. This avoids the overhead of
+# reflection and overload resolution when boxing and unboxing, which is very common when using
+# generic APIs such as collections.
+@cython.final
+cdef class BoxType:
+    cdef SigKind kind
+    cdef GlobalRef j_klass
+    cdef jmethodID mid_valueOf
+    cdef jmethodID mid_unbox
+
+    # valueOf is guaranteed to return the same object every time for these values (JLS 5.1.7),
+    # so we can cache them without changing any behavior.
+    cdef dict small_values
+
+    def __init__(self, CQPEnv env, str box_cls_name):
+        sig = BOX_SIGS[box_cls_name]
+        self.kind = sig_kind(sig)
+        self.j_klass = env.FindClass("java.lang." + box_cls_name)
+        self.mid_valueOf = env.GetStaticMethodID(self.j_klass, "valueOf",
+                                                 f"({sig})Ljava/lang/{box_cls_name};")
+        self.mid_unbox = env.GetMethodID(self.j_klass,
+                                         UNBOX_METHODS[f"Ljava/lang/{box_cls_name};"], f"(){sig}")
+        self.small_values = {}
+
+    # `value` must be a primitive value of a type accepted by set_jvalue.
+    cdef JNIRef box(self, CQPEnv env, value):
+        small = self.is_small(value)
+        if small:
+            result = self.small_values.get(value)
+            if result is not None:
+                return result
+
+        cdef jvalue j_arg
+        set_jvalue(self.kind, &j_arg, value)
+        keep_gil = env.keep_gil
+        env.keep_gil = True  # See comment in unbox.
+        try:
+            result = env.CallStaticObjectMethodA(self.j_klass, self.mid_valueOf, &j_arg)
+        finally:
+            env.keep_gil = keep_gil
+        if small:
+            result = result.global_ref()
+            self.small_values[value] = result
+        return result
+
+    cdef bint is_small(self, value):
+        if self.kind == KIND_BOOLEAN:
+            return True
+        elif self.kind == KIND_CHAR:
+            return type(value) is unicode and len(value) == 1 and ord(value) <= 127
+        elif self.kind == KIND_FLOAT or self.kind == KIND_DOUBLE:
+            return False
+        else:
+            return type(value) is int and -128 <= value <= 127
+
+    # `this` must be an instance of this box type, or there may be a native crash.
+    cdef unbox(self, CQPEnv env, JNIRef this):
+        # These methods are so trivial that releasing the GIL would cost far more than the
+        # call itself.
+        keep_gil = env.keep_gil
+        env.keep_gil = True
+        try:
+            return self.unbox_call(env, this)
+        finally:
+            env.keep_gil = keep_gil
+
+    cdef unbox_call(self, CQPEnv env, JNIRef this):
+        cdef SigKind k = self.kind
+        if k == KIND_BOOLEAN:
+            return env.CallBooleanMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_BYTE:
+            return env.CallByteMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_CHAR:
+            return env.CallCharMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_SHORT:
+            return env.CallShortMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_INT:
+            return env.CallIntMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_LONG:
+            return env.CallLongMethodA(this, self.mid_unbox, NULL)
+        elif k == KIND_FLOAT:
+            return env.CallFloatMethodA(this, self.mid_unbox, NULL)
+        else:
+            return env.CallDoubleMethodA(this, self.mid_unbox, NULL)
+
+
+BOX_SIGS = {box_cls_name: sig for sig, box_cls_name in PRIMITIVE_TYPES.items()}
+
+cdef dict box_types = {}  # Keyed by class name, e.g. "Integer".
+
+cdef BoxType get_box_type(CQPEnv env, str box_cls_name):
+    box = box_types.get(box_cls_name)
+    if box is None:
+        box = box_types[box_cls_name] = BoxType(env, box_cls_name)
+    return box
 
 
 cdef jlong p2j_pyobject(JNIEnv *j_env, obj) except? 0:
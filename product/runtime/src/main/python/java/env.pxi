@@ -1,8 +1,56 @@
 from cpython.object cimport Py_EQ, Py_NE
+from cpython.pystate cimport PyThreadState
+
+cdef extern from "Python.h":
+    PyThreadState *PyEval_SaveThread()
+    void PyEval_RestoreThread(PyThreadState *tstate)
+
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static long long chaquopy_monotonic_ns(void) {
+        LARGE_INTEGER count, freq;
+        QueryPerformanceCounter(&count);
+        QueryPerformanceFrequency(&freq);
+        return (long long)((double)count.QuadPart * 1e9 / (double)freq.QuadPart);
+    }
+    #else
+    #include <time.h>
+    static long long chaquopy_monotonic_ns(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (long long)ts.tv_sec * 1000000000LL + ts.tv_nsec;
+    }
+    #endif
+    """
+    long long chaquopy_monotonic_ns() nogil
 
 
 cdef dict FindClass_cache = {}
 
+# Names which FindClass failed to find, mapped to their exception messages, in order of least
+# recent use. Library code often probes for optional modules with `try: from x import y`,
+# which makes the import hook look up the same missing names repeatedly, and a failed
+# Class.forName is expensive, especially on Android. The ClassLoader's classpath can't change,
+# so this only needs to be cleared when the ClassLoader itself does (see set_jvm).
+cdef object FindClass_missing = OrderedDict()
+DEF FINDCLASS_MISSING_MAXSIZE = 1024
+
+# Returns whether FindClass has already failed to find the given name. This allows callers
+# which expect most of their names to be missing to avoid creating an exception.
+cdef bint is_class_missing(name) except -1:
+    try:
+        FindClass_missing.move_to_end(name)
+        return True
+    except KeyError:
+        return False
+
+# Whether one class is assignable from another can never change, and overload resolution and
+# argument conversion ask the same questions over and over again. Keys are pairs of GlobalRefs,
+# which are compared by identity before IsSameObject is needed.
+cdef dict IsAssignableFrom_cache = {}
+
 
 # Friendlier interface to JNIEnv:
 #   * Checks for and raises Java exceptions.
@@ -17,6 +65,14 @@ cdef dict FindClass_cache = {}
 cdef class CQPEnv(object):
     cdef JNIEnv *j_env
 
+    # The GIL is released during calls to Java methods and constructors, unless `keep_gil` is
+    # set. If `time_calls` is set, the duration of the most recent call, not including
+    # releasing and reacquiring the GIL, will be stored in `call_ns`. See set_gil_policy.
+    cdef bint keep_gil
+    cdef bint time_calls
+    cdef long long call_ns
+    cdef PyThreadState *thread_state
+
     def __init__(self, get=True):
         if get:
             self.j_env = get_jnienv()
@@ -27,6 +83,19 @@ cdef class CQPEnv(object):
         env.j_env = j_env
         return env
 
+    # Between these two calls, Python APIs must not be used unless `keep_gil` is set.
+    cdef inline void begin_call(self) noexcept:
+        if not self.keep_gil:
+            self.thread_state = PyEval_SaveThread()
+        if self.time_calls:
+            self.call_ns = chaquopy_monotonic_ns()
+
+    cdef inline void end_call(self) noexcept:
+        if self.time_calls:
+            self.call_ns = chaquopy_monotonic_ns() - self.call_ns
+        if not self.keep_gil:
+            PyEval_RestoreThread(self.thread_state)
+
     # All common notations may be used, including '.' or '/' to separate package names, and
     # optional "L" and ";" at start and end. Use a leading "[" for array types.
     #
@@ -45,6 +114,8 @@ cdef class CQPEnv(object):
         except KeyError: pass
 
         global ClassNotFoundException, NoClassDefFoundError
+        if is_class_missing(name):
+            raise NoClassDefFoundError(FindClass_missing.get(name, name))
         try:
             if not mid_forName:    # Bootstrap not complete (see set_jvm)
                 result = self.FindClass_JNI(name)
@@ -58,6 +129,9 @@ cdef class CQPEnv(object):
             # don't have to catch both. However, putting ClassNotFoundException directly in an
             # `except` clause won't work if bootstrap isn't complete.
             if (ClassNotFoundException is not None) and isinstance(e, ClassNotFoundException):
+                FindClass_missing[name] = e.getMessage()
+                if len(FindClass_missing) > FINDCLASS_MISSING_MAXSIZE:
+                    FindClass_missing.popitem(last=False)
                 ncdfe = NoClassDefFoundError(e.getMessage())
                 ncdfe.setStackTrace(e.getStackTrace())
                 raise ncdfe
@@ -92,7 +166,17 @@ cdef class CQPEnv(object):
                                             mid_forName, j_args)
 
     cdef IsAssignableFrom(self, JNIRef j_klass1, JNIRef j_klass2):
-        return bool(self.j_env[0].IsAssignableFrom(self.j_env, j_klass1.obj, j_klass2.obj))
+        # Only long-lived references can be used as cache keys. All the callers in this module
+        # pass GlobalRefs obtained from FindClass or a class's _chaquopy_j_klass.
+        if not (type(j_klass1) is GlobalRef and type(j_klass2) is GlobalRef):
+            return bool(self.j_env[0].IsAssignableFrom(self.j_env, j_klass1.obj, j_klass2.obj))
+
+        key = (j_klass1, j_klass2)
+        result = IsAssignableFrom_cache.get(key)
+        if result is None:
+            result = bool(self.j_env[0].IsAssignableFrom(self.j_env, j_klass1.obj, j_klass2.obj))
+            IsAssignableFrom_cache[key] = result
+        return result
 
     cdef LocalRef ExceptionOccurred(self):
         return self.adopt(self.j_env[0].ExceptionOccurred(self.j_env))
@@ -105,8 +189,9 @@ cdef class CQPEnv(object):
 
     cdef LocalRef NewObjectA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jobject result
-        with nogil:
-            result = self.j_env[0].NewObjectA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].NewObjectA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return self.adopt(result)
 
@@ -116,6 +201,13 @@ cdef class CQPEnv(object):
     cdef IsInstanceOf(self, JNIRef obj, JNIRef j_klass):
         return bool(self.j_env[0].IsInstanceOf(self.j_env, obj.obj, j_klass.obj))
 
+    cdef LocalRef ToReflectedMethod(self, JNIRef j_klass, jmethodID mid, bint is_static):
+        result = self.adopt(self.j_env[0].ToReflectedMethod(self.j_env, j_klass.obj, mid,
+                                                            is_static))
+        if not result:
+            self.expect_exception("ToReflectedMethod failed")
+        return result
+
     cdef jmethodID GetMethodID(self, JNIRef j_klass, name, definition) except NULL:
         cdef jmethodID result = self.j_env[0].GetMethodID \
             (self.j_env, j_klass.obj, str_for_c(name), str_for_c(definition))
@@ -125,120 +217,140 @@ cdef class CQPEnv(object):
 
     cdef LocalRef CallObjectMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jobject result
-        with nogil:
-            result = self.j_env[0].CallObjectMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallObjectMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return self.adopt(result)
     cdef CallBooleanMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jboolean result
-        with nogil:
-            result = self.j_env[0].CallBooleanMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallBooleanMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return bool(result)
     cdef CallByteMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jbyte result
-        with nogil:
-            result = self.j_env[0].CallByteMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallByteMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallCharMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jchar result
-        with nogil:
-            result = self.j_env[0].CallCharMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallCharMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return chr(result)
     cdef CallShortMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jshort result
-        with nogil:
-            result = self.j_env[0].CallShortMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallShortMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallIntMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jint result
-        with nogil:
-            result = self.j_env[0].CallIntMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallIntMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallLongMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jlong result
-        with nogil:
-            result = self.j_env[0].CallLongMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallLongMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallFloatMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jfloat result
-        with nogil:
-            result = self.j_env[0].CallFloatMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallFloatMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallDoubleMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
         cdef jdouble result
-        with nogil:
-            result = self.j_env[0].CallDoubleMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallDoubleMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallVoidMethodA(self, JNIRef this, jmethodID mid, jvalue *args):
-        with nogil:
-            self.j_env[0].CallVoidMethodA(self.j_env, this.obj, mid, args)
+        self.begin_call()
+        self.j_env[0].CallVoidMethodA(self.j_env, this.obj, mid, args)
+        self.end_call()
         self.check_exception()
 
     cdef LocalRef CallNonvirtualObjectMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jobject result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualObjectMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualObjectMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return self.adopt(result)
     cdef CallNonvirtualBooleanMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jboolean result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualBooleanMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualBooleanMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return bool(result)
     cdef CallNonvirtualByteMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jbyte result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualByteMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualByteMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualCharMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jchar result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualCharMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualCharMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return chr(result)
     cdef CallNonvirtualShortMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jshort result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualShortMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualShortMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualIntMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jint result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualIntMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualIntMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualLongMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jlong result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualLongMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualLongMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualFloatMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jfloat result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualFloatMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualFloatMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualDoubleMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jdouble result
-        with nogil:
-            result = self.j_env[0].CallNonvirtualDoubleMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallNonvirtualDoubleMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallNonvirtualVoidMethodA(self, JNIRef this, JNIRef j_klass, jmethodID mid, jvalue *args):
-        with nogil:
-            self.j_env[0].CallNonvirtualVoidMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.begin_call()
+        self.j_env[0].CallNonvirtualVoidMethodA(self.j_env, this.obj, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
 
     cdef jfieldID GetFieldID(self, JNIRef j_klass, name, definition) except NULL:
@@ -257,61 +369,71 @@ cdef class CQPEnv(object):
 
     cdef LocalRef CallStaticObjectMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jobject result
-        with nogil:
-            result = self.j_env[0].CallStaticObjectMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticObjectMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return self.adopt(result)
     cdef CallStaticBooleanMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jboolean result
-        with nogil:
-            result = self.j_env[0].CallStaticBooleanMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticBooleanMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return bool(result)
     cdef CallStaticByteMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jbyte result
-        with nogil:
-            result = self.j_env[0].CallStaticByteMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticByteMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticCharMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jchar result
-        with nogil:
-            result = self.j_env[0].CallStaticCharMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticCharMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return chr(result)
     cdef CallStaticShortMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jshort result
-        with nogil:
-            result = self.j_env[0].CallStaticShortMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticShortMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticIntMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jint result
-        with nogil:
-            result = self.j_env[0].CallStaticIntMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticIntMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticLongMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jlong result
-        with nogil:
-            result = self.j_env[0].CallStaticLongMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticLongMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticFloatMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jfloat result
-        with nogil:
-            result = self.j_env[0].CallStaticFloatMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticFloatMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticDoubleMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
         cdef jdouble result
-        with nogil:
-            result = self.j_env[0].CallStaticDoubleMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        result = self.j_env[0].CallStaticDoubleMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
         return result
     cdef CallStaticVoidMethodA(self, JNIRef j_klass, jmethodID mid, jvalue *args):
-        with nogil:
-            self.j_env[0].CallStaticVoidMethodA(self.j_env, j_klass.obj, mid, args)
+        self.begin_call()
+        self.j_env[0].CallStaticVoidMethodA(self.j_env, j_klass.obj, mid, args)
+        self.end_call()
         self.check_exception()
 
     cdef jfieldID GetStaticFieldID(self, JNIRef j_klass, name, definition) except NULL:
@@ -401,6 +523,41 @@ cdef class CQPEnv(object):
     cdef void ReleaseCharArrayElements(self, JNIRef array, jchar *elems, jint mode):
         self.j_env[0].ReleaseCharArrayElements(self.j_env, array.obj, elems, mode)
 
+    cdef LocalRef NewDirectByteBuffer(self, void *address, jlong capacity):
+        result = self.adopt(self.j_env[0].NewDirectByteBuffer(self.j_env, address, capacity))
+        if not result:
+            self.expect_exception("NewDirectByteBuffer failed")
+        return result
+    cdef void *GetDirectBufferAddress(self, JNIRef buf):
+        return self.j_env[0].GetDirectBufferAddress(self.j_env, buf.obj)
+    cdef jlong GetDirectBufferCapacity(self, JNIRef buf):
+        return self.j_env[0].GetDirectBufferCapacity(self.j_env, buf.obj)
+
+    cdef GetBooleanArrayRegion(self, JNIRef array, jsize start, jsize length, jboolean *buf):
+        self.j_env[0].GetBooleanArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetByteArrayRegion(self, JNIRef array, jsize start, jsize length, jbyte *buf):
+        self.j_env[0].GetByteArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetShortArrayRegion(self, JNIRef array, jsize start, jsize length, jshort *buf):
+        self.j_env[0].GetShortArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetIntArrayRegion(self, JNIRef array, jsize start, jsize length, jint *buf):
+        self.j_env[0].GetIntArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetLongArrayRegion(self, JNIRef array, jsize start, jsize length, jlong *buf):
+        self.j_env[0].GetLongArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetFloatArrayRegion(self, JNIRef array, jsize start, jsize length, jfloat *buf):
+        self.j_env[0].GetFloatArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetDoubleArrayRegion(self, JNIRef array, jsize start, jsize length, jdouble *buf):
+        self.j_env[0].GetDoubleArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+    cdef GetCharArrayRegion(self, JNIRef array, jsize start, jsize length, jchar *buf):
+        self.j_env[0].GetCharArrayRegion(self.j_env, array.obj, start, length, buf)
+        self.check_exception()
+
     # The primitive type Get...ArrayElement functions are not in the JNI, but are provided for
     # convenience.
     cdef GetBooleanArrayElement(self, JNIRef array, jint index):
@@ -588,11 +745,16 @@ cdef class JNIRef(object):
     def __bool__(self):
         return self.obj != NULL
 
+    # The new reference refers to the same object, so it can reuse the cached hash code.
     cdef GlobalRef global_ref(self):
-        return GlobalRef.create(get_jnienv(), self.obj)
+        gr = GlobalRef.create(get_jnienv(), self.obj)
+        gr.hash_code = self.hash_code
+        return gr
 
     cdef WeakRef weak_ref(self):
-        return WeakRef.create(get_jnienv(), self.obj)
+        wr = WeakRef.create(get_jnienv(), self.obj)
+        wr.hash_code = self.hash_code
+        return wr
 
     cdef jobject return_ref(self, JNIEnv *env):
         """Returns a new local reference suitable for returning from a `native` method or otherwise
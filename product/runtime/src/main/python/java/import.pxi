@@ -1,118 +1,199 @@
-import builtins
+from importlib.machinery import ModuleSpec
+from os.path import dirname, isdir, isfile, join
 from types import ModuleType
 
 
-import_original = builtins.__import__
-
 cpdef set_import_enabled(enable):
     """Sets whether the import hook is enabled. The import hook is enabled automatically when the
     `java` module is first loaded, so you only need to call this function if you want to
     disable it.
     """  # Further documentation in python.rst
-    builtins.__import__ = import_override if enable else import_original
-
-
-def import_override(name, globals={}, locals={}, fromlist=None, level=0):
+    if enable:
+        if java_importer not in sys.meta_path:
+            sys.meta_path.append(java_importer)
+    else:
+        if java_importer in sys.meta_path:
+            sys.meta_path.remove(java_importer)
+        for name, module in list(sys.modules.items()):
+            if isinstance(module, (JavaPackage, JavaClass)):
+                del sys.modules[name]
+                parent, _, child = name.rpartition(".")
+                if getattr(sys.modules.get(parent), child, None) is module:
+                    delattr(sys.modules[parent], child)
+
+
+# The import hook is a sys.meta_path finder. It's placed at the end of sys.meta_path, so it's
+# only consulted for names which Python itself failed to find. This means that successful
+# Python imports don't involve it at all, and that if a name exists in both languages, the
+# Python one will be returned.
+#
+# It handles three kinds of name:
+#   * A known Java package is imported as a JavaPackage module, whose attributes are looked
+#     up as Java classes when they're first accessed.
+#   * Within a JavaPackage, any name which isn't a class is assumed to be a package, because
+#     the index can't include packages which are loaded at runtime or only exist on the
+#     device. Classes themselves can't be imported as modules, so we return None for them.
+#   * A Java class within a Python package can only be imported with `from ... import`. In
+#     this case, importlib has already failed to find the name as an attribute of the Python
+#     package, and is now trying to import it as a submodule. We don't add the class to the
+#     package, because that would be confusing. Instead, we put it in sys.modules and return
+#     None: importlib will then ignore the failure, and the IMPORT_FROM bytecode will find the
+#     class in sys.modules.
+class JavaImporter(object):
+    def __repr__(self):
+        return "<java import hook>"
+
+    def find_spec(self, fullname, path=None, target=None):
+        if is_java_package(fullname):
+            return ModuleSpec(fullname, self, is_package=True)
+
+        parent = fullname.rpartition(".")[0]
+        parent_module = sys.modules.get(parent) if parent else None
+        if parent_module is None:
+            return None
+        cls = find_class(fullname)
+        if isinstance(parent_module, JavaPackage):
+            if cls is None:
+                return ModuleSpec(fullname, self, is_package=True)
+        elif cls is not None:
+            sys.modules[fullname] = cls
+        return None
+
+    def create_module(self, spec):
+        return JavaPackage(spec.name)
+
+    def exec_module(self, module):
+        pass
+
+cdef object java_importer = JavaImporter()
+
+
+cdef find_class(name):
+    if is_class_missing(name):
+        return None
     try:
-        # When the module is found but some of the `fromlist` names aren't, an exception will
-        # not be raised by import_original, and should not be raised by us either. The bytecode
-        # in the caller is responsible for doing that.
-        python_module = import_original(name, globals, locals, fromlist, level)
-        python_exc = None
-    except ImportError as e:
-        python_module = None
-        python_exc = clean_exception(e)
-    except BaseException as e:
-        raise clean_exception(e)
-
-    if fromlist and (fromlist[0] != "*"):
-        # We no longer detect clashes between Python and Java names, because looking up all the
-        # Python names in Java was slowing down Python imports too much. Instead, we only look up
-        # any names that Python failed to find.
-        python_names = []
-        missing_names = []
-        for from_name in fromlist:
-            (python_names if ((python_module is not None) and hasattr(python_module, from_name))
-             else missing_names).append(from_name)
-
-        if missing_names:
-            from_pkg = resolve_name(name, globals, level)
-            java_imports = {}
-            for from_name in missing_names:
+        return jclass(name)
+    except NoClassDefFoundError:
+        return None
+
+
+class JavaPackage(ModuleType):
+    """A Java package imported by the import hook."""
+
+    def __repr__(self):
+        return f"<Java package '{self.__name__}'>"
+
+    def __getattr__(self, name):
+        if name == "__all__":
+            raise ImportError(f"Wildcard import is not supported for Java package "
+                              f"'{self.__name__}'")
+        if not name.startswith("__"):
+            fullname = f"{self.__name__}.{name}"
+            cls = find_class(fullname)
+            if cls is not None:
+                setattr(self, name, cls)  # Bypass this method next time.
+                return cls
+        raise AttributeError(f"Java package '{self.__name__}' has no attribute '{name}'")
+
+
+# Names of known Java packages. This also contains every parent of every package, so it can be
+# used as a prefix index. Packages are added from the following sources:
+#   * The package of every class loaded by jclass (see JavaClass.__new__).
+#   * The JARs on the class path and the JDK modules, which are listed the first time a name
+#     isn't found in this set (see scan_class_path).
+#   * On Android, the list generated by the Gradle plugin (see java.android.initialize).
+#   * Calls to add_java_packages from user code.
+cdef set java_packages = set()
+
+# Names which aren't Java packages, and directories on the class path which may contain
+# packages which aren't in java_packages yet. The class path can't change once the JVM has
+# started, so these never need to be cleared.
+cdef set non_java_packages = set()
+cdef list class_path_dirs = None
+
+
+cdef bint is_java_package(str name) except -1:
+    if name in java_packages:
+        return True
+    if name in non_java_packages:
+        return False
+
+    if class_path_dirs is None:
+        with class_lock:
+            if class_path_dirs is None:
+                scan_class_path()
+        if name in java_packages:
+            return True
+
+    # Listing all the packages in a directory could take a long time, e.g. with the default
+    # class path of the current directory, so we only look at the one we need.
+    for class_path_dir in class_path_dirs:
+        if dir_has_classes(join(class_path_dir, *name.split("."))):
+            add_java_package(name)
+            return True
+
+    non_java_packages.add(name)
+    return False
+
+
+cdef add_java_package(str name):
+    while name and (name not in java_packages):
+        java_packages.add(name)
+        non_java_packages.discard(name)
+        name = name.rpartition(".")[0]
+
+
+def add_java_packages(names):
+    """Adds the given package names to those known to the import hook. This is only necessary
+    for top-level packages which aren't visible at build time, such as those loaded from a DEX
+    file at runtime.
+    """  # Further documentation in python.rst
+    for name in names:
+        add_java_package(name)
+
+
+cdef scan_class_path():
+    global class_path_dirs
+    dirs = []
+
+    # On Android, the class path isn't meaningful, and the Gradle plugin provides the package
+    # list instead.
+    if hasattr(sys, "getandroidapilevel"):
+        class_path_dirs = dirs
+        return
+
+    from zipfile import BadZipFile, ZipFile
+    System = jclass("java.lang.System")
+    separator = System.getProperty("path.separator")
+    for prop in ["java.class.path", "sun.boot.class.path"]:  # The second is for Java 8.
+        for entry in (System.getProperty(prop) or "").split(separator):
+            if isdir(entry):
+                dirs.append(entry)
+            elif isfile(entry):
                 try:
-                    java_imports[from_name] = jclass(f"{from_pkg}.{from_name}")
-                except NoClassDefFoundError:
-                    pass  # See note at call to import_original.
-
-            if java_imports:
-                # Don't add the Java classes as attributes of the Python module: that would be
-                # confusing. Instead, return a temporary module object containing the merged set of
-                # names found in both languages.
-                module = ModuleType("<java import hook>")
-                module.__dict__.update(java_imports)
-                for from_name in python_names:
-                    setattr(module, from_name, getattr(python_module, from_name))
-                return module
-
-    # If we got this far, we didn't import anything at all from Java, so return exactly what
-    # import_original did.
-    if python_exc:
-        raise python_exc
-    return python_module
-
-
-# Reduce noise in exception traces by removing frames from the import system. (The interpreter
-# only does this for the standard import system: see remove_import_frames in Python/import.c.)
-def clean_exception(e):
-    tb = e.__traceback__
-
-    tb_clean = []
-    while tb:
-        if not in_import_system(tb.tb_frame.f_code.co_filename):
-            tb_clean.append(tb)
-        tb = tb.tb_next
-
-    # A file with a SyntaxError is not actually in the traceback, because it was never
-    # compiled successfully.
-    if tb_clean or isinstance(e, SyntaxError):
-        # Construct a traceback from the non-import-system frames only.
-        for i, tb in enumerate(tb_clean):
-            tb.tb_next = (
-                None if i + 1 == len(tb_clean)
-                else tb_clean[i + 1]
-            )
-        return e.with_traceback(tb_clean[0] if tb_clean else None)
+                    with ZipFile(entry) as zip_file:
+                        for name in zip_file.namelist():
+                            if name.endswith(".class") and not name.startswith("META-INF/"):
+                                add_java_package(dirname(name).replace("/", "."))
+                except (OSError, BadZipFile):
+                    pass
+
+    try:
+        ModuleLayer = jclass("java.lang.ModuleLayer")  # Java 9 and later.
+    except NoClassDefFoundError:
+        pass
     else:
-        # All frames came from the import system, so return the exception untouched to
-        # assist debugging.
-        return e
-
-def in_import_system(filename):
-    filename = filename.replace("\\", "/")  # For .pyc files compiled on Windows.
-    return (filename in ["import.pxi", "stdlib/zipfile.py"] or
-            filename.startswith("<frozen importlib") or
-            filename.endswith("/java/android/importer.py"))
-
-
-cdef resolve_name(name, globals, level):
-    if level > 0:  # Relative import
-        current_pkg = globals.get("__package__")
-        if current_pkg is None:  # Empty string indicates a top-level module.
-            spec = globals.get("__spec__")
-            if spec:
-                current_pkg = spec.parent
-            else:
-                mod_name = globals["__name__"]
-                current_pkg = mod_name if "__path__" in globals else mod_name.rpartition(".")[0]
-        if not isinstance(current_pkg, str):
-            raise TypeError('__package__ not set to a string')
-
-        current_pkg_split = current_pkg.split(".")
-        if (level - 1) >= len(current_pkg_split):  # http://bugs.python.org/issue30840
-            raise ValueError("attempted relative import beyond top-level package")
-        prefix_len = len(current_pkg_split) - (level - 1)
-        base_pkg = '.'.join(current_pkg_split[:prefix_len])
-        return f"{base_pkg}.{name}" if name else base_pkg
-
-    else:  # Absolute import
-        return name
+        for module in ModuleLayer.boot().modules().toArray():
+            add_java_packages(module.getPackages().toArray())
+
+    class_path_dirs = dirs
+
+
+cdef bint dir_has_classes(path) except -1:
+    if not isdir(path):
+        return False
+    for _, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.endswith(".class"):
+                return True
+    return False
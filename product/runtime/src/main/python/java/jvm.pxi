@@ -15,7 +15,25 @@ cdef extern from 'dlfcn.h':
 
 cdef JavaVM *jvm = NULL
 
+cdef extern from *:
+    """
+    #ifdef _MSC_VER
+    #define CHAQUOPY_THREAD_LOCAL __declspec(thread)
+    #else
+    #define CHAQUOPY_THREAD_LOCAL __thread
+    #endif
+
+    static CHAQUOPY_THREAD_LOCAL JNIEnv *chaquopy_thread_env = NULL;
+    """
+    JNIEnv *chaquopy_thread_env
+
 cdef JNIEnv *get_jnienv() except NULL:
+    # This is called many times for every Java operation, and AttachCurrentThread is relatively
+    # slow even if the thread is already attached, so we cache the result for each thread.
+    global chaquopy_thread_env
+    if chaquopy_thread_env != NULL:
+        return chaquopy_thread_env
+
     if jvm == NULL:
         raise Exception("JVM not set")
 
@@ -24,7 +42,8 @@ cdef JNIEnv *get_jnienv() except NULL:
     ret = jvm[0].AttachCurrentThread(jvm, &env, NULL)
     if ret != JNI_OK:
         raise Exception("AttachCurrentThread failed: {}".format(ret))
-    return env
+    chaquopy_thread_env = <JNIEnv*>env
+    return chaquopy_thread_env
 
 
 # See CQPEnv.FindClass
@@ -46,6 +65,7 @@ cdef set_jvm(JavaVM *new_jvm):
     mid_forName = env.GetStaticMethodID(
         Class._chaquopy_j_klass, "forName",
         "(Ljava/lang/String;ZLjava/lang/ClassLoader;)Ljava/lang/Class;")
+    FindClass_missing.clear()
 
 
 cdef JavaVM *start_jvm() except NULL:
@@ -129,6 +149,8 @@ cpdef detach():
     created via the :any:`threading` module. Any other non-Java-created thread which uses the
     `java` module must call `detach` before the thread exits, or the process may crash.
     """
+    global chaquopy_thread_env
+    chaquopy_thread_env = NULL
     jvm[0].DetachCurrentThread(jvm)
     # Ignore return value, because we call this automatically for all threads, including those
     # which were never attached.
@@ -27,7 +27,7 @@ class ProxyClass(JavaClass):
     @classmethod
     def add_members(metacls, cls):
         for name in ["<init>", "_chaquopyGetDict", "_chaquopySetDict"]:
-            type.__setattr__(cls, name, find_member(cls, name))
+            type_setattr(cls, name, find_member(cls, name))
 
 
 # -------------------------------------------------------------------------------------------------
@@ -74,7 +74,7 @@ class DynamicProxyClass(ProxyClass):
     def add_members(metacls, cls):
         ProxyClass.add_members(cls)
         for name in ["_chaquopyGetType"]:
-            type.__setattr__(cls, name, find_member(cls, name))
+            type_setattr(cls, name, find_member(cls, name))
 
 
 def DynamicProxy_init(self):
@@ -1,3 +1,44 @@
+# Type codes for the first character of a JNI signature. These allow the hot paths of method
+# calls to dispatch with a C switch rather than string comparisons.
+cdef enum SigKind:
+    KIND_VOID
+    KIND_BOOLEAN
+    KIND_BYTE
+    KIND_CHAR
+    KIND_SHORT
+    KIND_INT
+    KIND_LONG
+    KIND_FLOAT
+    KIND_DOUBLE
+    KIND_OBJECT  # Includes arrays.
+
+
+cdef SigKind sig_kind(sig) except *:
+    c = sig[0]
+    if c == "V":
+        return KIND_VOID
+    elif c == "Z":
+        return KIND_BOOLEAN
+    elif c == "B":
+        return KIND_BYTE
+    elif c == "C":
+        return KIND_CHAR
+    elif c == "S":
+        return KIND_SHORT
+    elif c == "I":
+        return KIND_INT
+    elif c == "J":
+        return KIND_LONG
+    elif c == "F":
+        return KIND_FLOAT
+    elif c == "D":
+        return KIND_DOUBLE
+    elif c in "L[":
+        return KIND_OBJECT
+    else:
+        raise ValueError(f"Invalid signature '{sig}'")
+
+
 cdef jmethodID mid_getName = NULL
 
 # To avoid infinite recursion, this function must not use anything which could call klass_sig
@@ -101,6 +101,32 @@ cdef dict type_dict(cls):
     return <object> (<PyTypeObject*>cls).tp_dict
 
 
+# JavaClass and JavaObject override tp_getattro and tp_setattro in C (see JavaClassBase and
+# JavaObjectBase), so `type.__setattr__` and `object.__setattr__` can no longer be used on
+# them: they would fail with "can't apply this __setattr__". These functions call the
+# underlying slots directly.
+cdef extern from *:
+    """
+    static PyObject *chaquopy_type_getattr(PyObject *cls, PyObject *name) {
+        return PyType_Type.tp_getattro(cls, name);
+    }
+
+    static int chaquopy_type_setattr(PyObject *cls, PyObject *name, PyObject *value) {
+        return PyType_Type.tp_setattro(cls, name, value);
+    }
+
+    // Returns whether setting the given attribute on an instance of `cls` would call a data
+    // descriptor, rather than storing it in the instance __dict__.
+    static int chaquopy_has_data_descriptor(PyObject *cls, PyObject *name) {
+        PyObject *descr = _PyType_Lookup((PyTypeObject*)cls, name);
+        return (descr != NULL) && (Py_TYPE(descr)->tp_descr_set != NULL);
+    }
+    """
+    object type_getattr "chaquopy_type_getattr"(object cls, object name)
+    int type_setattr "chaquopy_type_setattr"(object cls, object name, object value) except -1
+    bint has_data_descriptor "chaquopy_has_data_descriptor"(object cls, object name)
+
+
 # Trigger a simple native crash, for use when testing logging. Make sure it's reported as a
 # crash in both the logcat and the UI, otherwise the back-stack might just be recreated in a
 # new process and it wouldn't be obvious what happened. abort(2) and SIGKILL aren't good enough
@@ -259,4 +259,51 @@ public class TestReflect {
             public String b() { return "ABDefault.b"; }
         }
     }
+
+
+    public static class Constants {
+        // Not compile-time constants, so the compiler won't inline them into other classes.
+        public static final int I = Integer.parseInt("1000000");
+        public static final String S = new String("constant");
+        public static final String NULL = null;
+        public static final Object O = new Object();
+        public static String nonFinal = "hello";
+    }
+
+    public static class Preload {
+        public static String sm() { return "Preload.sm"; }
+        public int f;
+    }
+
+    // Each of these classes is used by only one test in TestReflectionIndex, because a class
+    // only looks itself up in the index when it's first reflected.
+    public static class IndexParent {
+        public String m() { return "IndexParent.m"; }
+    }
+
+    public static class IndexedBasic extends IndexParent {
+        public int f = 1;
+        public IndexedBasic() {}
+        public static String sm(String... args) { return "IndexedBasic.sm " + args.length; }
+        public String m() { return "IndexedBasic.m"; }
+        public String unindexed() { return "IndexedBasic.unindexed"; }
+        public static class Nested {}
+    }
+
+    public static class IndexedPlatform {
+        public String unindexed() { return "IndexedPlatform.unindexed"; }
+    }
+
+    public static class IndexedMissingOverride extends IndexParent {
+        public String m() { return "IndexedMissingOverride.m"; }
+    }
+
+    public static class IndexedExtraMember {
+        public String m() { return "IndexedExtraMember.m"; }
+    }
+
+    public static class IndexedMissingMember {
+        public int f = 1;
+        public String m() { return "IndexedMissingMember.m"; }
+    }
 }
@@ -26,6 +26,12 @@ public class TestThread {
                 blocked = false;
             }
         }
+
+        public static synchronized void blockSynchronized(long delay) {
+            if (delay > 0) {
+                blockStatic(delay);
+            }
+        }
     }
 
 }
@@ -6,6 +6,7 @@ if API_LEVEL:
     from .android.test_stream import *  # noqa: F401, F403
 
 from .test_array import *               # noqa: F401, F403
+from .test_buffer import *              # noqa: F401, F403
 from .test_conversion import *          # noqa: F401, F403
 from .test_exception import *           # noqa: F401, F403
 from .test_import import *              # noqa: F401, F403
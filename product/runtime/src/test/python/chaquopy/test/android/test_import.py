@@ -463,7 +463,13 @@ class TestAndroidImport(FilterWarningsCase):
             fr'line \d+, in test_exception\n'
             fr'    .+?\n'  # Source code line from this file
             + col_marker)
-        import_frame = r'  File "import.pxi", line \d+, in java.chaquopy.import_override\n'
+
+        # CPython usually hides the frames of the import system, but our loaders can prevent
+        # it from doing so.
+        import_frame = (
+            r'(  File "(<frozen importlib\._bootstrap(_external)?>|[^"]*java/android/'
+            r'importer\.py)", line \d+, in \w+\n'
+            r'(    .+\n)?' + col_marker + r')*')
 
         # Compilation
         try:
@@ -1,8 +1,10 @@
+from array import array
 import copy
 import ctypes
 from java import (cast, jarray, jboolean, jbyte, jchar, jclass, jdouble, jfloat, jint,
                   jlong, jshort)
 import pickle
+import struct
 from .test_utils import FilterWarningsCase
 
 from com.chaquo.python import TestArray as TA
@@ -271,6 +273,26 @@ class TestArray(FilterWarningsCase):
         with self.assertTimeLimit(0.5):
             self.assertIsNot(a[:], a)
 
+        # Strided slices of other types.
+        for element_type, data in [(jboolean, [True, False, False, True, True]),
+                                   (jchar, "abcde"), (jdouble, [0.5, 1.5, 2.5, 3.5, 4.5]),
+                                   (String, ["a", "b", "c", None, "e"])]:
+            with self.subTest(element_type=element_type):
+                a = jarray(element_type)(data)
+                for key in [slice(None, None, 2), slice(None, None, -1), slice(3, 0, -2)]:
+                    actual = a[key]
+                    self.assertIsInstance(actual, jarray(element_type))
+                    self.assertEqual(list(data[key]), actual)
+
+        # Strided slices spanning several chunks, with steps on either side of the point
+        # where elements are read separately.
+        data = list(range(5000))
+        a = jarray(jint)(data)
+        for key in [slice(None, None, 3), slice(1, 4999, 64), slice(2, None, 65),
+                    slice(None, None, 1000), slice(None, None, -7), slice(4000, 5, -999)]:
+            with self.subTest(key=key):
+                self.assertEqual(data[key], a[key])
+
     def test_copy_method(self):
         for data in [[], SLICE_DATA]:
             with self.subTest(data=data):
@@ -428,6 +450,9 @@ class TestArray(FilterWarningsCase):
                     self.assertEqual(b"", python_type(java_type([])))
                     self.assertEqual(expected, python_type(java_type(values)))
 
+        # Multi-dimensional arrays are converted to the raw data bytes of all their rows.
+        self.assertEqual(b"helloworld", bytes(jarray(jarray(jbyte))([b"hello", b"world"])))
+
         # Integer arrays containing values 0 to 255 can be converted element-wise using `list`.
         for element_type in [jshort, jint, jlong]:
             with self.subTest(element_type=element_type):
@@ -435,11 +460,11 @@ class TestArray(FilterWarningsCase):
                     b"\x00\x01\x7E\x7F\x80\x81\xFE\xFF",
                     bytes(list(jarray(element_type)([0, 1, 126, 127, 128, 129, 254, 255]))))
 
-        # Other array types (including multi-dimensional arrays) will be treated as an iterable
-        # of integers, so converting them to bytes will fail unless the array is empty.
+        # Other array types will be treated as an iterable of integers, so converting them to
+        # bytes will fail unless the array is empty.
         for element_type, values in \
             [(jchar, "hello"),
-             (jarray(jbyte), [b"hello", b"world"]),
+             (jarray(jchar), ["hello", "world"]),
              (String, ["hello"])]:
             java_type = jarray(element_type)
             for python_type in [bytes, bytearray]:
@@ -480,7 +505,7 @@ class TestArray(FilterWarningsCase):
                     m = memoryview(ja)
                     self.assertEqual(input, m.tolist())
                     self.assertEqual(len(input) * itemsize, m.nbytes)
-                    self.assertFalse(m.readonly)
+                    self.assertTrue(m.readonly)  # memoryview doesn't request a writable buffer.
                     self.assertEqual(format, m.format)
                     self.assertEqual(itemsize, m.itemsize)
                     self.assertEqual(1, m.ndim)
@@ -489,20 +514,61 @@ class TestArray(FilterWarningsCase):
                     self.assertEqual((), m.suboffsets)
                     self.assertTrue(m.c_contiguous)
 
-                    # Because the JVM may return a copy, we can't guarantee that updates to the
-                    # view will be written to the array until the view is released, and we
-                    # can't guarantee that updates to the array are ever visible to the view.
+                    m.release()
+
+                    # struct.pack_into requests a writable buffer, whose contents are written
+                    # back to the array when it's released.
                     if ja:
                         self.assertNotEqual(ja[0], ja[1])
-                        m[0] = m[1]
-                        self.assertEqual(m[0], m[1])
-                        m.release()
+                        struct.pack_into(format, ja, 0, ja[1])
                         self.assertEqual(ja[0], ja[1])
 
-        for element_type in [jchar, jarray(jbyte), String]:
+        for element_type in [jchar, jarray(jchar), String, jarray(String)]:
             with self.assertRaisesRegex(TypeError, "a bytes-like object is required"):
                 memoryview(jarray(element_type)([]))
 
+    def test_pinned(self):
+        for element_type, format, itemsize, values in self.BUFFER_TESTS:
+            with self.subTest(element_type=element_type):
+                ja = jarray(element_type)(values)
+                with ja.pinned() as m:
+                    self.assertEqual(values, m.tolist())
+                    self.assertFalse(m.readonly)
+                    self.assertEqual(format, m.format)
+                    self.assertEqual((len(values),), m.shape)
+                    m[0] = m[1]
+                with self.assertRaisesRegex(ValueError, "released"):
+                    m[0]
+                self.assertEqual(ja[0], ja[1])
+
+                ja = jarray(element_type)(values)
+                with ja.pinned(readonly=True) as m:
+                    self.assertEqual(values, m.tolist())
+                    self.assertTrue(m.readonly)
+                    with self.assertRaisesRegex(TypeError, "read-only"):
+                        m[0] = m[1]
+
+        # If the view is still in use, the elements remain valid until it's released.
+        ja = jarray(jint)([1, 2])
+        with ja.pinned() as m:
+            c = ctypes.c_int32.from_buffer(m)  # Holds a derived view.
+        self.assertEqual(1, c.value)
+        del c
+
+        p = ja.pinned()
+        m = p.__enter__()
+        pb = pickle.PickleBuffer(m)  # Holds a buffer exported by the view itself.
+        with self.assertRaisesRegex(BufferError, "still in use"):
+            p.__exit__(None, None, None)
+        self.assertEqual([1, 2], pb.raw().cast("i").tolist())
+        del pb, m
+        with self.assertRaisesRegex(ValueError, "can only be used once"):
+            p.__enter__()
+
+        for element_type in [jchar, String]:
+            with self.assertRaises(AttributeError):
+                jarray(element_type)([]).pinned()
+
     # See also the NumPy package tests.
     def test_buffer_p2j(self):
         import array
@@ -524,6 +590,73 @@ class TestArray(FilterWarningsCase):
         ja = jarray(element_type)(aa)
         self.assertEqual(ja, aa)
 
+    # Multi-dimensional arrays are converted one row at a time, and export a read-only copy.
+    def test_buffer_nested(self):
+        for element_type, format, itemsize, values in self.BUFFER_TESTS:
+            if element_type is jboolean:
+                continue  # See test_buffer_p2j.
+            for shape in [(1, len(values)), (2, len(values)), (2, 2, len(values))]:
+                with self.subTest(element_type=element_type, shape=shape):
+                    java_type = element_type
+                    for _ in shape:
+                        java_type = jarray(java_type)
+                    count = 1
+                    for n in shape:
+                        count *= n
+                    data = (values * count)[:count]
+                    m = memoryview(array(format, data)).cast("B").cast(format, shape)
+
+                    ja = java_type(m)
+                    self.assertEqual(m.tolist(), ja)
+
+                    m = memoryview(ja)
+                    self.assertEqual(ja, m.tolist())
+                    self.assertTrue(m.readonly)
+                    self.assertEqual(format, m.format)
+                    self.assertEqual(itemsize, m.itemsize)
+                    self.assertEqual(shape, m.shape)
+                    self.assertTrue(m.c_contiguous)
+
+        for input, shape in [([], (0, 0)), ([[], []], (2, 0)), ([[[]], [[]]], (2, 1, 0))]:
+            with self.subTest(shape=shape):
+                java_type = jint
+                for _ in shape:
+                    java_type = jarray(java_type)
+                self.assertEqual(shape, memoryview(java_type(input)).shape)
+
+        # Buffers which don't match the array type are converted one element at a time.
+        ja = jarray(jarray(jdouble))(memoryview(array("i", [1, 2, 3, 4])).cast("B")
+                                     .cast("i", (2, 2)))
+        self.assertEqual([[1.0, 2.0], [3.0, 4.0]], ja)
+        with self.assertRaisesRegex(TypeError, "Cannot convert"):
+            jarray(jarray(jarray(jint)))(memoryview(array("i", [1, 2, 3, 4])).cast("B")
+                                         .cast("i", (2, 2)))
+
+        ja = jarray(jarray(jint))([[1, 2], [3]])
+        with self.assertRaisesRegex(BufferError, "not rectangular"):
+            memoryview(ja)
+
+    def test_buffer_nested_order(self):
+        try:
+            from _testbuffer import ndarray, PyBUF_FORMAT, PyBUF_F_CONTIGUOUS
+        except ImportError:
+            self.skipTest("requires _testbuffer")
+
+        # The exported copy is always in C order.
+        ja = jarray(jarray(jint))([[1, 2], [3, 4]])
+        with self.assertRaisesRegex(BufferError, "only be exported in C order"):
+            ndarray(ja, getbuf=PyBUF_FORMAT | PyBUF_F_CONTIGUOUS)
+
+        # A one-dimensional array is Fortran-contiguous as well.
+        ja = jarray(jint)([1, 2])
+        self.assertEqual([1, 2], ndarray(ja, getbuf=PyBUF_FORMAT | PyBUF_F_CONTIGUOUS)
+                         .tolist())
+        ja[1] = None
+        with self.assertRaisesRegex(BufferError, "contains null"):
+            memoryview(ja)
+        with self.assertRaisesRegex(TypeError, "not writable"):
+            ctypes.c_int32.from_buffer(jarray(jarray(jint))([[1]]))
+
     def test_abc(self):
         from collections import abc
         for element_type in [jboolean, jbyte, jshort, jint, jlong, jfloat, jdouble, jchar,
@@ -561,6 +694,19 @@ class TestArray(FilterWarningsCase):
         self.verify_not_equal(empty, single)
         self.verify_not_equal(empty, False)
 
+        # Comparison with buffers.
+        ints = jarray(jint)([1, -2, 3])
+        self.verify_equal(ints, array("i", [1, -2, 3]))
+        self.verify_not_equal(ints, array("i", [1, -2, 4]))
+        self.verify_not_equal(ints, array("i", [1, -2]))
+        self.verify_equal(ints, array("q", [1, -2, 3]))  # Compared element by element.
+        self.verify_not_equal(jarray(jbyte)([1, -2]), bytes([1, 254]))
+
+        # Floating-point comparison follows Python rules rather than comparing bits.
+        self.verify_equal(jarray(jdouble)([0.0]), array("d", [-0.0]))
+        self.verify_not_equal(jarray(jdouble)([float("nan")]), array("d", [float("nan")]))
+        self.verify_equal(jarray(jfloat)([0.0]), array("f", [-0.0]))
+
     def verify_equal(self, a, b):
         self.assertEqual(a, b)
         self.assertEqual(b, a)
@@ -606,15 +752,61 @@ class TestArray(FilterWarningsCase):
         self.assertFalse(0 in empty)
         self.assertFalse(1 in empty)
 
+    # Iteration reads arrays in chunks, so also test lengths around the chunk size.
+    ITER_DATA = [[], [1], [2, 3], [4, 5, 6], list(range(1023)), list(range(1024)),
+                 list(range(1025)), list(range(2500))]
+
     def test_iter(self):
-        for data in [[], [1], [2, 3], [4, 5, 6]]:
-            with self.subTest(data=data):
+        for data in self.ITER_DATA:
+            with self.subTest(data=data[:4]):
                 a = jarray(jint)(data)
                 self.assertEqual(data, [x for x in a])
 
+        for element_type, data in [(jboolean, [True, False] * 1000),
+                                   (jchar, "abc" * 1000),
+                                   (jdouble, [x / 2 for x in range(2000)]),
+                                   (String, ["a", None] * 1000)]:
+            with self.subTest(element_type=element_type):
+                self.assertEqual(list(data), list(jarray(element_type)(data)))
+
+        # Without chunking, this takes over 1 second.
+        a = jarray(jdouble)(500000)
+        with self.assertTimeLimit(0.5):
+            for x in a:
+                pass
+
+    # Larger String arrays are converted in a single String, so test both sizes, and
+    # characters whose length is different in Java and Python.
+    def test_string_array(self):
+        Object = jclass("java.lang.Object")
+        Integer = jclass("java.lang.Integer")
+        for n in [1, 15, 16, 17, 1000]:
+            for chars in ["a", "\xe9", "\u1234", "\U0001F600", "\udc00"]:
+                data = [(chars * (i % 4)) if i % 5 else None for i in range(n)]
+                with self.subTest(n=n, chars=chars):
+                    a = jarray(String)(data)
+                    expected = [None if s is None else s.replace("\udc00", "?") for s in data]
+                    self.assertEqual(expected, list(a))
+                    self.assertEqual(expected, list(reversed(list(reversed(a)))))
+                    for i in range(n):
+                        self.assertEqual(expected[i], a[i])
+
+            with self.subTest(n=n):
+                with self.assertRaisesRegex(TypeError, "Cannot convert int object to "
+                                            "java.lang.String"):
+                    jarray(String)(["a"] * (n - 1) + [1])
+
+                # Java objects are only checked once for each type.
+                data = [Integer(i) for i in range(n)]
+                a = jarray(Object)(data + ["a"])
+                self.assertEqual(list(range(n)) + ["a"], a)
+                with self.assertRaisesRegex(TypeError, "Cannot convert Integer object to "
+                                            "java.lang.String"):
+                    jarray(String)(["a"] * (n - 1) + [Integer(1)])
+
     def test_reversed(self):
-        for data in [[], [1], [2, 3], [4, 5, 6]]:
-            with self.subTest(data=data):
+        for data in self.ITER_DATA:
+            with self.subTest(data=data[:4]):
                 a = jarray(jint)(data)
                 self.assertEqual(list(reversed(data)), list(reversed(a)))
 
@@ -0,0 +1,95 @@
+from array import array
+from java import direct_buffer
+import sys
+from time import sleep, time
+
+from .test_utils import FilterWarningsCase
+from java.lang import System
+from java.nio import ByteBuffer, ByteOrder
+
+
+class TestBuffer(FilterWarningsCase):
+
+    def test_j2p(self):
+        bb = ByteBuffer.allocateDirect(8)
+        m = memoryview(bb)
+        self.assertEqual(8, m.nbytes)
+        self.assertEqual("b", m.format)
+        self.assertEqual((8,), m.shape)
+        self.assertFalse(m.readonly)
+
+        # The memory is shared in both directions.
+        m[0] = 42
+        self.assertEqual(42, bb.get(0))
+        bb.put(1, -1)
+        self.assertEqual(-1, m[1])
+
+        # The whole capacity is covered, regardless of the position.
+        bb.position(4)
+        self.assertEqual(8, memoryview(bb).nbytes)
+
+        ib = bb.order(ByteOrder.nativeOrder()).asIntBuffer()
+        m = memoryview(ib)
+        self.assertEqual("i", m.format)
+        self.assertEqual(4, m.itemsize)
+        self.assertEqual((1,), m.shape)
+        ib.put(0, 123456)
+        self.assertEqual(123456, m[0])
+
+        big = (sys.byteorder == "little")
+        swapped = bb.order(ByteOrder.BIG_ENDIAN if big else ByteOrder.LITTLE_ENDIAN)
+        self.assertEqual(">i" if big else "<i", memoryview(swapped.asIntBuffer()).format)
+
+        self.assertTrue(memoryview(bb.asReadOnlyBuffer()).readonly)
+
+        with self.assertRaisesRegex(BufferError, "not a direct buffer"):
+            memoryview(ByteBuffer.allocate(8))
+        with self.assertRaisesRegex(BufferError, "does not support the buffer protocol"):
+            memoryview(bb.asCharBuffer())
+
+    def test_p2j(self):
+        ba = bytearray(b"hello")
+        bb = direct_buffer(ba)
+        self.assertIsInstance(bb, ByteBuffer)
+        self.assertTrue(bb.isDirect())
+        self.assertFalse(bb.isReadOnly())
+        self.assertEqual(5, bb.capacity())
+        self.assertEqual(ord("e"), bb.get(1))
+        bb.put(0, ord("j"))
+        self.assertEqual(b"jello", ba)
+        self.assertEqual(b"jello", bytes(memoryview(bb)))
+        with self.assertRaises(BufferError):
+            ba.append(0)  # The buffer is still exported.
+
+        ro = direct_buffer(b"hello")
+        self.assertTrue(ro.isReadOnly())
+        self.assertEqual(ord("h"), ro.get(0))
+
+        db = direct_buffer(array("d", [1.5, 2.5])).order(ByteOrder.nativeOrder()).asDoubleBuffer()
+        self.assertEqual(2.5, db.get(1))
+
+        with self.assertRaisesRegex(TypeError, "bytes-like object"):
+            direct_buffer("hello")
+        with self.assertRaises(BufferError):
+            direct_buffer(memoryview(b"hello")[::2])
+
+    # The Python buffer should be released once the ByteBuffer is collected, even if
+    # direct_buffer is never called again.
+    def test_p2j_release(self):
+        ba = bytearray(b"hello")
+        bb = direct_buffer(ba)
+        with self.assertRaises(BufferError):
+            ba.append(0)
+
+        del bb
+        deadline = time() + 5
+        while True:
+            System.gc()
+            try:
+                ba.append(0)
+                break
+            except BufferError:
+                if time() > deadline:
+                    raise
+                sleep(0.1)
+        self.assertEqual(b"hello\0", ba)
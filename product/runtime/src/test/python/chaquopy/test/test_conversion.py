@@ -1,5 +1,6 @@
 from math import isnan
-from java import jarray, jboolean, jbyte, jchar, jclass, jdouble, jfloat, jint, jlong, jshort
+from java import (cache_string, jarray, jboolean, jbyte, jchar, jclass, jdouble, jfloat, jint,
+                  jlong, jshort, set_string_cache_size, string_cache_info)
 
 from .test_utils import FilterWarningsCase
 
@@ -62,6 +63,20 @@ class TestConversion(FilterWarningsCase):
             self.verify_value(self.obj, "Object", 123, wrapper=wrapper)
             self.verify_value(self.obj, "Number", 123, wrapper=wrapper)
 
+    # Boxing should use valueOf, so small values have the same identity as they would in Java.
+    def test_box_identity(self):
+        System = jclass("java.lang.System")
+        for value in [True, 0, 127, -128, jint(5), jchar("y")]:
+            self.assertEqual(System.identityHashCode(value), System.identityHashCode(value))
+
+        # Integer.valueOf returns an int to Python, so identity can only be compared in Java.
+        # Values outside the Integer cache are boxed to a new object each time.
+        identities = jclass("java.util.IdentityHashMap")()
+        identities.put(jint(100), True)
+        identities.put(jint(1000), True)
+        self.assertTrue(identities.containsKey(jint(100)))
+        self.assertFalse(identities.containsKey(jint(1000)))
+
     def verify_int(self, obj, name, bits, wrapper=None, allow_bool=False, allow_float=False,
                    allow_null=False):
         max_val = (2 ** (bits - 1)) - 1
@@ -160,10 +175,43 @@ class TestConversion(FilterWarningsCase):
         for name, value in [("I", "x"), ("C", 42)]:
             self.verify_value(self.obj, name, value, context=self.conv_error)
 
+    def test_string_cache(self):
+        System = jclass("java.lang.System")
+        System.identityHashCode(None)  # Make sure reflection doesn't affect the statistics.
+        hits, misses, _, _ = string_cache_info()
+        set_string_cache_size(2)
+        try:
+            s = cache_string("hello world")
+            self.assertEqual((hits, misses + 1, 2, 1), string_cache_info())
+            self.assertEqual(1, len({System.identityHashCode(s) for _ in range(3)}))
+            self.assertEqual((hits + 3, misses + 1, 2, 1), string_cache_info())
+
+            # Non-interned strings are not cached.
+            System.identityHashCode("".join(["hello", " world"]))
+            self.assertEqual((hits + 3, misses + 1, 2, 1), string_cache_info())
+
+            for other in ["one two", "three four"]:
+                cache_string(other)
+            self.assertEqual((hits + 3, misses + 3, 2, 2), string_cache_info())
+            System.identityHashCode(s)  # Was evicted as the least recently used entry.
+            self.assertEqual((hits + 3, misses + 4, 2, 2), string_cache_info())
+
+            for size in [-1, 1.0, None]:
+                with self.assertRaisesRegex(ValueError, "Invalid string cache size"):
+                    set_string_cache_size(size)
+        finally:
+            set_string_cache_size(0)
+        self.assertEqual(0, string_cache_info().currsize)
+
     def verify_string(self, obj, name):
         for val in ["", "h", "hello",
                     "\u0000",          # Null character
-                    "\U00012345"]:     # Non-BMP character
+                    "a\u0000b",        # Null character in an ASCII string
+                    "ol\u00e9",        # Latin-1
+                    "\u4e2d\u6587",    # BMP
+                    "\U00012345",      # Non-BMP character
+                    "x" * 5000,        # Longer than the GetStringCritical limit
+                    "\u4e2d" * 5000]:
             self.verify_value(obj, name, val)
 
         # Invalid surrogates should be replaced by a question mark.
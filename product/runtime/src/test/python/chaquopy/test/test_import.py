@@ -1,4 +1,5 @@
-from java import jclass, set_import_enabled
+from java import add_java_packages, jclass, set_import_enabled
+from java.chaquopy import JavaPackage
 import sys
 
 from .test_utils import FilterWarningsCase
@@ -12,11 +13,16 @@ class TestImport(FilterWarningsCase):
     def no_name_error(self, name):
         return self.assertRaisesRegex(ImportError, f"cannot import name '{name}'")
 
+    def wildcard_error(self, package):
+        return self.assertRaisesRegex(
+            ImportError, f"Wildcard import is not supported for Java package '{package}'")
+
     def test_enable(self):
         # Should be enabled by default
         from java.lang import String  # noqa: F401
 
         set_import_enabled(False)
+        self.assertNotIn("java.lang", sys.modules)
         with self.assertRaises(ImportError):
             from java.lang import String  # noqa: F811
         set_import_enabled(True)
@@ -26,12 +32,12 @@ class TestImport(FilterWarningsCase):
         # "java" is different because there actually is a Python module by that name.
         from java.lang import String
         self.assertIs(String, jclass("java.lang.String"))
-        self.assertNotIn("java.lang", sys.modules)
+        self.assertIsInstance(sys.modules["java.lang"], JavaPackage)
 
         from javax.xml import XMLConstants
         self.assertIs(XMLConstants, jclass("javax.xml.XMLConstants"))
-        self.assertNotIn("javax", sys.modules)
-        self.assertNotIn("javax.xml", sys.modules)
+        self.assertIsInstance(sys.modules["javax"], JavaPackage)
+        self.assertIsInstance(sys.modules["javax.xml"], JavaPackage)
 
     def test_multiple(self):
         from java.lang import Integer, Float
@@ -42,25 +48,30 @@ class TestImport(FilterWarningsCase):
         self.assertIs(Integer, jclass("java.lang.Integer"))
 
     def test_errors(self):
-        # "java" sub-packages give different errors because there actually is a
-        # Python module by that name.
-        with self.no_module_error("java.lang"):
+        # Classes can't be imported as modules.
+        with self.no_module_error("java.lang.String"):
             import java.lang.String  # noqa: F401
-        with self.no_module_error("java.lang"):
+        with self.no_name_error("Nonexistent"):
             from java.lang import Nonexistent  # noqa: F401
-        with self.no_module_error("java.lang"):
+        with self.wildcard_error("java.lang"):
             from package1 import wildcard_java_lang  # noqa: F401
 
-        with self.no_module_error("javax"):
+        with self.no_module_error("javax.xml.XMLConstants"):
             import javax.xml.XMLConstants  # noqa: F401
-        with self.no_module_error("javax"):
+        with self.no_name_error("Nonexistent"):
             from javax.xml import Nonexistent  # noqa: F401, F811
-        with self.no_module_error("javax"):
+        with self.wildcard_error("javax.xml"):
             from package1 import wildcard_javax_xml  # noqa: F401
 
-        # A Java name and a nonexistent one.
-        with self.no_name_error("Nonexistent"):
-            from java.lang import String, Nonexistent  # noqa: F401, F811
+        # A nonexistent top-level package.
+        with self.no_module_error("nonexistent"):
+            import nonexistent  # noqa: F401
+
+        # A Java name and a nonexistent one. The second attempt uses the negative cache in
+        # CQPEnv.FindClass.
+        for i in range(2):
+            with self.no_name_error("Nonexistent"):
+                from java.lang import String, Nonexistent  # noqa: F401, F811
 
         # A Python name and a nonexistent one.
         with self.no_name_error("Nonexistent"):
@@ -73,20 +84,56 @@ class TestImport(FilterWarningsCase):
             from package1 import recursive_import_error  # noqa: F401
 
     def test_package(self):
-        # See note above about "java" sub-packages.
-        with self.no_module_error("java.lang"):
-            import java.lang  # noqa: F401
-        with self.no_name_error("lang"):
-            from java import lang  # noqa: F401
+        import java.lang
+        self.assertIsInstance(java.lang, JavaPackage)
+        self.assertEqual("<Java package 'java.lang'>", repr(java.lang))
+        self.assertIs(java.lang.String, jclass("java.lang.String"))
+        with self.assertRaisesRegex(
+            AttributeError, "Java package 'java.lang' has no attribute 'Nonexistent'"
+        ):
+            java.lang.Nonexistent
+        from java import lang
+        self.assertIs(lang, java.lang)
+
+        import javax.xml
+        self.assertIs(javax.xml.XMLConstants, jclass("javax.xml.XMLConstants"))
+        from javax import xml
+        self.assertIs(xml, javax.xml)
+
+    def test_top_level_package(self):
+        import javax
+        self.assertIsInstance(javax, JavaPackage)
+        from javax import xml
+        self.assertIs(xml, javax.xml)
+
+        # Disabling the import hook removes all Java packages from sys.modules.
+        set_import_enabled(False)
+        try:
+            self.assertNotIn("javax", sys.modules)
+            with self.no_module_error("javax"):
+                import javax  # noqa: F811
+        finally:
+            set_import_enabled(True)
+
+    def test_unknown_package(self):
+        # Within a Java package, any name which isn't a class is assumed to be a package,
+        # because the index can't contain packages which are only available at runtime.
+        import javax.xml.nonexistent
+        self.assertIsInstance(javax.xml.nonexistent, JavaPackage)
+        with self.no_name_error("Nonexistent"):
+            from javax.xml.nonexistent import Nonexistent  # noqa: F401
 
-        with self.no_module_error("javax"):
-            import javax.xml  # noqa: F401
-        with self.no_module_error("javax"):
-            from javax import xml  # noqa: F401
+        # But a top-level package must be in the index.
+        with self.no_module_error("nonexistent_java"):
+            import nonexistent_java  # noqa: F401
+        add_java_packages(["nonexistent_java.package"])
+        import nonexistent_java.package  # noqa: F811
+        self.assertIsInstance(nonexistent_java.package, JavaPackage)
 
     def test_multi_language(self):
         from package1 import java, python, both
         self.assertEqual("java 1", java.x)
+        self.assertIs(java, jclass("package1.java"))
         self.assertEqual("python 1", python.x)
         self.assertEqual("both python 1", both.x)
         self.assertEqual("both java 1", jclass("package1.both").x)
@@ -96,6 +143,11 @@ class TestImport(FilterWarningsCase):
         self.assertIs(python, package1.python)
         self.assertIs(both, package1.both)
 
+        # Java classes aren't added as attributes of the Python package.
+        self.assertFalse(hasattr(package1, "java"))
+        from package1 import java  # noqa: F811
+        self.assertIs(java, jclass("package1.java"))
+
         # A name from each language, and a nonexistent one.
         with self.no_name_error("Nonexistent"):
             from package1 import java, Nonexistent, python  # noqa: F401, F811
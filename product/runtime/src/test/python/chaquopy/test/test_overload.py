@@ -359,3 +359,30 @@ class TestOverload(FilterWarningsCase):
         self.assertEqual("Number... [null]", obj.resolve_Number_Long(cast(Number, None)))
         self.assertEqual("Number... [42]", obj.resolve_Number_Long(jarray(Number)([42])))
         self.assertEqual("Number... [null]", obj.resolve_Number_Long(jarray(Number)([None])))
+
+    def test_single_candidate(self):
+        # Only one overload has 2 parameters, so its arguments are checked by the call itself,
+        # but the error should be the same as for any other inapplicable call.
+        Integer = jclass("java.lang.Integer")
+        self.assertEqual("11", Integer.toString(3, 2))
+        with self.inapplicable:
+            Integer.toString("3", 2)
+
+    def test_cache(self):
+        Varargs = jclass("com.chaquo.python.TestOverload$Varargs")
+        obj = Varargs()
+        obj.resolve_ID(1)
+        jmm = Varargs.__dict__["resolve_ID"]
+        info = jmm.cache_info()
+        self.assertGreater(info.maxsize, 0)
+        self.assertEqual(info.currsize, info.misses)
+
+        self.assertEqual("int 42", obj.resolve_ID(42))
+        self.assertEqual(info.hits + 1, jmm.cache_info().hits)
+        self.assertEqual(info.misses, jmm.cache_info().misses)
+
+        # Every combination of argument types should produce a separate entry, up to the limit.
+        for n in range(info.maxsize + 10):
+            obj.resolve_ID(*([1.0] * n))
+        self.assertEqual(info.maxsize, jmm.cache_info().currsize)
+        self.assertEqual("double... [1.0, 2.0]", obj.resolve_ID(1.0, 2.0))
@@ -446,7 +446,6 @@ class TestProxy(FilterWarningsCase):
             self.assertEqual("ValueError: Exception in __init__.py", e.getMessage())
             self.assertHasFrames(e, [
                 ("<python>.chaquopy.test.exception_in_init", "<module>", "__init__.py", 3),
-                ("<python>.java.chaquopy", "import_override", "import.pxi", None),
                 ("<python>.chaquopy.test.test_proxy", "run", "test_proxy.py", ref_line_no + 3),
                 ("com.chaquo.python.PyObject", "callAttrThrows", None, None)])
 
@@ -1,6 +1,8 @@
 import copy
-from java import cast, jarray, jclass
+from java import (cast, jarray, jclass, preload, reflection_cache_info,
+                  set_reflection_cache_size)
 import pickle
+import struct
 from unittest import skipIf
 from .test_utils import API_LEVEL, FilterWarningsCase
 
@@ -42,8 +44,11 @@ class TestReflect(FilterWarningsCase):
         stack = Stack()
         self.assertIsInstance(stack, Stack)
 
-        with self.assertRaises(jclass("java.lang.NoClassDefFoundError")):
-            jclass("java.lang.Nonexistent")
+        # The second attempt uses the negative cache in CQPEnv.FindClass.
+        for i in range(2):
+            with self.assertRaisesRegex(jclass("java.lang.NoClassDefFoundError"),
+                                        "java.lang.Nonexistent"):
+                jclass("java.lang.Nonexistent")
 
     def test_cast(self):
         b = Boolean(True)
@@ -91,6 +96,20 @@ class TestReflect(FilterWarningsCase):
         self.t.setStringArray(a2)
         self.assertIs(a2, self.t.getStringArray())
 
+    # Enough objects to make the instance cache resize several times.
+    def test_identity_many(self):
+        objects = [Object() for _ in range(1000)]
+        array = jarray(Object)(objects)
+        for i, obj in enumerate(array):
+            self.assertIs(objects[i], obj)
+
+        del objects[::2]
+        for i, obj in enumerate(array):
+            if i % 2:
+                self.assertIs(objects[i // 2], obj)
+            else:
+                self.assertIs(obj, array[i])
+
     def test_pickle(self):
         s = String("hello")
         for function in [pickle.dumps, copy.copy, copy.deepcopy]:
@@ -175,6 +194,25 @@ class TestReflect(FilterWarningsCase):
             with self.assertRaisesRegex(TypeError, r"takes 1 argument \(0 given\)"):
                 obj.setStaticZ()
 
+    def test_static_final(self):
+        Constants = TR.Constants
+        c = Constants()
+        for name, value in [("I", 1000000), ("S", "constant"), ("NULL", None)]:
+            with self.subTest(name=name):
+                # Static final primitive and String fields are only read once.
+                self.assertEqual(value, getattr(Constants, name))
+                self.assertIs(getattr(Constants, name), getattr(Constants, name))
+                self.assertIs(getattr(Constants, name), getattr(c, name))
+                with self.assertRaisesRegex(AttributeError, "final"):
+                    setattr(Constants, name, value)
+
+        self.assertIsInstance(Constants.O, Object)
+        self.assertEqual("hello", Constants.nonFinal)
+        Constants.nonFinal = "world"
+        self.assertEqual("world", Constants.nonFinal)
+        self.assertEqual("world", c.nonFinal)
+        Constants.nonFinal = "hello"
+
     # Most of the positive tests are in test_conversion, but here are some error tests.
     def test_instance(self):
         with self.assertRaisesRegex(AttributeError, "has no attribute"):
@@ -240,6 +278,27 @@ class TestReflect(FilterWarningsCase):
         self.assertEqual(test1.getB(), 11)
         self.assertEqual(test2.getB(), 22)
 
+    def test_bound_method(self):
+        method = self.t.setZ
+        self.assertRegex(repr(method),
+                         r"^<bound method com\.chaquo\.python\.TestBasics\.setZ of ")
+        method(True)
+        self.assertIs(True, self.t.getZ())
+        method(False)
+        self.assertIs(False, self.t.getZ())
+        with self.assertRaisesRegex(TypeError, "does not accept keyword arguments"):
+            method(fieldZ=True)
+        self.assertIs(False, self.t.getZ())
+
+    # Overloaded constructors are bound to an object which doesn't have a `this` yet.
+    def test_bound_constructor(self):
+        self.assertEqual("x", String("x"))
+        ArrayList = jclass("java.util.ArrayList")
+        self.assertEqual(0, ArrayList().size())
+        self.assertEqual(0, ArrayList(10).size())
+        HashMap = jclass("java.util.HashMap")
+        self.assertTrue(HashMap().isEmpty())
+
     def test_mixed_params(self):
         test = jclass('com.chaquo.python.TestBasics')()
         self.assertEqual(test.methodParamsZBCSIJFD(
@@ -319,7 +378,9 @@ class TestReflect(FilterWarningsCase):
         Parent = self.nested_cls("Parent")
         Child = self.nested_cls("Child")
 
-        self.assertEqual((object,), Object.__bases__)
+        from java.chaquopy import JavaObjectBase
+        self.assertEqual((JavaObjectBase,), Object.__bases__)
+        self.assertEqual((object,), JavaObjectBase.__bases__)
         self.assertEqual((Object,), Interface.__bases__)
         self.assertEqual((Interface,), SubInterface.__bases__)
         self.assertEqual((Object,), Parent.__bases__)
@@ -449,6 +510,67 @@ class TestReflect(FilterWarningsCase):
         self.assertEqual("protected", a.getProt())
         self.assertEqual("public", a.getPubl())
 
+    def test_reflection_cache(self):
+        from java.util import ArrayDeque, LinkedList
+
+        maxsize = reflection_cache_info().maxsize
+        try:
+            set_reflection_cache_size(1)
+            info = reflection_cache_info()
+            self.assertEqual(1, info.maxsize)
+            self.assertLessEqual(info.currsize, 1)
+
+            # Reflecting LinkedList evicts the members of ArrayDeque, so they'll be
+            # reflected again if they're needed.
+            self.assertTrue(hasattr(ArrayDeque, "peekFirst"))
+            self.assertTrue(hasattr(LinkedList, "peekFirst"))
+            misses = reflection_cache_info().misses
+            self.assertTrue(hasattr(ArrayDeque, "peekLast"))
+            info = reflection_cache_info()
+            self.assertGreater(info.misses, misses)
+            self.assertEqual(1, info.currsize)
+            self.assertGreater(info.classes, 1)
+            self.assertGreater(info.retained_bytes, 0)
+
+            # Members can still be reflected with the cache disabled.
+            set_reflection_cache_size(0)
+            info = reflection_cache_info()
+            self.assertEqual((0, 0), (info.currsize, info.retained_bytes))
+            self.assertTrue(hasattr(ArrayDeque, "pollFirst"))
+            self.assertEqual(0, reflection_cache_info().currsize)
+
+            for size in [-1, 1.5, "1"]:
+                with self.subTest(size=size), \
+                     self.assertRaisesRegex(ValueError, "Invalid reflection cache size"):
+                    set_reflection_cache_size(size)
+        finally:
+            set_reflection_cache_size(maxsize)
+
+    def test_preload(self):
+        calls = []
+        names = ["com.chaquo.python.TestReflect$Preload", "com.chaquo.python.Nonexistent"]
+        task = preload(names, callback=lambda *args: calls.append(args))
+        self.assertTrue(task.wait(10))
+        self.assertTrue(task.done())
+        self.assertEqual(names, task.names)
+        self.assertEqual(2, task.completed)
+        self.assertCountEqual(names, task.times)
+        self.assertGreaterEqual(task.elapsed, sum(task.times.values()))
+        self.assertRegex(repr(task), r"^<PreloadTask 2/2 classes in [0-9.]+ s>$")
+
+        self.assertEqual(["com.chaquo.python.Nonexistent"], list(task.errors))
+        error = task.errors["com.chaquo.python.Nonexistent"]
+        self.assertIsInstance(error, jclass("java.lang.NoClassDefFoundError"))
+        self.assertEqual([(name, task.times[name], task.errors.get(name)) for name in names],
+                         calls)
+
+        # Members were reflected, including inherited ones.
+        Preload = jclass(names[0])
+        for name in ["sm", "f", "toString"]:
+            with self.subTest(name=name):
+                self.assertIn(name, Preload.__dict__)
+        self.assertEqual("Preload.sm", Preload.sm())
+
     def test_call(self):
         Call = TR.Call
         self.assertEqual("anon 1", Call.anon("1"))
@@ -556,6 +678,113 @@ class TestReflect(FilterWarningsCase):
             fr"use cast\(\) to select one")
 
 
+ACC_PUBLIC = 0x0001
+ACC_STATIC = 0x0008
+ACC_VARARGS = 0x0080
+
+
+# Tests the runtime side of the reflection index generated by the Gradle plugin's
+# reflectionIndex setting.
+class TestReflectionIndex(FilterWarningsCase):
+
+    def tearDown(self):
+        super().tearDown()
+        self.load_index({})
+
+    def test_basic(self):
+        name = "com.chaquo.python.TestReflect$IndexedBasic"
+        self.load_index({name: [
+            ("M", "<init>", ACC_PUBLIC, "()V"),
+            ("M", "sm", ACC_PUBLIC | ACC_STATIC | ACC_VARARGS,
+             "([Ljava/lang/String;)Ljava/lang/String;"),
+            ("M", "m", ACC_PUBLIC, "()Ljava/lang/String;"),
+            ("F", "f", ACC_PUBLIC, "I"),
+            ("C", "Nested", ACC_PUBLIC | ACC_STATIC, name + "$Nested")]})
+
+        obj = TR.IndexedBasic()
+        self.assertEqual("IndexedBasic.sm 2", TR.IndexedBasic.sm("a", "b"))
+        self.assertEqual("IndexedBasic.m", obj.m())
+        self.assertEqual("IndexParent.m", TR.IndexParent.m(obj))
+        self.assertEqual(1, obj.f)
+        obj.f = 2
+        self.assertEqual(2, obj.f)
+        self.assertIs(jclass(name + "$Nested"), TR.IndexedBasic.Nested)
+
+        # Members which aren't in the index aren't listed, which shows that the index was
+        # used.
+        self.assertNotIn("unindexed", dir(TR.IndexedBasic))
+        self.assertIn("sm", dir(TR.IndexedBasic))
+        self.assertIn("toString", dir(TR.IndexedBasic))
+        self.assertFalse(hasattr(obj, "nonexistent"))
+        self.assertNotIn("unindexed", dir(TR.IndexedBasic))
+
+    def test_missing_member(self):
+        # If the index is missing a member which exists at runtime, reflection must be used
+        # instead.
+        self.load_index({"com.chaquo.python.TestReflect$IndexedMissingMember": [
+            ("M", "<init>", ACC_PUBLIC, "()V"),
+            ("F", "f", ACC_PUBLIC, "I")]})
+        obj = TR.IndexedMissingMember()
+        self.assertNotIn("m", dir(TR.IndexedMissingMember))
+        self.assertEqual("IndexedMissingMember.m", obj.m())
+        self.assertIn("m", dir(TR.IndexedMissingMember))
+        self.assertEqual(1, obj.f)
+
+    def test_platform(self):
+        # Framework classes aren't used on API levels newer than the one they were indexed
+        # from.
+        self.load_index({"com.chaquo.python.TestReflect$IndexedPlatform": []},
+                        platform=True, index_api_level=1, device_api_level=2)
+        self.assertEqual("IndexedPlatform.unindexed",
+                         TR.IndexedPlatform().unindexed())
+
+    def test_missing_override(self):
+        # If the index is missing an override, calling the inherited method non-virtually
+        # would skip it, so reflection must be used instead.
+        self.load_index({"com.chaquo.python.TestReflect$IndexedMissingOverride": [
+            ("M", "<init>", ACC_PUBLIC, "()V")]})
+        obj = TR.IndexedMissingOverride()
+        self.assertEqual("IndexedMissingOverride.m", obj.m())
+        self.assertEqual("IndexParent.m", TR.IndexParent.m(obj))
+
+    def test_extra_member(self):
+        # If the index contains a member which doesn't exist, reflection must be used
+        # instead.
+        self.load_index({"com.chaquo.python.TestReflect$IndexedExtraMember": [
+            ("M", "<init>", ACC_PUBLIC, "()V"),
+            ("M", "m", ACC_PUBLIC, "()Ljava/lang/String;"),
+            ("M", "extra", ACC_PUBLIC, "()V")]})
+        obj = TR.IndexedExtraMember()
+        self.assertEqual("IndexedExtraMember.m", obj.m())
+        self.assertFalse(hasattr(obj, "extra"))
+        self.assertNotIn("extra", dir(TR.IndexedExtraMember))
+
+    # `classes` is a dict mapping class names to lists of (kind, name, flags, descriptor)
+    # tuples. See ReflectionIndex.kt in the Gradle plugin for the format.
+    def load_index(self, classes, platform=False, index_api_level=0, device_api_level=0):
+        from com.chaquo.python import ReflectionIndex
+        from com.chaquo.python.internal import Common
+        from java.io import ByteArrayInputStream
+
+        strings = {}
+        def index(s):
+            return strings.setdefault(s, len(strings))
+
+        body = struct.pack(">i", len(classes))
+        for class_name, members in classes.items():
+            body += struct.pack(">i?i", index(class_name), platform, len(members))
+            for kind, name, flags, descriptor in members:
+                body += struct.pack(">ciii", kind.encode("ASCII"), index(name), flags,
+                                    index(descriptor))
+
+        header = struct.pack(">iiii", Common.REFLECTION_INDEX_MAGIC,
+                             Common.REFLECTION_INDEX_VERSION, index_api_level,
+                             len(strings))
+        for s in strings:
+            header += struct.pack(">H", len(s)) + s.encode("ASCII")
+        ReflectionIndex.load(ByteArrayInputStream(header + body), device_api_level)
+
+
 # On Android, getDeclaredMethods and getDeclaredFields fail when the member's type refers
 # to a class that cannot be loaded. Test the partial workaround in Reflector.
 @skipIf(not API_LEVEL, "Android only")
@@ -1,5 +1,5 @@
 import _thread
-from java import detach, jclass
+from java import detach, jclass, set_gil_policy, set_release_gil
 from time import time, sleep
 from threading import Thread
 
@@ -33,6 +33,31 @@ class TestThread(FilterWarningsCase):
             self.assertLess(time(), deadline)
         thread.join()
 
+    def test_gil_policy(self):
+        with self.assertRaisesRegex(ValueError, "Invalid GIL policy"):
+            set_gil_policy("never")
+        with self.assertRaisesRegex(TypeError, "must be True, False or None"):
+            set_release_gil("java.lang.String.length", 1)
+
+        set_gil_policy("adaptive")
+        try:
+            s = String("hello")
+            for i in range(100):
+                self.assertEqual(5, s.length())
+                self.assertEqual(str(i), String.valueOf(i))
+
+            # A method which blocks should still release the GIL, however often it's called.
+            for i in range(3):
+                self.check_gil_release(JavaTestThread.BlockingMethods.blockStatic)
+
+            # A synchronized method may block waiting for a monitor, so it should always
+            # release the GIL, however fast its previous calls were.
+            for i in range(100):
+                JavaTestThread.BlockingMethods.blockSynchronized(0)
+            self.check_gil_release(JavaTestThread.BlockingMethods.blockSynchronized)
+        finally:
+            set_gil_policy("release")
+
     # The detach tests contain no assertions, but they will crash on Android if the detach
     # doesn't take place.
     def test_detach_manual(self):
@@ -128,6 +128,29 @@ class TestNumpyJarray(unittest.TestCase):
                 self.assertEqual(values, na[0].tolist())
                 self.assertEqual(values_reversed, na[1].tolist())
 
+    def test_3d(self):
+        import numpy as np
+
+        for element_type, n2j_dtype, j2n_dtype, values in self.TESTS:
+            with self.subTest(type=element_type):
+                values_3d = [[values, values[::-1]], [values[1:] + values[:1], values]]
+
+                # NumPy to Java
+                na = np.array(values_3d, n2j_dtype)
+                ja = jarray(jarray(jarray(element_type)))(na)
+                self.assertEqual(values_3d, ja)
+
+                # Java to NumPy
+                na = np.array(ja)
+                self.assertIs(j2n_dtype, na.dtype.type)
+                self.assertEqual((2, 2, len(values)), na.shape)
+                self.assertEqual(values_3d, na.tolist())
+
+        # Ragged arrays don't support the buffer protocol, so NumPy falls back on the sequence
+        # protocol.
+        ja = jarray(jarray(jint))([[1, 2], [3]])
+        self.assertEqual((2,), np.array(ja, object).shape)
+
     def test_scalar_get(self):
         from numpy import int32, float32
         arr = jarray(jint)(TEST_DATA)
@@ -236,7 +259,9 @@ class TestNumpyJarray(unittest.TestCase):
             with self.assertTimeLimit(TIME_LIMIT):
                 na = np.array(ja)
 
-            # Fast conversion of multi-dimensional arrays from Java to NumPy doesn't work yet.
+            ja = jarray(jarray(element_type))(np.zeros((1000, SIZE // 1000), n2j_dtype))
+            with self.assertTimeLimit(TIME_LIMIT):
+                na = np.array(ja)
 
     @contextmanager
     def assertTimeLimit(self, limit):